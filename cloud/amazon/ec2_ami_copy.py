@@ -56,6 +56,13 @@ options:
       - a hash/dictionary of tags to add to the new copied AMI; '{"key":"value"}' and '{"key":"value","key":"value"}'
     required: false
     default: null
+  destination_regions:
+    description:
+      - a list of regions to copy the AMI to, instead of the region of the connection. All the copies are
+        started at once and then watched together, with one DescribeImages call per region every few seconds.
+    required: false
+    default: null
+    version_added: "2.1"
 
 author: Amir Moulavi <amir.moulavi@gmail.com>
 extends_documentation_fragment:
@@ -75,10 +82,40 @@ EXAMPLES = '''
     tags: '{"Name":"SuperService-new-AMI", "type":"SuperService"}'
     wait: yes
   register: image_id
+
+# Copy an AMI to several regions at once
+- local_action:
+    module: ec2_ami_copy
+    source_region: eu-west-1
+    source_image_id: ami-xxxxxxx
+    destination_regions: [ us-east-1, us-west-2, ap-southeast-1 ]
+    name: SuperService-new-AMI
+    tags: '{"Name":"SuperService-new-AMI"}'
+    wait: yes
+  register: images
+'''
+
+RETURN = '''
+image_id:
+    description: id of the new AMI, when destination_regions is not used
+    returned: success
+    type: string
+    sample: ami-xxxxxxx
+image_ids:
+    description: id of the new AMI in each region of destination_regions
+    returned: when destination_regions is used
+    type: dict
+    sample: {"us-east-1": "ami-xxxxxxx", "us-west-2": "ami-yyyyyyy"}
+copy_seconds:
+    description: seconds each copy took to be recognized, or to be available when wait is set
+    returned: when destination_regions is used
+    type: dict
+    sample: {"us-east-1": 512.3, "us-west-2": 604.9}
 '''
 
 
 import sys
+import threading
 import time
 
 try:
@@ -167,6 +204,94 @@ def wait_until_image_is_recognized(module, ec2, wait_timeout, image_id, wait):
         module.fail_json(msg="timed out waiting for image to be recognized")
 
 
+def copy_image_to_regions(module, regions):
+    """
+    Copies an AMI to several regions at once
+
+    module : AnsibleModule object
+    regions: list of destination region names
+    """
+
+    source_region = module.params.get('source_region')
+    source_image_id = module.params.get('source_image_id')
+    name = module.params.get('name')
+    description = module.params.get('description')
+    tags = module.params.get('tags')
+    wait_timeout = int(module.params.get('wait_timeout'))
+    wait = module.params.get('wait')
+
+    region, ec2_url, boto_params = get_aws_connection_info(module)
+    connections = {}
+    for dest_region in regions:
+        try:
+            connections[dest_region] = connect_to_aws(boto.ec2, dest_region, **boto_params)
+        except (boto.exception.NoAuthHandlerFound, AnsibleAWSError), e:
+            module.fail_json(msg="%s: %s" % (dest_region, str(e)))
+
+    # start every copy at once, each region on its own connection
+    image_ids = {}
+    started = {}
+    errors = {}
+
+    def start_copy(dest_region):
+        started[dest_region] = time.time()
+        try:
+            image_ids[dest_region] = connections[dest_region].copy_image(
+                source_region=source_region, source_image_id=source_image_id,
+                name=name, description=description).image_id
+        except boto.exception.BotoServerError, e:
+            errors[dest_region] = "%s: %s" % (e.error_code, e.error_message)
+
+    threads = [threading.Thread(target=start_copy, args=(dest_region,)) for dest_region in regions]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # watch the pending images together: a region is done once its image is
+    # recognized (and tagged), or available when waiting
+    states = {}
+    copy_seconds = {}
+    pending = set(image_ids)
+    deadline = time.time() + wait_timeout
+    while pending:
+        for dest_region in sorted(pending):
+            ec2 = connections[dest_region]
+            try:
+                images = ec2.get_all_images(filters={'image-id': image_ids[dest_region]})
+            except boto.exception.BotoServerError, e:
+                errors[dest_region] = "%s: %s" % (e.error_code, e.error_message)
+                pending.discard(dest_region)
+                continue
+            if not images:
+                continue
+            img = images[0]
+            if dest_region not in states and tags:
+                try:
+                    ec2.create_tags([image_ids[dest_region]], tags)
+                except boto.exception.BotoServerError, e:
+                    errors[dest_region] = "%s: %s" % (e.error_code, e.error_message)
+            states[dest_region] = img.state
+            if img.state == 'failed':
+                errors[dest_region] = "copy of %s failed" % image_ids[dest_region]
+            if not wait or img.state in ('available', 'failed') or dest_region in errors:
+                copy_seconds[dest_region] = round(time.time() - started[dest_region], 1)
+                pending.discard(dest_region)
+        if pending:
+            if time.time() >= deadline:
+                for dest_region in pending:
+                    errors[dest_region] = "timed out waiting for image %s" % image_ids[dest_region]
+                break
+            time.sleep(3)
+
+    result = dict(image_ids=image_ids, states=states, copy_seconds=copy_seconds)
+    if errors:
+        module.fail_json(msg="AMI copy failed in %s" % ', '.join(sorted(errors)),
+                         errors=errors, changed=bool(image_ids), **result)
+
+    module.exit_json(msg="AMI copy operation complete", changed=True, **result)
+
+
 def main():
     argument_spec = ec2_argument_spec()
     argument_spec.update(dict(
@@ -176,10 +301,14 @@ def main():
         description=dict(default=""),
         wait=dict(type='bool', default=False),
         wait_timeout=dict(default=1200),
-        tags=dict(type='dict')))
+        tags=dict(type='dict'),
+        destination_regions=dict(type='list')))
 
     module = AnsibleModule(argument_spec=argument_spec)
 
+    if module.params.get('destination_regions'):
+        copy_image_to_regions(module, module.params.get('destination_regions'))
+
     try:
         ec2 = ec2_connect(module)
     except boto.exception.NoAuthHandlerFound, e:
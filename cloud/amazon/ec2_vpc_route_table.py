@@ -22,6 +22,18 @@ description:
 version_added: "2.0"
 author: Robert Estelle (@erydo), Rob White (@wimnat)
 options:
+  api_concurrency:
+    description:
+      - "Number of route and subnet association changes sent to EC2 at the same time. Throttled calls are retried with exponential backoff."
+    required: false
+    default: 4
+    version_added: "2.1"
+  api_retries:
+    description:
+      - "Number of times a throttled EC2 call is retried before failing."
+    required: false
+    default: 5
+    version_added: "2.1"
   lookup:
     description:
       - "Look up route table by either tags or by route table ID. Non-unique tag lookup will fail. If no tags are specifed then no lookup for an existing route table is performed and a new route table will be created. To change tags of a route table, you must look up by id."
@@ -105,7 +117,11 @@ EXAMPLES = '''
 
 
 import sys  # noqa
+import random
 import re
+import threading
+import time
+import Queue
 
 try:
     import boto.ec2
@@ -136,6 +152,88 @@ class AnsibleSubnetSearchException(AnsibleRouteTableException):
 CIDR_RE = re.compile('^(\d{1,3}\.){3}\d{1,3}\/\d{1,2}$')
 SUBNET_RE = re.compile('^subnet-[A-z0-9]+$')
 ROUTE_TABLE_RE = re.compile('^rtb-[A-z0-9]+$')
+THROTTLING_ERRORS = ('Throttling', 'RequestLimitExceeded')
+
+
+class RouteTableApi(object):
+    """
+    Wraps a VPC connection to retry throttled EC2 calls with exponential
+    backoff, run batches of calls on a bounded pool of threads, and count
+    the calls made and the time spent in them.
+    """
+
+    def __init__(self, vpc_conn, concurrency=1, retries=5):
+        self.vpc_conn = vpc_conn
+        self.concurrency = max(1, concurrency)
+        self.retries = retries
+        self.stats = {}
+        self.lock = threading.Lock()
+
+    def _record(self, name, seconds, retry=False):
+        with self.lock:
+            stats = self.stats.setdefault(
+                name, {'count': 0, 'retries': 0, 'seconds': 0.0})
+            stats['count'] += 1
+            stats['seconds'] = round(stats['seconds'] + seconds, 3)
+            if retry:
+                stats['retries'] += 1
+
+    def call(self, name, *args, **kwargs):
+        """
+        Calls vpc_conn.<name>. Throttled calls are retried up to `retries`
+        times; a DryRunOperation error means the call would have succeeded
+        and returns None.
+        """
+        delay = 0.5
+        for attempt in range(self.retries + 1):
+            started = time.time()
+            try:
+                result = getattr(self.vpc_conn, name)(*args, **kwargs)
+                self._record(name, time.time() - started)
+                return result
+            except EC2ResponseError as e:
+                throttled = e.error_code in THROTTLING_ERRORS
+                self._record(name, time.time() - started, retry=throttled)
+                if e.error_code == 'DryRunOperation':
+                    return None
+                if not throttled or attempt == self.retries:
+                    raise
+            time.sleep(delay * random.uniform(0.5, 1.5))
+            delay = min(delay * 2, 20)
+
+    def call_all(self, calls):
+        """
+        Runs every (name, args, kwargs) in calls on at most `concurrency`
+        threads. Once all of them have been tried, raises an
+        AnsibleRouteTableException listing the ones that failed.
+        """
+        results = [None] * len(calls)
+        errors = []
+        work = Queue.Queue()
+        for index, call in enumerate(calls):
+            work.put((index, call))
+
+        def worker():
+            while True:
+                try:
+                    index, (name, args, kwargs) = work.get_nowait()
+                except Queue.Empty:
+                    return
+                try:
+                    results[index] = self.call(name, *args, **kwargs)
+                except EC2ResponseError as e:
+                    errors.append('{0}{1}: {2}'.format(name, args, e.message))
+
+        threads = [threading.Thread(target=worker)
+                   for i in range(min(self.concurrency, len(calls)))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if errors:
+            raise AnsibleRouteTableException('; '.join(errors))
+        return results
 
 
 def find_subnets(vpc_conn, vpc_id, identified_subnets):
@@ -294,22 +392,30 @@ def rename_key(d, old_key, new_key):
     del d[old_key]
 
 
-def index_of_matching_route(route_spec, routes_to_match):
-    for i, route in enumerate(routes_to_match):
-        if route_spec_matches_route(route_spec, route):
-            return i
+def index_routes(routes):
+    """
+    Indexes routes by destination, which is unique within a route table.
+    """
+    return dict((route.destination_cidr_block, route) for route in routes)
 
 
-def ensure_routes(vpc_conn, route_table, route_specs, propagating_vgw_ids,
+def ensure_routes(api, route_table, route_specs, propagating_vgw_ids,
                   check_mode):
-    routes_to_match = list(route_table.routes)
-    route_specs_to_create = []
+    routes_by_destination = index_routes(route_table.routes)
+    matched_destinations = set()
+    calls = []
     for route_spec in route_specs:
-        i = index_of_matching_route(route_spec, routes_to_match)
-        if i is None:
-            route_specs_to_create.append(route_spec)
-        else:
-            del routes_to_match[i]
+        destination = route_spec['destination_cidr_block']
+        route = routes_by_destination.get(destination)
+        if route is None:
+            calls.append(('create_route', (route_table.id,),
+                          dict(route_spec, dry_run=check_mode)))
+        elif not route_spec_matches_route(route_spec, route):
+            # Same destination with another target: point the existing
+            # route at the new target in place.
+            calls.append(('replace_route', (route_table.id,),
+                          dict(route_spec, dry_run=check_mode)))
+        matched_destinations.add(destination)
 
     # NOTE: As of boto==2.38.0, the origin of a route is not available
     # (for example, whether it came from a gateway with route propagation
@@ -317,75 +423,56 @@ def ensure_routes(vpc_conn, route_table, route_specs, propagating_vgw_ids,
     # correct than checking whether the route uses a propagating VGW.
     # The current logic will leave non-propagated routes using propagating
     # VGWs in place.
-    routes_to_delete = [r for r in routes_to_match
-                        if r.gateway_id != 'local'
-                        and r.gateway_id not in propagating_vgw_ids]
-
-    changed = routes_to_delete or route_specs_to_create
-    if changed:
-        for route_spec in route_specs_to_create:
-            try:
-                vpc_conn.create_route(route_table.id,
-                                      dry_run=check_mode,
-                                      **route_spec)
-            except EC2ResponseError as e:
-                if e.error_code == 'DryRunOperation':
-                    pass
-
-        for route in routes_to_delete:
-            try:
-                vpc_conn.delete_route(route_table.id,
-                                      route.destination_cidr_block,
-                                      dry_run=check_mode)
-            except EC2ResponseError as e:
-                if e.error_code == 'DryRunOperation':
-                    pass
-
-    return {'changed': bool(changed)}
-
-
-def ensure_subnet_association(vpc_conn, vpc_id, route_table_id, subnet_id,
-                              check_mode):
-    route_tables = vpc_conn.get_all_route_tables(
-        filters={'association.subnet_id': subnet_id, 'vpc_id': vpc_id}
-    )
-    for route_table in route_tables:
-        if route_table.id is None:
-            continue
-        for a in route_table.associations:
-            if a.subnet_id == subnet_id:
-                if route_table.id == route_table_id:
-                    return {'changed': False, 'association_id': a.id}
-                else:
-                    if check_mode:
-                        return {'changed': True}
-                    vpc_conn.disassociate_route_table(a.id)
+    for route in route_table.routes:
+        if route.destination_cidr_block not in matched_destinations \
+                and route.gateway_id != 'local' \
+                and route.gateway_id not in (propagating_vgw_ids or []):
+            calls.append(('delete_route',
+                          (route_table.id, route.destination_cidr_block),
+                          dict(dry_run=check_mode)))
 
-    association_id = vpc_conn.associate_route_table(route_table_id, subnet_id)
-    return {'changed': True, 'association_id': association_id}
+    api.call_all(calls)
+    return {'changed': bool(calls)}
 
 
-def ensure_subnet_associations(vpc_conn, vpc_id, route_table, subnets,
+def ensure_subnet_associations(api, vpc_id, route_table, subnets,
                                check_mode):
-    current_association_ids = [a.id for a in route_table.associations]
-    new_association_ids = []
-    changed = False
-    for subnet in subnets:
-        result = ensure_subnet_association(
-            vpc_conn, vpc_id, route_table.id, subnet.id, check_mode)
-        changed = changed or result['changed']
-        if changed and check_mode:
-            return {'changed': True}
-        new_association_ids.append(result['association_id'])
+    subnet_ids = [subnet.id for subnet in subnets]
 
-    to_delete = [a_id for a_id in current_association_ids
-                 if a_id not in new_association_ids]
+    # One describe for the current association of every subnet
+    current = {}
+    if subnet_ids:
+        route_tables = api.call(
+            'get_all_route_tables',
+            filters={'association.subnet_id': subnet_ids, 'vpc_id': vpc_id})
+        for table in route_tables:
+            if table.id is None:
+                continue
+            for a in table.associations:
+                if a.subnet_id in subnet_ids:
+                    current[a.subnet_id] = (table.id, a.id)
+
+    kept_association_ids = set()
+    calls = []
+    for subnet_id in subnet_ids:
+        if subnet_id not in current:
+            calls.append(('associate_route_table',
+                          (route_table.id, subnet_id), {}))
+            continue
+        table_id, association_id = current[subnet_id]
+        if table_id == route_table.id:
+            kept_association_ids.add(association_id)
+        else:
+            calls.append(('replace_route_table_association_with_assoc',
+                          (association_id, route_table.id), {}))
 
-    for a_id in to_delete:
-        changed = True
-        vpc_conn.disassociate_route_table(a_id, dry_run=check_mode)
+    for a in route_table.associations:
+        if not a.main and a.id not in kept_association_ids:
+            calls.append(('disassociate_route_table', (a.id,), {}))
 
-    return {'changed': changed}
+    if calls and not check_mode:
+        api.call_all(calls)
+    return {'changed': bool(calls)}
 
 
 def ensure_propagation(vpc_conn, route_table, propagating_vgw_ids,
@@ -482,6 +569,9 @@ def ensure_route_table_present(connection, module):
     subnets = module.params.get('subnets')
     tags = module.params.get('tags')
     vpc_id = module.params.get('vpc_id')
+    api = RouteTableApi(connection,
+                        concurrency=module.params.get('api_concurrency'),
+                        retries=module.params.get('api_retries'))
     try:
         routes = create_route_spec(connection, module.params.get('routes'), vpc_id)
     except AnsibleIgwSearchException as e:
@@ -519,7 +609,7 @@ def ensure_route_table_present(connection, module):
 
     if routes is not None:
         try:
-            result = ensure_routes(connection, route_table, routes, propagating_vgw_ids, module.check_mode)
+            result = ensure_routes(api, route_table, routes, propagating_vgw_ids, module.check_mode)
             changed = changed or result['changed']
         except EC2ResponseError as e:
             module.fail_json(msg=e.message)
@@ -546,7 +636,7 @@ def ensure_route_table_present(connection, module):
             )
 
         try:
-            result = ensure_subnet_associations(connection, vpc_id, route_table, associated_subnets, module.check_mode)
+            result = ensure_subnet_associations(api, vpc_id, route_table, associated_subnets, module.check_mode)
             changed = changed or result['changed']
         except EC2ResponseError as e:
             raise AnsibleRouteTableException(
@@ -554,13 +644,16 @@ def ensure_route_table_present(connection, module):
                 .format(route_table, e)
             )
 
-    module.exit_json(changed=changed, route_table=get_route_table_info(route_table))
+    module.exit_json(changed=changed, route_table=get_route_table_info(route_table),
+                     api_calls=api.stats)
 
 
 def main():
     argument_spec = ec2_argument_spec()
     argument_spec.update(
         dict(
+            api_concurrency = dict(default=4, required=False, type='int'),
+            api_retries = dict(default=5, required=False, type='int'),
             lookup = dict(default='tag', required=False, choices=['tag', 'id']),
             propagating_vgw_ids = dict(default=None, required=False, type='list'),
             route_table_id = dict(default=None, required=False),
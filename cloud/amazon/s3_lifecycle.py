@@ -29,8 +29,27 @@ requirements:
 options:
   name:
     description:
-      - "Name of the s3 bucket"
-    required: true
+      - "Name of the s3 bucket. Required unless I(buckets) is given."
+    required: false
+  buckets:
+    description:
+      - "List of s3 buckets to configure with I(rules). Mutually exclusive with I(name)."
+    required: false
+    default: null
+    version_added: "2.1"
+  rules:
+    description:
+      - "The complete list of lifecycle rules of the bucket(s). Each rule is a dict taking the keys C(rule_id), C(prefix), C(status), C(storage_class), C(expiration_days), C(expiration_date), C(transition_days) and C(transition_date), with the same meaning and defaults as the options of the same name. Rules not in the list are removed, and an empty list removes the lifecycle configuration."
+      - "The current configuration of each bucket is read once and written at most once, whatever the number of rules."
+    required: false
+    default: null
+    version_added: "2.1"
+  concurrency:
+    description:
+      - "Number of buckets configured at the same time when I(rules) is used."
+    required: false
+    default: 4
+    version_added: "2.1"
   expiration_date:
     description:
       - "Indicates the lifetime of the objects that are subject to the rule by the date they will expire. The value must be ISO-8601 format, the time must be midnight and a GMT timezone must be specified."
@@ -127,11 +146,27 @@ EXAMPLES = '''
     prefix: /logs/
     state: absent
 
+# Set the complete list of lifecycle rules on several buckets at once
+- s3_lifecycle:
+    buckets:
+      - logs-eu
+      - logs-us
+    rules:
+      - rule_id: expire-logs
+        prefix: /logs/
+        transition_days: 7
+        expiration_days: 90
+      - rule_id: expire-tmp
+        prefix: /tmp/
+        expiration_days: 1
+
 '''
 
 import xml.etree.ElementTree as ET
 import copy
 import datetime
+import threading
+import Queue
 
 try:
     import dateutil.parser
@@ -338,12 +373,124 @@ def destroy_lifecycle_rule(connection, module):
     module.exit_json(changed=changed)
 
 
+def build_rule(spec):
+    """Build a boto Rule from one entry of the rules option."""
+
+    storage_class = (spec.get('storage_class') or 'glacier').upper()
+    if spec.get('expiration_days') is not None:
+        expiration_obj = Expiration(days=int(spec['expiration_days']))
+    elif spec.get('expiration_date') is not None:
+        expiration_obj = Expiration(date=spec['expiration_date'])
+    else:
+        expiration_obj = None
+    if spec.get('transition_days') is not None:
+        transition_obj = Transition(days=int(spec['transition_days']), storage_class=storage_class)
+    elif spec.get('transition_date') is not None:
+        transition_obj = Transition(date=spec['transition_date'], storage_class=storage_class)
+    else:
+        transition_obj = None
+
+    return Rule(spec.get('rule_id'), spec.get('prefix') or '', (spec.get('status') or 'enabled').title(),
+                expiration_obj, transition_obj)
+
+def lifecycle_matches(current_lifecycle_obj, rules):
+    """Whether the bucket's rules are exactly the desired rules.
+
+    Rules with an ID are matched on it, the others on their prefix as
+    S3 gives them a generated ID.
+    """
+
+    if len(current_lifecycle_obj) != len(rules):
+        return False
+    by_id = dict((existing_rule.id, existing_rule) for existing_rule in current_lifecycle_obj)
+    by_prefix = dict((existing_rule.prefix, existing_rule) for existing_rule in current_lifecycle_obj)
+    for rule in rules:
+        if rule.id is not None:
+            existing_rule = by_id.get(rule.id)
+        else:
+            existing_rule = copy.copy(by_prefix.get(rule.prefix))
+            if existing_rule is not None:
+                existing_rule.id = None
+        if existing_rule is None or not compare_rule(rule, existing_rule):
+            return False
+    return True
+
+def sync_lifecycle(connection, name, rules):
+    """Make the rules the whole lifecycle configuration of one bucket.
+
+    Reads the configuration once and writes it only if it differs.
+    """
+
+    bucket = connection.get_bucket(name)
+    try:
+        current_lifecycle_obj = bucket.get_lifecycle_config()
+    except S3ResponseError, e:
+        if e.error_code == "NoSuchLifecycleConfiguration":
+            current_lifecycle_obj = Lifecycle()
+        else:
+            raise
+
+    if lifecycle_matches(current_lifecycle_obj, rules):
+        return False
+
+    if rules:
+        lifecycle_obj = Lifecycle()
+        for rule in rules:
+            lifecycle_obj.append(rule)
+        bucket.configure_lifecycle(lifecycle_obj)
+    else:
+        bucket.delete_lifecycle_configuration()
+    return True
+
+def sync_lifecycles(connection, module):
+
+    buckets = module.params.get("buckets") or [module.params.get("name")]
+    rules = [build_rule(spec) for spec in module.params.get("rules")]
+
+    results = [None] * len(buckets)
+    work = Queue.Queue()
+    for index, name in enumerate(buckets):
+        work.put((index, name))
+
+    def worker():
+        while True:
+            try:
+                index, name = work.get_nowait()
+            except Queue.Empty:
+                return
+            try:
+                changed = sync_lifecycle(connection, name, rules)
+                results[index] = dict(name=name, changed=changed, rule_count=len(rules))
+            except BotoServerError, e:
+                results[index] = dict(name=name, failed=True, msg=e.message)
+            except Exception, e:
+                results[index] = dict(name=name, failed=True, msg=str(e))
+
+    threads = [threading.Thread(target=worker)
+               for i in range(max(1, min(module.params.get("concurrency"), len(buckets))))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    changed = any(result.get('changed') for result in results)
+    failed = [result for result in results if result.get('failed')]
+    if failed:
+        module.fail_json(msg="Unable to configure the lifecycle of %s" % ', '.join(result['name'] for result in failed),
+                         changed=changed, buckets=results)
+
+    module.exit_json(changed=changed, buckets=results)
+
+
 def main():
 
     argument_spec = ec2_argument_spec()
     argument_spec.update(
         dict(
-            name = dict(required=True),
+            name = dict(required=False),
+            buckets = dict(default=None, required=False, type='list'),
+            rules = dict(default=None, required=False, type='list'),
+            concurrency = dict(default=4, required=False, type='int'),
             expiration_days = dict(default=None, required=False, type='int'),
             expiration_date = dict(default=None, required=False, type='str'),
             prefix = dict(default=None, required=False),
@@ -362,8 +509,10 @@ def main():
                                                  [ 'expiration_days', 'expiration_date' ],
                                                  [ 'expiration_days', 'transition_date' ],
                                                  [ 'transition_days', 'transition_date' ],
-                                                 [ 'transition_days', 'expiration_date' ]
-                                                 ]
+                                                 [ 'transition_days', 'expiration_date' ],
+                                                 [ 'name', 'buckets' ]
+                                                 ],
+                           required_one_of = [ [ 'name', 'buckets' ] ]
                            )
 
     if not HAS_BOTO:
@@ -406,6 +555,19 @@ def main():
         except ValueError, e:
             module.fail_json(msg="expiration_date is not a valid ISO-8601 format. The time must be midnight and a timezone of GMT must be included")
 
+    if module.params.get("rules") is not None:
+        for spec in module.params.get("rules"):
+            for key in ('expiration_date', 'transition_date'):
+                if spec.get(key) is None:
+                    continue
+                try:
+                    datetime.datetime.strptime(spec[key], "%Y-%m-%dT%H:%M:%S.000Z")
+                except ValueError, e:
+                    module.fail_json(msg="%s of a rule is not a valid ISO-8601 format. The time must be midnight and a timezone of GMT must be included" % key)
+        sync_lifecycles(connection, module)
+    elif module.params.get("buckets"):
+        module.fail_json(msg="rules is required with buckets")
+
     if state == 'present':
         create_lifecycle_rule(connection, module)
     elif state == 'absent':
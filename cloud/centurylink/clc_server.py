@@ -224,6 +224,25 @@ options:
     default: True
     required: False
     choices: [True, False]
+  wait_concurrency:
+    description:
+      - The number of request status polls and server refreshes issued at the same time while waiting.
+        The interval between status sweeps starts at 2 seconds and grows up to 30 seconds.
+    default: 10
+    required: False
+    version_added: "2.1"
+  lookup_cache_ttl:
+    description:
+      - Number of seconds the account alias, datacenter group tree, template, network and policy lookups
+        are cached on the controller, so that consecutive tasks against the same account skip those API calls.
+        The cache is kept per CLC_V2_API_URL, CLC_ACCT_ALIAS and CLC_V2_API_USERNAME in a private per-user
+        directory of the temporary directory, and is not used when that directory is owned by another user or
+        is accessible to others. C(0) disables the cache.
+      - Groups and policies created or deleted by other modules are only seen once the cached lookups expire,
+        so keep the ttl short or use C(0) in plays that change them.
+    default: 0
+    required: False
+    version_added: "2.1"
 requirements:
     - python = 2.7
     - requests >= 2.5.0
@@ -291,6 +310,15 @@ server_ids:
             "UC1TEST-SVR01",
             "UC1TEST-SVR02"
         ]
+provisioning_seconds:
+    description: The time each server request took to complete, by server id
+    returned: success, when wait is True
+    type: dict
+    sample:
+        {
+            "UC1TEST-SVR01": 312.4,
+            "UC1TEST-SVR02": 298.0
+        }
 partially_created_server_ids:
     description: The list of server ids that are partially created
     returned: success
@@ -461,6 +489,14 @@ servers:
 
 __version__ = '${version}'
 
+import hashlib
+import json
+import os
+import stat
+import tempfile
+import threading
+import Queue
+import time
 from time import sleep
 from distutils.version import LooseVersion
 
@@ -486,8 +522,117 @@ else:
     CLC_FOUND = True
 
 
+class ClcLookupCache:
+    """
+    Short lived on-disk cache of CLC lookups (account alias, datacenter group
+    index, template, network and policy ids) shared by the clc_server tasks of
+    a run, one file per CLC account in a private per-user directory.
+    """
+
+    def __init__(self, ttl=0):
+        self.ttl = ttl or 0
+        self.path = None
+        if self.ttl > 0:
+            directory = ClcLookupCache._cache_dir()
+            if directory is not None:
+                env = os.environ
+                identity = '|'.join([env.get('CLC_V2_API_URL', ''),
+                                     env.get('CLC_ACCT_ALIAS', ''),
+                                     env.get('CLC_V2_API_USERNAME', '')])
+                self.path = os.path.join(directory, '%s.json' % hashlib.sha1(identity).hexdigest())
+
+    @staticmethod
+    def _cache_dir():
+        """
+        Create the private cache directory if needed
+        :return: its path, or None when it is not owned by the current user or is accessible to others
+        """
+        path = os.path.join(tempfile.gettempdir(), 'ansible-clc-lookup-%s' % os.getuid())
+        try:
+            os.mkdir(path, 0700)
+        except OSError:
+            pass
+        try:
+            st = os.lstat(path)
+        except OSError:
+            return None
+        # the cached ids pick the group, template and network of new servers,
+        # so they are only read from a directory nobody else can write to
+        if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 077:
+            return None
+        return path
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (IOError, ValueError):
+            return {}
+
+    def _save(self, data):
+        try:
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.path))
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f)
+            os.rename(tmp, self.path)
+        except (IOError, OSError):
+            pass
+
+    def get(self, key):
+        """
+        Return the cached value of key, or None when it is missing or expired
+        :param key: the cache key
+        :return: the cached value
+        """
+        if self.path is None:
+            return None
+        entry = self._load().get(key)
+        if entry and time.time() - entry['time'] < self.ttl:
+            return entry['value']
+        return None
+
+    def set(self, key, value):
+        """
+        Store the value of key
+        :param key: the cache key
+        :param value: a json serializable value
+        :return: none
+        """
+        if self.path is None:
+            return
+        data = self._load()
+        data[key] = {'time': time.time(), 'value': value}
+        self._save(data)
+
+
+class ClcLazyDatacenter:
+    """
+    Stand-in for a clc-sdk.Datacenter which only calls the CLC API once an
+    attribute other than the location id is needed, so cached lookups are free.
+    """
+
+    def __init__(self, clc, module, location):
+        self.id = location
+        self._clc = clc
+        self._module = module
+        self._datacenter = None
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        if self._datacenter is None:
+            try:
+                self._datacenter = self._clc.v2.Datacenter(self.id)
+            except CLCException:
+                self._module.fail_json(
+                    msg=str(
+                        "Unable to find location: {0}".format(self.id)))
+        return getattr(self._datacenter, name)
+
+
 class ClcServer:
     clc = clc_sdk
+    lookup_cache = ClcLookupCache()
 
     def __init__(self, module):
         """
@@ -496,6 +641,9 @@ class ClcServer:
         self.clc = clc_sdk
         self.module = module
         self.group_dict = {}
+        self.provisioning_seconds = {}
+        ClcServer.lookup_cache = ClcLookupCache(
+            module.params.get('lookup_cache_ttl'))
 
         if not CLC_FOUND:
             self.module.fail_json(
@@ -575,10 +723,15 @@ class ClcServer:
                  changed) = self._enforce_count(self.module,
                                                 self.clc)
 
+        for server in server_dict_array:
+            if 'provisioning_seconds' in server:
+                self.provisioning_seconds[server['id']] = server['provisioning_seconds']
+
         self.module.exit_json(
             changed=changed,
             server_ids=new_server_ids,
             partially_created_server_ids=partial_servers_ids,
+            provisioning_seconds=self.provisioning_seconds,
             servers=server_dict_array)
 
     @staticmethod
@@ -645,7 +798,9 @@ class ClcServer:
                              'windows2012R2Standard_64Bit',
                              'ubuntu14_64Bit'
                          ]),
-            wait=dict(type='bool', default=True))
+            wait=dict(type='bool', default=True),
+            wait_concurrency=dict(type='int', default=10),
+            lookup_cache_ttl=dict(type='int', default=0))
 
         mutually_exclusive = [
             ['exact_count', 'count'],
@@ -703,7 +858,7 @@ class ClcServer:
         params['description'] = ClcServer._find_description(module)
         params['ttl'] = ClcServer._find_ttl(clc, module)
         params['template'] = ClcServer._find_template_id(module, datacenter)
-        params['group'] = ClcServer._find_group(module, datacenter).id
+        params['group'] = ClcServer._find_group_id(module, datacenter)
         params['network_id'] = ClcServer._find_network_id(module, datacenter)
         params['anti_affinity_policy_id'] = ClcServer._find_aa_policy_id(
             clc,
@@ -717,16 +872,23 @@ class ClcServer:
     @staticmethod
     def _find_datacenter(clc, module):
         """
-        Find the datacenter by calling the CLC API.
+        Find the datacenter by calling the CLC API.  With the lookup cache enabled
+        a lazy stand-in is returned so that cached lookups skip the datacenter call.
         :param clc: clc-sdk instance to use
         :param module: module to validate
         :return: clc-sdk.Datacenter instance
         """
         location = module.params.get('location')
+        cache = ClcServer.lookup_cache
         try:
+            if not location:
+                location = cache.get('primary_datacenter')
             if not location:
                 account = clc.v2.Account()
                 location = account.data.get('primaryDataCenter')
+                cache.set('primary_datacenter', location)
+            if cache.ttl > 0:
+                return ClcLazyDatacenter(clc, module, location)
             data_center = clc.v2.Datacenter(location)
             return data_center
         except CLCException as ex:
@@ -743,6 +905,8 @@ class ClcServer:
         :return: clc-sdk.Account instance
         """
         alias = module.params.get('alias')
+        if not alias:
+            alias = ClcServer.lookup_cache.get('alias')
         if not alias:
             try:
                 alias = clc.v2.Account.GetAlias()
@@ -750,6 +914,7 @@ class ClcServer:
                 module.fail_json(msg='Unable to find account alias. {0}'.format(
                     ex.message
                 ))
+            ClcServer.lookup_cache.set('alias', alias)
         return alias
 
     @staticmethod
@@ -879,8 +1044,13 @@ class ClcServer:
         result = None
 
         if state == 'present' and type != 'bareMetal':
+            cache_key = 'templates/%s/%s' % (datacenter.id, lookup_template)
+            result = ClcServer.lookup_cache.get(cache_key)
+            if result:
+                return result
             try:
                 result = datacenter.Templates().Search(lookup_template)[0].id
+                ClcServer.lookup_cache.set(cache_key, result)
             except CLCException:
                 module.fail_json(
                     msg=str(
@@ -900,9 +1070,12 @@ class ClcServer:
         """
         network_id = module.params.get('network_id')
 
+        if not network_id:
+            network_id = ClcServer.lookup_cache.get('networks/%s' % datacenter.id)
         if not network_id:
             try:
                 network_id = datacenter.Networks().networks[0].id
+                ClcServer.lookup_cache.set('networks/%s' % datacenter.id, network_id)
                 # -- added for clc-sdk 2.23 compatibility
                 # datacenter_networks = clc_sdk.v2.Networks(
                 #   networks_lst=datacenter._DeploymentCapabilities()['deployableNetworks'])
@@ -1021,8 +1194,7 @@ class ClcServer:
                 request_list.append(req)
                 servers.append(server)
 
-        self._wait_for_requests(module, request_list)
-        self._refresh_servers(module, servers)
+        latencies = self._wait_for_requests(module, request_list)
 
         ip_failed_servers = self._add_public_ip_to_servers(
             module=module,
@@ -1033,13 +1205,16 @@ class ClcServer:
         ap_failed_servers = self._add_alert_policy_to_servers(clc=clc,
                                                               module=module,
                                                               servers=servers)
+        # reload server details, including the public IPs added above
+        self._refresh_servers(module, servers)
 
-        for server in servers:
+        for index, server in enumerate(servers):
+            if latencies:
+                server.data['provisioning_seconds'] = latencies[index]
             if server in ip_failed_servers or server in ap_failed_servers:
                 partial_created_servers_ids.append(server.id)
             else:
-                # reload server details
-                server = clc.v2.Server(server.id)
+                # server details were reloaded by _refresh_servers
                 server.data['ipaddress'] = server.details[
                     'ipAddresses'][0]['internal']
 
@@ -1098,39 +1273,125 @@ class ClcServer:
 
         return server_dict_array, changed_server_ids, partial_servers_ids, changed
 
+    @staticmethod
+    def _run_concurrently(module, func, items):
+        """
+        Call func for every item on a bounded pool of threads
+        :param module: the AnsibleModule object
+        :param func: the function to call with each item
+        :param items: the list of items
+        :return: list of (item, exception) tuples for the calls which raised
+        """
+        work = Queue.Queue()
+        for item in items:
+            work.put(item)
+        errors = []
+
+        def worker():
+            while True:
+                try:
+                    item = work.get_nowait()
+                except Queue.Empty:
+                    return
+                try:
+                    func(item)
+                except Exception as ex:
+                    errors.append((item, ex))
+
+        workers = max(1, min(module.params.get('wait_concurrency') or 1, len(items)))
+        threads = [threading.Thread(target=worker) for i in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return errors
+
     @staticmethod
     def _wait_for_requests(module, request_list):
         """
-        Block until server provisioning requests are completed.
+        Block until server provisioning requests are completed. The status of all
+        outstanding requests is polled concurrently, with an interval growing from
+        2 to 30 seconds between sweeps.
         :param module: the AnsibleModule object
-        :param request_list: a list of clc-sdk.Request instances
-        :return: none
+        :param request_list: a list of clc-sdk.Requests instances
+        :return: a list with the seconds each clc-sdk.Requests took to complete
         """
         wait = module.params.get('wait')
-        if wait:
-            # Requests.WaitUntilComplete() returns the count of failed requests
-            failed_requests_count = sum(
-                [request.WaitUntilComplete() for request in request_list])
+        if not wait or not request_list:
+            return None
+
+        started = time.time()
+        pending = {}
+        for index, requests_obj in enumerate(request_list):
+            for request in getattr(requests_obj, 'requests', []):
+                pending[request] = index
+        completed = [started] * len(request_list)
+        statuses = {}
+        failed_requests_count = 0
+        interval = 2
+
+        def poll(request):
+            statuses[request] = request.Status()
+
+        while pending:
+            sleep(interval)
+            errors = ClcServer._run_concurrently(module, poll, list(pending))
+            for request, ex in errors:
+                module.fail_json(msg='Unable to get the status of request {0}. {1}'.format(
+                    request.id, getattr(ex, 'message', str(ex))))
+            now = time.time()
+            for request, status in statuses.items():
+                if status in ('succeeded', 'failed'):
+                    index = pending.pop(request)
+                    completed[index] = max(completed[index], now)
+                    if status == 'failed':
+                        failed_requests_count += 1
+            statuses.clear()
+            interval = min(interval * 1.5, 30)
+
+        if failed_requests_count > 0:
+            module.fail_json(
+                msg='Unable to process server request')
 
-            if failed_requests_count > 0:
-                module.fail_json(
-                    msg='Unable to process server request')
+        return [round(t - started, 1) for t in completed]
 
     @staticmethod
     def _refresh_servers(module, servers):
         """
-        Loop through a list of servers and refresh them.
+        Refresh a list of servers, with one detailed query per group the servers
+        belong to, and concurrent individual refreshes for the remaining ones.
         :param module: the AnsibleModule object
         :param servers: list of clc-sdk.Server instances to refresh
         :return: none
         """
+        groups = {}
         for server in servers:
+            group_id = server.data.get('groupId')
+            alias = getattr(server, 'alias', None)
+            if group_id and alias:
+                groups.setdefault((alias, group_id), []).append(server)
+
+        remaining = list(servers)
+        for (alias, group_id), group_servers in groups.items():
             try:
-                server.Refresh()
-            except CLCException as ex:
-                module.fail_json(msg='Unable to refresh the server {0}. {1}'.format(
-                    server.id, ex.message
-                ))
+                group = clc_sdk.v2.API.Call(
+                    method='GET',
+                    url='groups/%s/%s?serverDetail=detailed' % (alias, group_id))
+            except APIFailedResponse:
+                continue
+            details = dict((obj.get('id'), obj) for obj in group.get('servers', [])
+                           if isinstance(obj, dict) and 'details' in obj)
+            for server in group_servers:
+                if server.id in details:
+                    server.data = details[server.id]
+                    server.dirty = False
+                    remaining.remove(server)
+
+        errors = ClcServer._run_concurrently(module, lambda server: server.Refresh(), remaining)
+        for server, ex in errors:
+            module.fail_json(msg='Unable to refresh the server {0}. {1}'.format(
+                server.id, getattr(ex, 'message', str(ex))
+            ))
 
     @staticmethod
     def _add_public_ip_to_servers(
@@ -1230,13 +1491,18 @@ class ClcServer:
         :return: alert_policy_id: the alert policy id
         """
         alert_policy_id = None
-        policies = clc.v2.API.Call('GET', '/v2/alertPolicies/%s' % alias)
-        if not policies:
-            return alert_policy_id
-        for policy in policies.get('items'):
-            if policy.get('name') == alert_policy_name:
+        cache_key = 'alert_policies/%s' % alias
+        policies = ClcServer.lookup_cache.get(cache_key)
+        if policies is None:
+            response = clc.v2.API.Call('GET', '/v2/alertPolicies/%s' % alias)
+            if not response:
+                return alert_policy_id
+            policies = [[p.get('name'), p.get('id')] for p in response.get('items')]
+            ClcServer.lookup_cache.set(cache_key, policies)
+        for name, policy_id in policies:
+            if name == alert_policy_name:
                 if not alert_policy_id:
-                    alert_policy_id = policy.get('id')
+                    alert_policy_id = policy_id
                 else:
                     return module.fail_json(
                         msg='multiple alert policies were found with policy name : %s' % alert_policy_name)
@@ -1303,8 +1569,11 @@ class ClcServer:
                             state))
                 changed = True
 
-        ClcServer._wait_for_requests(module, request_list)
+        latencies = ClcServer._wait_for_requests(module, request_list)
         ClcServer._refresh_servers(module, changed_servers)
+        if latencies:
+            for index, server in enumerate(changed_servers):
+                server.data['provisioning_seconds'] = latencies[index]
 
         for server in set(changed_servers + servers):
             try:
@@ -1378,20 +1647,36 @@ class ClcServer:
         :param lookup_group: string name of the group to search for
         :return: clc-sdk.Group instance
         """
+        groups = {}
+        group_id = ClcServer._find_group_id(module, datacenter, lookup_group, groups)
+        if group_id in groups:
+            return groups[group_id]
+        return clc_sdk.v2.Group(id=group_id, alias=module.params.get('alias'))
+
+    @staticmethod
+    def _find_group_id(module, datacenter, lookup_group=None, groups=None):
+        """
+        Find the id of a server group, by name or id, from the cached group index of
+        the datacenter or by walking its group tree
+        :param module: the AnsibleModule instance
+        :param datacenter: clc-sdk.Datacenter instance to search for the group
+        :param lookup_group: string name or id of the group to search for
+        :param groups: optional dictionary filled with the clc-sdk.Group instances walked
+        :return: the group id
+        """
         if not lookup_group:
             lookup_group = module.params.get('group')
-        try:
-            return datacenter.Groups().Get(lookup_group)
-        except CLCException:
-            pass
-
-        # The search above only acts on the main
-        result = ClcServer._find_group_recursive(
-            module,
-            datacenter.Groups(),
-            lookup_group)
-
-        if result is None:
+        cache_key = 'groups/%s' % datacenter.id
+        index = ClcServer.lookup_cache.get(cache_key)
+        if index is None or lookup_group.lower() not in index:
+            index = {}
+            if groups is None:
+                groups = {}
+            ClcServer._index_groups(datacenter.Groups(), index, groups)
+            ClcServer.lookup_cache.set(cache_key, index)
+
+        group_id = index.get(lookup_group.lower())
+        if group_id is None:
             module.fail_json(
                 msg=str(
                     "Unable to find group: " +
@@ -1399,32 +1684,24 @@ class ClcServer:
                     " in location: " +
                     datacenter.id))
 
-        return result
+        return group_id
 
     @staticmethod
-    def _find_group_recursive(module, group_list, lookup_group):
+    def _index_groups(group_list, index, groups):
         """
-        Find a server group by recursively walking the tree
-        :param module: the AnsibleModule instance to use
-        :param group_list: a list of groups to search
-        :param lookup_group: the group to look for
-        :return: list of groups
+        Index a group tree by lower cased name and id. Groups are indexed level by level
+        under each parent, so the first match wins like a top down search would.
+        :param group_list: a clc-sdk.Groups instance to index
+        :param index: dictionary of lower cased group name or id to group id
+        :param groups: dictionary of group id to clc-sdk.Group instance
+        :return: none
         """
-        result = None
         for group in group_list.groups:
-            subgroups = group.Subgroups()
-            try:
-                return subgroups.Get(lookup_group)
-            except CLCException:
-                result = ClcServer._find_group_recursive(
-                    module,
-                    subgroups,
-                    lookup_group)
-
-            if result is not None:
-                break
-
-        return result
+            groups[group.id] = group
+            index.setdefault(group.id.lower(), group.id)
+            index.setdefault(group.name.lower(), group.id)
+        for group in group_list.groups:
+            ClcServer._index_groups(group.Subgroups(), index, groups)
 
     @staticmethod
     def _create_clc_server(
@@ -1505,16 +1782,21 @@ class ClcServer:
         :return: aa_policy_id: The anti affinity policy id
         """
         aa_policy_id = None
-        try:
-            aa_policies = clc.v2.API.Call(method='GET',
-                                          url='antiAffinityPolicies/%s' % alias)
-        except APIFailedResponse as ex:
-            return module.fail_json(msg='Unable to fetch anti affinity policies for account: {0}. {1}'.format(
-                alias, ex.response_text))
-        for aa_policy in aa_policies.get('items'):
-            if aa_policy.get('name') == aa_policy_name:
+        cache_key = 'aa_policies/%s' % alias
+        aa_policies = ClcServer.lookup_cache.get(cache_key)
+        if aa_policies is None:
+            try:
+                response = clc.v2.API.Call(method='GET',
+                                           url='antiAffinityPolicies/%s' % alias)
+            except APIFailedResponse as ex:
+                return module.fail_json(msg='Unable to fetch anti affinity policies for account: {0}. {1}'.format(
+                    alias, ex.response_text))
+            aa_policies = [[p.get('name'), p.get('id')] for p in response.get('items')]
+            ClcServer.lookup_cache.set(cache_key, aa_policies)
+        for name, policy_id in aa_policies:
+            if name == aa_policy_name:
                 if not aa_policy_id:
-                    aa_policy_id = aa_policy.get('id')
+                    aa_policy_id = policy_id
                 else:
                     return module.fail_json(
                         msg='multiple anti affinity policies were found with policy name : %s' % aa_policy_name)
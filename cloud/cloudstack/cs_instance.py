@@ -200,6 +200,38 @@ options:
       - Poll async jobs until job has finished.
     required: false
     default: true
+  lookup_cache_ttl:
+    description:
+      - Seconds the results of service offering, disk offering, template, ISO, zone and network lookups are kept in
+        a cache file shared by the tasks of a run, keyed by API URL, account, domain and project.
+      - The cache files are kept in a private per-user directory of the system temporary directory; the cache is
+        not used if that directory is not owned by the remote user or is accessible to others.
+      - C(0) disables the cache.
+    required: false
+    default: 0
+    version_added: '2.1'
+  instances:
+    description:
+      - List of instance specs to manage in one task. Each spec is a dict of options of this module (e.g. C(name),
+        C(state), C(template)) overriding the options given to the task.
+      - All deploy, start, stop, restart, restore and destroy jobs are submitted up front and the outstanding jobs
+        are polled together, one C(queryAsyncJobResult) sweep per C(poll_interval).
+      - C(state=expunged) is not supported in this mode.
+    required: false
+    default: null
+    version_added: '2.1'
+  fleet_concurrency:
+    description:
+      - Maximum number of async jobs outstanding at the same time when C(instances) is used.
+    required: false
+    default: 10
+    version_added: '2.1'
+  poll_interval:
+    description:
+      - Seconds between two polls of the outstanding async jobs when C(instances) is used.
+    required: false
+    default: 2
+    version_added: '2.1'
 extends_documentation_fragment: cloudstack
 '''
 
@@ -264,6 +296,17 @@ EXAMPLES = '''
 
 # Remove an instance
 - local_action: cs_instance name=web-vm-1 state=absent
+
+# Rolling restart of many instances, waiting for all restart jobs together
+- local_action:
+    module: cs_instance
+    state: restarted
+    fleet_concurrency: 20
+    instances:
+      - name: web-vm-1
+      - name: web-vm-2
+      - name: web-vm-3
+        state: started
 '''
 
 RETURN = '''
@@ -386,6 +429,17 @@ instance_name:
 '''
 
 import base64
+import hashlib
+import os
+import re
+import stat
+import tempfile
+import time
+
+try:
+    import json
+except ImportError:
+    import simplejson as json
 
 try:
     from cs import CloudStack, CloudStackException, read_config
@@ -397,6 +451,77 @@ except ImportError:
 from ansible.module_utils.cloudstack import *
 
 
+UUID_RE = re.compile(r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$', re.I)
+
+
+class CloudStackLookupCache(object):
+    ''' Short lived on-disk cache of lookup results, shared by the tasks of a run. '''
+
+    def __init__(self, ttl, scope):
+        self.ttl = ttl
+        digest = hashlib.sha1(json.dumps(scope, sort_keys=True)).hexdigest()
+        self.path = None
+        self.data = {}
+        if self.ttl > 0:
+            directory = self._cache_dir()
+            if directory is not None:
+                self.path = os.path.join(directory, '%s.json' % digest)
+                self.data = self._load()
+
+
+    def _cache_dir(self):
+        ''' Private per-user directory for the cache files, None when it cannot be trusted. '''
+        path = os.path.join(tempfile.gettempdir(), 'ansible-cs-lookup-%s' % os.getuid())
+        try:
+            os.mkdir(path, 0700)
+        except OSError:
+            pass
+        try:
+            st = os.lstat(path)
+        except OSError:
+            return None
+        # cached ids choose the zone, template and offering instances are deployed with
+        if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 077:
+            return None
+        return path
+
+
+    def _load(self):
+        try:
+            f = open(self.path)
+            try:
+                return json.load(f)
+            finally:
+                f.close()
+        except (IOError, ValueError):
+            return {}
+
+
+    def get(self, kind, key):
+        entry = self.data.get('%s:%s' % (kind, key))
+        if entry and time.time() - entry['time'] < self.ttl:
+            return entry['value']
+        return None
+
+
+    def set(self, kind, key, value):
+        if self.path is None:
+            return
+        # merge with what other tasks stored in the meantime
+        self.data = self._load()
+        self.data['%s:%s' % (kind, key)] = dict(time=time.time(), value=value)
+        try:
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.path))
+            f = os.fdopen(fd, 'w')
+            try:
+                json.dump(self.data, f)
+            finally:
+                f.close()
+            os.rename(tmp, self.path)
+        except (IOError, OSError):
+            pass
+
+
 class AnsibleCloudStackInstance(AnsibleCloudStack):
 
     def __init__(self, module):
@@ -416,19 +541,65 @@ class AnsibleCloudStackInstance(AnsibleCloudStack):
         self.instance = None
         self.template = None
         self.iso = None
+        self.lookup_cache = CloudStackLookupCache(module.params.get('lookup_cache_ttl'), [
+            getattr(self.cs, 'endpoint', module.params.get('api_url')),
+            module.params.get('account'),
+            module.params.get('domain'),
+            module.params.get('project'),
+        ])
+
+
+    def _lookup(self, kind, identifier, list_func, result_key, match_keys, args=None, name_filter='name'):
+        ''' Find a resource by name, display text or id. The lookup cache is tried
+        first, then the API with an id or name filter, and only when those do not
+        match, the whole collection. '''
+        args = args or {}
+        cache_key = json.dumps([identifier, args], sort_keys=True)
+        res = self.lookup_cache.get(kind, cache_key)
+        if res:
+            return res
+
+        filters = []
+        if UUID_RE.match(identifier):
+            filters.append({'id': identifier})
+        filters.append({name_filter: identifier})
+        filters.append({})
+
+        for f in filters:
+            query = dict(args)
+            query.update(f)
+            items = list_func(**query)
+            if items:
+                for item in items.get(result_key, []):
+                    if identifier in [ item.get(k) for k in match_keys ]:
+                        self.lookup_cache.set(kind, cache_key, item)
+                        return item
+        return None
+
+
+    def get_zone(self, key=None):
+        zone = self.module.params.get('zone')
+        if not self.zone and zone:
+            self.zone = self.lookup_cache.get('zone', zone)
+        if not self.zone:
+            super(AnsibleCloudStackInstance, self).get_zone()
+            if zone:
+                self.lookup_cache.set('zone', zone, self.zone)
+        return self._get_by_key(key, self.zone)
 
 
     def get_service_offering_id(self):
         service_offering = self.module.params.get('service_offering')
 
-        service_offerings = self.cs.listServiceOfferings()
-        if service_offerings:
-            if not service_offering:
+        if not service_offering:
+            service_offerings = self.cs.listServiceOfferings()
+            if service_offerings:
                 return service_offerings['serviceoffering'][0]['id']
-
-            for s in service_offerings['serviceoffering']:
-                if service_offering in [ s['name'], s['id'] ]:
-                    return s['id']
+        else:
+            s = self._lookup('serviceoffering', service_offering, self.cs.listServiceOfferings,
+                             'serviceoffering', [ 'name', 'id' ])
+            if s:
+                return s['id']
         self.module.fail_json(msg="Service offering '%s' not found" % service_offering)
 
 
@@ -451,24 +622,21 @@ class AnsibleCloudStackInstance(AnsibleCloudStack):
                 return self._get_by_key(key, self.template)
 
             args['templatefilter'] = 'executable'
-            templates = self.cs.listTemplates(**args)
-            if templates:
-                for t in templates['template']:
-                    if template in [ t['displaytext'], t['name'], t['id'] ]:
-                        self.template = t
-                        return self._get_by_key(key, self.template)
+            t = self._lookup('template', template, self.cs.listTemplates, 'template',
+                             [ 'displaytext', 'name', 'id' ], args)
+            if t:
+                self.template = t
+                return self._get_by_key(key, self.template)
             self.module.fail_json(msg="Template '%s' not found" % template)
 
         elif iso:
             if self.iso:
                 return self._get_by_key(key, self.iso)
             args['isofilter'] = 'executable'
-            isos = self.cs.listIsos(**args)
-            if isos:
-                for i in isos['iso']:
-                    if iso in [ i['displaytext'], i['name'], i['id'] ]:
-                        self.iso = i
-                        return self._get_by_key(key, self.iso)
+            i = self._lookup('iso', iso, self.cs.listIsos, 'iso', [ 'displaytext', 'name', 'id' ], args)
+            if i:
+                self.iso = i
+                return self._get_by_key(key, self.iso)
             self.module.fail_json(msg="ISO '%s' not found" % iso)
 
 
@@ -478,11 +646,10 @@ class AnsibleCloudStackInstance(AnsibleCloudStack):
         if not disk_offering:
             return None
 
-        disk_offerings = self.cs.listDiskOfferings()
-        if disk_offerings:
-            for d in disk_offerings['diskoffering']:
-                if disk_offering in [ d['displaytext'], d['name'], d['id'] ]:
-                    return d['id']
+        d = self._lookup('diskoffering', disk_offering, self.cs.listDiskOfferings, 'diskoffering',
+                         [ 'displaytext', 'name', 'id' ])
+        if d:
+            return d['id']
         self.module.fail_json(msg="Disk offering '%s' not found" % disk_offering)
 
 
@@ -496,6 +663,12 @@ class AnsibleCloudStackInstance(AnsibleCloudStack):
             args['domainid']    = self.get_domain(key='id')
             args['projectid']   = self.get_project(key='id')
             # Do not pass zoneid, as the instance name must be unique across zones.
+            # keyword matches name and display name (case insensitive substring),
+            # the exact match is done below.
+            if UUID_RE.match(instance_name):
+                args['id']      = instance_name
+            else:
+                args['keyword'] = instance_name
             instances = self.cs.listVirtualMachines(**args)
             if instances:
                 for v in instances['virtualmachine']:
@@ -555,18 +728,14 @@ class AnsibleCloudStackInstance(AnsibleCloudStack):
         args['projectid']   = self.get_project(key='id')
         args['zoneid']      = self.get_zone(key='id')
 
-        networks = self.cs.listNetworks(**args)
-        if not networks:
-            self.module.fail_json(msg="No networks available")
-
         network_ids = []
         network_displaytexts = []
         for network_name in network_names:
-            for n in networks['network']:
-                if network_name in [ n['displaytext'], n['name'], n['id'] ]:
-                    network_ids.append(n['id'])
-                    network_displaytexts.append(n['name'])
-                    break
+            n = self._lookup('network', network_name, self.cs.listNetworks, 'network',
+                             [ 'displaytext', 'name', 'id' ], args, name_filter='keyword')
+            if n:
+                network_ids.append(n['id'])
+                network_displaytexts.append(n['name'])
 
         if len(network_ids) != len(network_names):
             self.module.fail_json(msg="Could not find all networks, networks list found: %s" % network_displaytexts)
@@ -874,6 +1043,7 @@ class AnsibleCloudStackInstance(AnsibleCloudStack):
             if 'errortext' in res:
                 self.module.fail_json(msg="Failed: '%s'" % res['errortext'])
 
+            instance = res
             poll_async = self.module.params.get('poll_async')
             if poll_async:
                 instance = self._poll_job(res, 'virtualmachine')
@@ -900,6 +1070,171 @@ class AnsibleCloudStackInstance(AnsibleCloudStack):
         return self.result
 
 
+class CloudStackFleetError(Exception):
+    ''' Failure of a single instance spec while managing many instances. '''
+
+    def __init__(self, result):
+        Exception.__init__(self, result.get('msg'))
+        self.result = result
+
+
+class CloudStackFleetModule(object):
+    ''' Per spec view of the Ansible module, failures raise CloudStackFleetError
+    so that one spec can not exit the module while other jobs are outstanding. '''
+
+    def __init__(self, module, params):
+        self._module = module
+        self.params = params
+
+    def __getattr__(self, name):
+        return getattr(self._module, name)
+
+    def fail_json(self, **kwargs):
+        raise CloudStackFleetError(kwargs)
+
+
+class AnsibleCloudStackInstanceFleet(object):
+    ''' Manages a list of instance specs, submitting all async jobs up front and
+    polling the outstanding ones together. '''
+
+    FOLLOW_UP = {
+        'started':      'start_instance',
+        'stopped':      'stop_instance',
+        'restarted':    'restart_instance',
+        'restored':     'restore_instance',
+    }
+
+    def __init__(self, module):
+        self.module = module
+        self.params = dict(module.params)
+        self.concurrency = max(1, module.params.get('fleet_concurrency'))
+        self.poll_interval = module.params.get('poll_interval')
+        self.cs = None
+
+
+    def _instance_for(self, spec):
+        # the instance class reads everything from module.params
+        params = dict(self.params)
+        params.update(spec)
+        params['instances'] = None
+        params['poll_async'] = False
+        return AnsibleCloudStackInstance(CloudStackFleetModule(self.module, params))
+
+
+    def validate(self, specs):
+        ''' Fail before any job is submitted when a spec asks for an unknown state. '''
+        choices = self.module.argument_spec['state']['choices']
+        for spec in specs:
+            state = spec.get('state') or self.params.get('state')
+            if state not in choices:
+                self.module.fail_json(msg="value of state must be one of: %s, got: %s" % (', '.join(choices), state),
+                                      instance=spec)
+            if state == 'expunged':
+                self.module.fail_json(msg="state=expunged is not supported with instances", instance=spec)
+
+
+    def submit(self, spec):
+        ''' Run the state transition of a spec without waiting, returns the
+        instance and the async job response if a job was started. '''
+        state = spec.get('state') or self.params.get('state')
+        acs_instance = self._instance_for(spec)
+        if self.cs is None:
+            self.cs = acs_instance.cs
+
+        if state in ['absent', 'destroyed']:
+            res = acs_instance.absent_instance()
+        else:
+            res = acs_instance.present_instance(start_vm=(state != 'stopped'))
+            # a freshly deployed instance is already in its target state
+            if res and 'jobid' not in res and state in self.FOLLOW_UP:
+                res = getattr(acs_instance, self.FOLLOW_UP[state])()
+
+        job = None
+        if res and 'jobid' in res:
+            job = res
+        return acs_instance, res, job
+
+
+    def finish(self, entry, job_result=None):
+        acs_instance = entry['acs_instance']
+        instance = entry['instance']
+        if job_result is not None:
+            instance = job_result.get('virtualmachine', instance)
+            instance = acs_instance.ensure_tags(resource=instance, resource_type='UserVm')
+
+        result = acs_instance.get_result(instance)
+        result['elapsed'] = round(time.time() - entry['started'], 2)
+        if instance and 'state' in instance and instance['state'].lower() == 'error':
+            result['failed'] = True
+            result['msg'] = "Instance named '%s' in error state." % instance.get('name')
+        return result
+
+
+    def failed(self, name, error):
+        result = dict(error)
+        result.update(name=name, failed=True, changed=False)
+        return result
+
+
+    def finish_or_fail(self, entry, job_result=None):
+        try:
+            return self.finish(entry, job_result)
+        except CloudStackFleetError as e:
+            result = self.failed(entry['name'], e.result)
+            result['elapsed'] = round(time.time() - entry['started'], 2)
+            return result
+
+
+    def run(self):
+        specs = list(self.params.get('instances'))
+        self.validate(specs)
+        results = [None] * len(specs)
+        pending = {}
+
+        while specs or pending:
+            # fill up the outstanding jobs
+            while specs and len(pending) < self.concurrency:
+                index = len(results) - len(specs)
+                spec = specs.pop(0)
+                started = time.time()
+                try:
+                    acs_instance, instance, job = self.submit(spec)
+                except CloudStackException as e:
+                    results[index] = dict(name=spec.get('name'), failed=True, msg='CloudStackException: %s' % str(e))
+                    continue
+                except CloudStackFleetError as e:
+                    results[index] = self.failed(spec.get('name'), e.result)
+                    continue
+                entry = dict(acs_instance=acs_instance, instance=instance, started=started,
+                             name=acs_instance.module.params.get('name'))
+                if job is None:
+                    results[index] = self.finish_or_fail(entry)
+                else:
+                    pending[job['jobid']] = (index, entry)
+
+            if not pending:
+                continue
+
+            time.sleep(self.poll_interval)
+            for jobid in list(pending.keys()):
+                res = self.cs.queryAsyncJobResult(jobid=jobid)
+                if res.get('jobstatus', 0) == 0 or 'jobresult' not in res:
+                    continue
+                index, entry = pending.pop(jobid)
+                if 'errortext' in res['jobresult']:
+                    results[index] = dict(name=entry['name'], failed=True,
+                                          msg="Failed: '%s'" % res['jobresult']['errortext'],
+                                          elapsed=round(time.time() - entry['started'], 2))
+                else:
+                    results[index] = self.finish_or_fail(entry, res['jobresult'])
+
+        return {
+            'changed': any(r.get('changed') for r in results),
+            'failed': any(r.get('failed') for r in results),
+            'instances': results,
+        }
+
+
 def main():
     argument_spec = cs_argument_spec()
     argument_spec.update(dict(
@@ -933,6 +1268,10 @@ def main():
         force = dict(type='bool', default=False),
         tags = dict(type='list', aliases=[ 'tag' ], default=None),
         poll_async = dict(type='bool', default=True),
+        lookup_cache_ttl = dict(type='int', default=0),
+        instances = dict(type='list', default=None),
+        fleet_concurrency = dict(type='int', default=10),
+        poll_interval = dict(type='int', default=2),
     ))
 
     required_together = cs_required_together()
@@ -944,7 +1283,7 @@ def main():
         argument_spec=argument_spec,
         required_together=required_together,
         required_one_of = (
-            ['display_name', 'name'],
+            ['display_name', 'name', 'instances'],
         ),
         mutually_exclusive = (
             ['template', 'iso'],
@@ -955,6 +1294,15 @@ def main():
     if not has_lib_cs:
         module.fail_json(msg="python library cs required: pip install cs")
 
+    if module.params.get('instances'):
+        try:
+            result = AnsibleCloudStackInstanceFleet(module).run()
+        except CloudStackException as e:
+            module.fail_json(msg='CloudStackException: %s' % str(e))
+        if result['failed']:
+            module.fail_json(msg="Some instances failed", **result)
+        module.exit_json(**result)
+
     try:
         acs_instance = AnsibleCloudStackInstance(module)
 
@@ -219,12 +219,18 @@ class AnsibleCloudStackInstanceFacts(AnsibleCloudStack):
             args['domainid']    = self.get_domain(key='id')
             args['projectid']   = self.get_project(key='id')
             # Do not pass zoneid, as the instance name must be unique across zones.
-            instances = self.cs.listVirtualMachines(**args)
-            if instances:
-                for v in instances['virtualmachine']:
-                    if instance_name.lower() in [ v['name'].lower(), v['displayname'].lower(), v['id'] ]:
-                        self.instance = v
-                        break
+            # keyword matches name and display name (case insensitive substring),
+            # an instance given by id is only found by the full listing.
+            for keyword in [ instance_name, None ]:
+                args['keyword'] = keyword
+                instances = self.cs.listVirtualMachines(**args)
+                if instances:
+                    for v in instances['virtualmachine']:
+                        if instance_name.lower() in [ v['name'].lower(), v['displayname'].lower(), v['id'] ]:
+                            self.instance = v
+                            break
+                if self.instance:
+                    break
         return self.instance
 
 
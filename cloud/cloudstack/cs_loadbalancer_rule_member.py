@@ -280,6 +280,9 @@ class AnsibleCloudStackLBRuleMember(AnsibleCloudStack):
             return rule
 
         args = self._get_common_args()
+        if len(to_change) == 1:
+            # a single VM is cheaper to filter server side, the exact match is done below.
+            args['keyword'] = list(to_change)[0]
         vms = self.cs.listVirtualMachines(**args)
         to_change_ids = []
         for name in to_change:
@@ -405,13 +405,18 @@ class AnsibleCloudStackNetwork(AnsibleCloudStack):
             args['projectid']   = self.get_project(key='id')
             args['account']     = self.get_account(key='name')
             args['domainid']    = self.get_domain(key='id')
-
-            networks = self.cs.listNetworks(**args)
-            if networks:
-                for n in networks['network']:
-                    if network in [ n['name'], n['displaytext'], n['id']]:
-                        self.network = n
-                        break
+            # keyword matches name and display text (case insensitive substring),
+            # a network given by id is only found by the full listing.
+            for keyword in [ network, None ]:
+                args['keyword'] = keyword
+                networks = self.cs.listNetworks(**args)
+                if networks:
+                    for n in networks['network']:
+                        if network in [ n['name'], n['displaytext'], n['id']]:
+                            self.network = n
+                            break
+                if self.network:
+                    break
         return self.network
 
 
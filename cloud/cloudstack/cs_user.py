@@ -237,6 +237,7 @@ class AnsibleCloudStackUser(AnsibleCloudStack):
         if not self.user:
             args                = {}
             args['domainid']    = self.get_domain('id')
+            args['username']    = self.module.params.get('username')
             users = self.cs.listUsers(**args)
             if users:
                 user_name = self.module.params.get('username')
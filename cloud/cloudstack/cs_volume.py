@@ -278,6 +278,8 @@ class AnsibleCloudStackVolume(AnsibleCloudStack):
             args['zoneid'] = self.get_zone(key='id')
             args['displayvolume'] = self.module.params.get('display_volume')
             args['type'] = 'DATADISK'
+            # keyword is a case insensitive substring match, the exact match is done below.
+            args['keyword'] = self.module.params.get('name')
 
             volumes = self.cs.listVolumes(**args)
             if volumes:
@@ -30,8 +30,8 @@ author: "Kevin Carter (@cloudnull)"
 options:
     name:
         description:
-          - Name of a container.
-        required: true
+          - Name of a container. Required unless C(containers) is used.
+        required: false
     backing_store:
         choices:
           - dir
@@ -149,11 +149,41 @@ options:
         choices:
           - gzip
           - bzip2
+          - xz
+          - zstd
           - none
         description:
           - Type of compression to use when creating an archive of a running
-            container.
+            container. When available the multi-threaded compressors pigz,
+            pbzip2, pixz or "xz -T0" and "zstd -T0" are used instead of the
+            single threaded ones.
         default: gzip
+    archive_mode:
+        choices:
+          - copy
+          - stream
+        description:
+          - How the archive is created. C(copy) rsyncs the container into a
+            temporary directory and archives the copy. C(stream) archives
+            straight from the container directory, or from the LVM snapshot or
+            overlayfs mount, without the intermediate copy. LVM backed
+            containers are restored to their original state as soon as the
+            snapshot is taken.
+        default: copy
+        version_added: "2.1"
+    archive_incremental:
+        choices:
+          - true
+          - false
+        description:
+          - Create incremental archives using GNU tar listed incremental
+            snapshots. The first archive is a full archive named after the
+            container and the snapshot file is kept next to it as
+            "<name>.snar". Later runs write only the changes since the
+            previous archive to "<name>.<UTC timestamp>.<extension>".
+            Requires C(archive_mode=stream).
+        default: false
+        version_added: "2.1"
     state:
         choices:
           - started
@@ -173,6 +203,28 @@ options:
         description:
           - list of 'key=value' options to use when configuring a container.
         required: false
+    containers:
+        description:
+          - List of containers to manage in one task. Each item is a
+            dictionary with a C(name) and any of the options of this module,
+            which override the options given to the task for that container.
+            An item can also set C(clone_from) to create the container as a
+            clone of an existing base container when it does not exist.
+            The base container is stopped once for all of its clones, which
+            use snapshots when the base is LVM or overlayfs backed, and is
+            restored to its original state afterwards. Containers are then
+            converged to their state concurrently. Mutually exclusive with
+            C(name).
+        required: false
+        default: null
+        version_added: "2.1"
+    workers:
+        description:
+          - Number of containers created, cloned or converged at the same
+            time when C(containers) is used.
+        required: false
+        default: 5
+        version_added: "2.1"
 requirements:
   - 'lxc >= 1.0 # OS package'
   - 'python >= 2.6 # OS Package'
@@ -194,6 +246,12 @@ notes:
     tarball of the running container. The "archive" option supports LVM backed
     containers and will create a snapshot of the running container when
     creating the archive.
+  - With "archive_mode" set to "stream" the archive is written directly from
+    the container data, which avoids copying the full rootfs before it is
+    compressed.
+  - When "containers" is used, the containers are enumerated once and the
+    result is reported per container in "lxc_containers". Archives are
+    written one at a time as each one already uses all cores to compress.
   - If your distro does not have a package for "python2-lxc", which is a
     requirement for this module, it can be installed from source at
     "https://github.com/lxc/python2-lxc" or installed via pip using the package
@@ -307,6 +365,17 @@ EXAMPLES = """
           echo 'hello world.' | tee /opt/found-started
       fi
 
+# Create a nightly incremental archive of an lvm container, streamed from
+# the snapshot and compressed with all available cores.
+- name: Create an incremental container archive
+  lxc_container:
+    name: test-container-lvm
+    archive: true
+    archive_path: /opt/archives
+    archive_mode: stream
+    archive_incremental: true
+    archive_compression: zstd
+
 # Create an archive of an existing container, save the archive to a defined
 # path and then destroy it.
 - name: Archive container
@@ -379,9 +448,35 @@ EXAMPLES = """
     - test-container-new-archive
     - test-container-new-archive-clone
     - test-container-new-archive-destroyed-clone
+
+# Bring up a set of containers in one task, cloned from a shared lvm base
+# container with snapshots, four at a time.
+- name: Create and start web containers from a base container
+  lxc_container:
+    workers: 4
+    containers:
+      - name: web1
+        clone_from: base-trusty
+      - name: web2
+        clone_from: base-trusty
+      - name: web3
+        clone_from: base-trusty
+        state: stopped
+      - name: db1
+        backing_store: lvm
+        template: ubuntu
+        container_config:
+          - "lxc.cgroup.memory.limit_in_bytes=4G"
 """
 
 RETURN="""
+lxc_containers:
+    description: container information of each container, with the same
+                 fields as lxc_container plus changed, and failed and msg
+                 when the container could not be managed
+    returned: success, when containers is used
+    type: list
+    sample: [{"name": "web1", "state": "running", "changed": true}]
 lxc_container:
     description: container information
     returned: success
@@ -417,6 +512,36 @@ lxc_container:
             returned: success, when archive is true
             type: string
             sample: "/tmp/test-container-config.tar"
+        archive_type:
+            description: whether the archive is a full or an incremental archive
+            returned: success, when archive is true
+            type: string
+            sample: "full"
+        archive_source_bytes:
+            description: size of the uncompressed tar stream
+            returned: success, when archive is true
+            type: int
+            sample: 1073741824
+        archive_bytes:
+            description: size of the archive written
+            returned: success, when archive is true
+            type: int
+            sample: 268435456
+        archive_seconds:
+            description: time spent writing the archive
+            returned: success, when archive is true
+            type: float
+            sample: 12.5
+        archive_throughput_mb:
+            description: uncompressed megabytes archived per second
+            returned: success, when archive is true
+            type: float
+            sample: 81.92
+        archive_compression_ratio:
+            description: uncompressed size divided by the archive size
+            returned: success, when archive is true
+            type: float
+            sample: 4.0
         clone:
             description: if the container was cloned
             returned: success, when clone_name is specified
@@ -424,6 +549,9 @@ lxc_container:
             sample: True
 """
 
+import Queue
+import threading
+
 try:
     import lxc
 except ImportError:
@@ -433,19 +561,33 @@ else:
 
 
 # LXC_COMPRESSION_MAP is a map of available compression types when creating
-# an archive of a container.
+# an archive of a container. The "parallel" list holds multi-threaded
+# compressors, in order of preference, used through tar when installed.
 LXC_COMPRESSION_MAP = {
     'gzip': {
         'extension': 'tar.tgz',
-        'argument': '-czf'
+        'argument': '-czf',
+        'parallel': ['pigz']
     },
     'bzip2': {
         'extension': 'tar.bz2',
-        'argument': '-cjf'
+        'argument': '-cjf',
+        'parallel': ['pbzip2']
+    },
+    'xz': {
+        'extension': 'tar.xz',
+        'argument': '-cJf',
+        'parallel': ['pixz', 'xz -T0']
+    },
+    'zstd': {
+        'extension': 'tar.zst',
+        'argument': '--zstd -cf',
+        'parallel': ['zstd -T0']
     },
     'none': {
         'extension': 'tar',
-        'argument': '-cf'
+        'argument': '-cf',
+        'parallel': []
     }
 }
 
@@ -512,6 +654,11 @@ LXC_LOGGING_LEVELS = {
 }
 
 
+# LXC_ARCHIVE_LOCK serializes archive creation in bulk mode, which changes
+# the process umask while tar runs.
+LXC_ARCHIVE_LOCK = threading.Lock()
+
+
 # LXC_ANSIBLE_STATES is a map of states that contain values of methods used
 # when a particular state is evoked.
 LXC_ANSIBLE_STATES = {
@@ -590,14 +737,49 @@ def create_script(command):
         os.remove(script_file)
 
 
+class LxcContainerError(Exception):
+    """Failure of a single container while managing many containers."""
+
+    def __init__(self, result):
+        Exception.__init__(self, result.get('msg'))
+        self.result = result
+
+
+class LxcBulkModule(object):
+    def __init__(self, module, params):
+        """Per container view of the Ansible Module used in bulk mode.
+
+        Failures raise ``LxcContainerError`` so that one container can not
+        exit the module while other containers are being managed.
+
+        :param module: Processed Ansible Module.
+        :type module: ``object``
+        :param params: Options of the container.
+        :type params: ``dict``
+        """
+        self._module = module
+        self.params = params
+
+    def __getattr__(self, name):
+        return getattr(self._module, name)
+
+    def fail_json(self, **kwargs):
+        raise LxcContainerError(kwargs)
+
+
 class LxcContainerManagement(object):
-    def __init__(self, module):
+    def __init__(self, module, known_containers=None):
         """Management of LXC containers via Ansible.
 
         :param module: Processed Ansible Module.
         :type module: ``object``
+        :param known_containers: Shared set of existing container names, used
+                                 instead of listing the containers on every
+                                 check.
+        :type known_containers: ``set``
         """
         self.module = module
+        self.known_containers = known_containers
         self.state = self.module.params.get('state', None)
         self.state_change = False
         self.lxc_vg = None
@@ -624,8 +806,7 @@ class LxcContainerManagement(object):
             num += 1
         return num
 
-    @staticmethod
-    def _container_exists(container_name):
+    def _container_exists(self, container_name):
         """Check if a container exists.
 
         :param container_name: Name of the container.
@@ -633,6 +814,9 @@ class LxcContainerManagement(object):
         :returns: True or False if the container is found.
         :rtype: ``bol``
         """
+        if self.known_containers is not None:
+            return container_name in self.known_containers
+
         if [i for i in lxc.list_containers() if i == container_name]:
             return True
         else:
@@ -802,6 +986,30 @@ class LxcContainerManagement(object):
             self.state_change = True
             self.container.stop()
 
+        self._lxc_clone()
+
+        # Restore the original state of the origin container if it was
+        # not in a stopped state.
+        self._restore_clone_origin(container_state)
+
+        return True
+
+    def _restore_clone_origin(self, container_state):
+        """Restore the origin container of a clone to its prior state.
+
+        :param container_state: State of the container before cloning.
+        :type container_state: ``str``
+        """
+
+        if container_state == 'running':
+            self.container.start()
+        elif container_state == 'frozen':
+            self.container.start()
+            self.container.freeze()
+
+    def _lxc_clone(self):
+        """Run lxc-clone of the stopped container to `clone_name`."""
+
         build_command = [
             self.module.get_bin_path('lxc-clone', True),
         ]
@@ -832,15 +1040,10 @@ class LxcContainerManagement(object):
             )
         else:
             self.state_change = True
-            # Restore the original state of the origin container if it was
-            # not in a stopped state.
-            if container_state == 'running':
-                self.container.start()
-            elif container_state == 'frozen':
-                self.container.start()
-                self.container.freeze()
-
-        return True
+            if self.known_containers is not None:
+                self.known_containers.add(
+                    self.module.params.get('clone_name')
+                )
 
     def _create(self):
         """Create a new LXC container.
@@ -902,6 +1105,8 @@ class LxcContainerManagement(object):
             )
         else:
             self.state_change = True
+            if self.known_containers is not None:
+                self.known_containers.add(self.container_name)
 
     def _container_data(self):
         """Returns a dict of container information.
@@ -992,9 +1197,8 @@ class LxcContainerManagement(object):
         """
 
         if self.module.params.get('archive') in BOOLEANS_TRUE:
-            self.archive_info = {
-                'archive': self._container_create_tar()
-            }
+            with LXC_ARCHIVE_LOCK:
+                self.archive_info = self._container_create_tar()
 
     def _check_clone(self):
         """Create a compressed archive of a container.
@@ -1036,6 +1240,8 @@ class LxcContainerManagement(object):
 
             if self.container.destroy():
                 self.state_change = True
+                if self.known_containers is not None:
+                    self.known_containers.discard(self.container_name)
 
             # post destroy attempt sleep for 1 second.
             time.sleep(1)
@@ -1359,11 +1565,33 @@ class LxcContainerManagement(object):
                     % (vg, lv_name, mount_point)
             )
 
-    def _create_tar(self, source_dir):
-        """Create an archive of a given ``source_dir`` to ``output_path``.
+    def _find_compressor(self, compression_type):
+        """Return the first installed multi-threaded compressor, if any.
 
-        :param source_dir:  Path to the directory to be archived.
-        :type source_dir: ``str``
+        :param compression_type: Entry of ``LXC_COMPRESSION_MAP``.
+        :type compression_type: ``dict``
+        :returns: compressor command or None
+        :rtype: ``str``
+        """
+
+        for program in compression_type['parallel']:
+            program = program.split()
+            bin_path = self.module.get_bin_path(program[0])
+            if bin_path:
+                return ' '.join([bin_path] + program[1:])
+
+    def _create_tar(self, sources):
+        """Create an archive of the given ``sources`` in ``archive_path``.
+
+        The returned dictionary holds the archive name along with the size of
+        the tar stream, the archive size, the throughput and the compression
+        ratio.
+
+        :param sources: List of ``(directory, member)`` tuples to archive,
+                        each member is relative to its directory.
+        :type sources: ``list``
+        :returns: archive information
+        :rtype: ``dict``
         """
 
         old_umask = os.umask(0077)
@@ -1375,29 +1603,69 @@ class LxcContainerManagement(object):
         archive_compression = self.module.params.get('archive_compression')
         compression_type = LXC_COMPRESSION_MAP[archive_compression]
 
+        archive_base = os.path.join(archive_path, self.container_name)
+        snapshot_file = '%s.snar' % archive_base
+        archive_type = 'full'
+        incremental = self.module.params.get('archive_incremental')
+        if incremental and os.path.exists(snapshot_file):
+            archive_type = 'incremental'
+            archive_base = '%s.%s' % (
+                archive_base,
+                time.strftime('%Y%m%d%H%M%S', time.gmtime())
+            )
+
         # remove trailing / if present.
         archive_name = '%s.%s' % (
-            os.path.join(
-                archive_path,
-                self.container_name
-            ),
+            archive_base,
             compression_type['extension']
         )
 
         build_command = [
             self.module.get_bin_path('tar', True),
-            '--directory=%s' % os.path.realpath(
-                os.path.expanduser(source_dir)
-            ),
-            compression_type['argument'],
-            archive_name,
-            '.'
+            '--totals'
         ]
 
+        compressor = self._find_compressor(compression_type)
+        if compressor:
+            build_command.extend([
+                '--use-compress-program="%s"' % compressor,
+                '-cf',
+                archive_name
+            ])
+        else:
+            build_command.extend([
+                compression_type['argument'],
+                archive_name
+            ])
+
+        # tar updates the snapshot file in place, work on a copy so a failed
+        # run does not break the next incremental archive.
+        new_snapshot_file = '%s.new' % snapshot_file
+        if incremental:
+            if os.path.exists(snapshot_file):
+                shutil.copy2(snapshot_file, new_snapshot_file)
+            elif os.path.exists(new_snapshot_file):
+                os.remove(new_snapshot_file)
+            # LVM snapshots are mounted from a new device every time.
+            build_command.extend([
+                '--listed-incremental=%s' % new_snapshot_file,
+                '--no-check-device'
+            ])
+
+        for directory, member in sources:
+            build_command.extend([
+                '--directory=%s' % os.path.realpath(
+                    os.path.expanduser(directory)
+                ),
+                member
+            ])
+
+        started = time.time()
         rc, stdout, err = self._run_command(
             build_command=build_command,
             unsafe_shell=True
         )
+        elapsed = time.time() - started
 
         os.umask(old_umask)
 
@@ -1409,7 +1677,33 @@ class LxcContainerManagement(object):
                 command=' '.join(build_command)
             )
 
-        return archive_name
+        if incremental:
+            os.rename(new_snapshot_file, snapshot_file)
+
+        archive_bytes = os.path.getsize(archive_name)
+        source_bytes = archive_bytes
+        totals = re.search(r'Total bytes written: (\d+)', err or '')
+        if totals:
+            source_bytes = int(totals.group(1))
+
+        archive_info = {
+            'archive': archive_name,
+            'archive_type': archive_type,
+            'archive_source_bytes': source_bytes,
+            'archive_bytes': archive_bytes,
+            'archive_seconds': round(elapsed, 2),
+            'archive_throughput_mb': None,
+            'archive_compression_ratio': None
+        }
+        if elapsed > 0:
+            archive_info['archive_throughput_mb'] = round(
+                source_bytes / 1048576.0 / elapsed, 2
+            )
+        if archive_bytes > 0:
+            archive_info['archive_compression_ratio'] = round(
+                source_bytes / float(archive_bytes), 2
+            )
+        return archive_info
 
     def _lvm_lv_remove(self, lv_name):
         """Remove an LV.
@@ -1517,21 +1811,49 @@ class LxcContainerManagement(object):
                     % (lowerdir, upperdir, mount_point, build_command)
             )
 
+    def _restore_state(self, container_state):
+        """Restore a frozen or stopped container to its original state.
+
+        :param container_state: State of the container before archiving.
+        :type container_state: ``str``
+        """
+
+        if container_state == 'running':
+            current_state = self._get_state()
+            if current_state == 'frozen':
+                self.container.unfreeze()
+            elif current_state != 'running':
+                self.container.start()
+
     def _container_create_tar(self):
         """Create a tar archive from an LXC container.
 
         The process is as follows:
             * Stop or Freeze the container
             * Create temporary dir
-            * Copy container and config to temporary directory
+            * Copy container and config to temporary directory, unless
+              streaming
             * If LVM backed:
                 * Create LVM snapshot of LV backing the container
                 * Mount the snapshot to tmpdir/rootfs
             * Restore the state of the container
-            * Create tar of tmpdir
+            * Create tar of tmpdir, or of the container directory, snapshot or
+              overlayfs mount when streaming
             * Clean up
+
+        When streaming an LVM backed container, the container is restored as
+        soon as the snapshot is taken instead of after the tar is written.
         """
 
+        stream = self.module.params.get('archive_mode') == 'stream'
+        if self.module.params.get('archive_incremental') and not stream:
+            self.failure(
+                error='Incremental archives require streaming',
+                rc=1,
+                msg='archive_incremental requires archive_mode=stream, the'
+                    ' copy made by archive_mode=copy changes every file.'
+            )
+
         # Create a temp dir
         temp_dir = tempfile.mkdtemp()
 
@@ -1562,13 +1884,15 @@ class LxcContainerManagement(object):
                     self.container.stop()
 
             # Sync the container data from the container_path to work_dir
-            self._rsync_data(lxc_rootfs, temp_dir)
+            if not stream:
+                self._rsync_data(lxc_rootfs, temp_dir)
+
+            if block_backed or overlayfs_backed:
+                if not os.path.exists(mount_point):
+                    os.makedirs(mount_point)
 
             if block_backed:
                 if snapshot_name not in self._lvm_lv_list():
-                    if not os.path.exists(mount_point):
-                        os.makedirs(mount_point)
-
                     # Take snapshot
                     size, measurement = self._get_lv_size(
                         lv_name=self.container_name
@@ -1602,7 +1926,22 @@ class LxcContainerManagement(object):
 
             # Set the state as changed and set a new fact
             self.state_change = True
-            return self._create_tar(source_dir=work_dir)
+            if not stream:
+                return self._create_tar(sources=[(work_dir, '.')])
+
+            if block_backed:
+                # The snapshot is consistent, let the container run again.
+                self._restore_state(container_state)
+
+            if block_backed or overlayfs_backed:
+                sources = [
+                    (os.path.dirname(self.container.config_file_name),
+                     './config'),
+                    (work_dir, './rootfs')
+                ]
+            else:
+                sources = [(os.path.dirname(lxc_rootfs), '.')]
+            return self._create_tar(sources=sources)
         finally:
             if block_backed or overlayfs_backed:
                 # unmount snapshot
@@ -1613,11 +1952,7 @@ class LxcContainerManagement(object):
                 self._lvm_lv_remove(snapshot_name)
 
             # Restore original state of container
-            if container_state == 'running':
-                if self._get_state() == 'frozen':
-                    self.container.unfreeze()
-                else:
-                    self.container.start()
+            self._restore_state(container_state)
 
             # Remove tmpdir
             shutil.rmtree(temp_dir)
@@ -1661,14 +1996,266 @@ class LxcContainerManagement(object):
         )
 
 
+class LxcContainerBulkManagement(object):
+    def __init__(self, module):
+        """Management of many LXC containers in one Ansible task.
+
+        :param module: Processed Ansible Module.
+        :type module: ``object``
+        """
+        self.module = module
+        self.workers = max(1, self.module.params.get('workers'))
+        self.known_containers = set(lxc.list_containers())
+        self.entries = [
+            self._entry_params(entry)
+            for entry in self.module.params.get('containers')
+        ]
+        self.outcomes = dict()
+
+    def _entry_params(self, entry):
+        """Return the options of one item of `containers`.
+
+        :param entry: Item of the `containers` list.
+        :type entry: ``dict``
+        :returns: the module options overridden by the item, and the item
+        :rtype: ``tuple``
+        """
+
+        if not isinstance(entry, dict) or not entry.get('name'):
+            self.module.fail_json(
+                msg='Each item of containers must be a dictionary with a'
+                    ' name: %s' % entry
+            )
+
+        argument_spec = self.module.argument_spec
+        allowed = set(argument_spec) - set(['containers', 'workers'])
+        unknown = set(entry) - allowed - set(['clone_from'])
+        if unknown:
+            self.module.fail_json(
+                msg='Unsupported options %s for container [ %s ]'
+                    % (', '.join(sorted(unknown)), entry['name'])
+            )
+
+        params = dict(
+            (k, v) for k, v in self.module.params.items() if k in allowed
+        )
+        params['clone_from'] = None
+        params.update(entry)
+        for key, value in entry.items():
+            if argument_spec.get(key, {}).get('type') == 'bool':
+                params[key] = self.module.boolean(value)
+            elif argument_spec.get(key, {}).get('type') == 'str':
+                params[key] = str(value)
+            choices = argument_spec.get(key, {}).get('choices')
+            if choices and params[key] not in choices:
+                self.module.fail_json(
+                    msg='Value of %s must be one of: %s, got: %s for'
+                        ' container [ %s ]'
+                        % (key, ', '.join(choices), value, entry['name'])
+                )
+
+        if not entry.get('lv_name'):
+            params['lv_name'] = entry['name']
+
+        if params.get('archive') and not params.get('archive_path'):
+            self.module.fail_json(
+                msg='archive_path is required to archive container [ %s ]'
+                    % entry['name']
+            )
+        return params, entry
+
+    def _manager(self, params):
+        """Return a container manager using the given options.
+
+        :param params: Options of the container.
+        :type params: ``dict``
+        """
+
+        return LxcContainerManagement(
+            module=LxcBulkModule(self.module, params),
+            known_containers=self.known_containers
+        )
+
+    def _run_concurrently(self, func, items):
+        """Run ``func`` on every item with a pool of `workers` threads.
+
+        :param func: Function called with each item.
+        :type func: ``object``
+        :param items: Items to process.
+        :type items: ``list``
+        :returns: list of ``(result, error)`` in the order of ``items``
+        :rtype: ``list``
+        """
+
+        results = [None] * len(items)
+        work = Queue.Queue()
+        for index, item in enumerate(items):
+            work.put((index, item))
+
+        def worker():
+            while True:
+                try:
+                    index, item = work.get_nowait()
+                except Queue.Empty:
+                    return
+                try:
+                    results[index] = (func(item), None)
+                except LxcContainerError as e:
+                    results[index] = (None, e.result)
+                except Exception as e:
+                    results[index] = (None, {'msg': str(e)})
+
+        threads = [
+            threading.Thread(target=worker)
+            for _ in xrange(min(self.workers, len(items)))
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def _fail_container(self, name, error):
+        error = dict(error)
+        error.update(name=name, failed=True, changed=False)
+        self.outcomes[name] = error
+
+    def _clone_base(self, base, targets):
+        """Clone all missing containers of one base container.
+
+        The base is stopped once, the clones run concurrently and the base is
+        restored to its original state afterwards. LVM and overlayfs backed
+        bases are cloned with snapshots unless the item sets
+        `clone_snapshot` or `backing_store`.
+
+        :param base: Name of the base container.
+        :type base: ``str``
+        :param targets: ``(params, entry)`` of the containers to clone.
+        :type targets: ``list``
+        """
+
+        if base not in self.known_containers:
+            for params, entry in targets:
+                self._fail_container(params['name'], {
+                    'msg': 'The clone_from container [ %s ] does not exist'
+                           % base
+                })
+            return
+
+        base_params = dict(targets[0][0], name=base, lv_name=base)
+        base_manager = self._manager(base_params)
+        base_rootfs = base_manager.container.get_config_item('lxc.rootfs')
+        if base_rootfs.startswith(os.path.join(os.sep, 'dev')):
+            base_backing_store = 'lvm'
+        elif base_rootfs.startswith('overlayfs'):
+            base_backing_store = 'overlayfs'
+        else:
+            base_backing_store = None
+
+        def clone(target):
+            params, entry = target
+            clone_params = dict(
+                params,
+                name=base,
+                lv_name=base,
+                clone_name=params['name']
+            )
+            if base_backing_store:
+                if 'backing_store' not in entry:
+                    clone_params['backing_store'] = base_backing_store
+                if 'clone_snapshot' not in entry:
+                    clone_params['clone_snapshot'] = True
+            self._manager(clone_params)._lxc_clone()
+
+        base_state = base_manager._get_state()
+        try:
+            if base_state != 'stopped':
+                base_manager.container.stop()
+            results = self._run_concurrently(clone, targets)
+        finally:
+            base_manager._restore_clone_origin(base_state)
+
+        for (params, entry), (result, error) in zip(targets, results):
+            if error:
+                self._fail_container(params['name'], error)
+
+    def _converge(self, target):
+        """Bring one container to its state.
+
+        :param target: ``(params, entry)`` of the container.
+        :type target: ``tuple``
+        :returns: container information
+        :rtype: ``dict``
+        """
+
+        params, entry = target
+        manager = self._manager(params)
+        getattr(manager, LXC_ANSIBLE_STATES[params['state']])()
+
+        outcome = manager._container_data()
+        if manager.archive_info:
+            outcome.update(manager.archive_info)
+        if manager.clone_info:
+            outcome.update(manager.clone_info)
+        outcome['changed'] = manager.state_change
+        return outcome
+
+    def run(self):
+        """Run the main method."""
+
+        # Clone the missing containers of each base container first.
+        bases = dict()
+        cloned = set()
+        for params, entry in self.entries:
+            base = params.get('clone_from')
+            if base and params['name'] not in self.known_containers:
+                if params['state'] == 'absent':
+                    continue
+                bases.setdefault(base, []).append((params, entry))
+                cloned.add(params['name'])
+
+        for base, targets in bases.items():
+            self._clone_base(base, targets)
+
+        targets = [
+            target for target in self.entries
+            if target[0]['name'] not in self.outcomes
+        ]
+        results = self._run_concurrently(self._converge, targets)
+        for (params, entry), (outcome, error) in zip(targets, results):
+            if error:
+                self._fail_container(params['name'], error)
+            else:
+                if params['name'] in cloned:
+                    outcome['changed'] = True
+                    outcome['cloned_from'] = params['clone_from']
+                self.outcomes[params['name']] = outcome
+
+        outcomes = [
+            self.outcomes[params['name']] for params, entry in self.entries
+        ]
+        failed = [o['name'] for o in outcomes if o.get('failed')]
+        changed = any(o.get('changed') for o in outcomes)
+        if failed:
+            self.module.fail_json(
+                msg='Failed to manage containers: %s' % ', '.join(failed),
+                changed=changed,
+                lxc_containers=outcomes
+            )
+
+        self.module.exit_json(
+            changed=changed,
+            lxc_containers=outcomes
+        )
+
+
 def main():
     """Ansible Main module."""
 
     module = AnsibleModule(
         argument_spec=dict(
             name=dict(
-                type='str',
-                required=True
+                type='str'
             ),
             template=dict(
                 type='str',
@@ -1748,9 +2335,30 @@ def main():
             archive_compression=dict(
                 choices=LXC_COMPRESSION_MAP.keys(),
                 default='gzip'
+            ),
+            archive_mode=dict(
+                choices=['copy', 'stream'],
+                default='copy'
+            ),
+            archive_incremental=dict(
+                type='bool',
+                default='false'
+            ),
+            containers=dict(
+                type='list'
+            ),
+            workers=dict(
+                type='int',
+                default=5
             )
         ),
         supports_check_mode=False,
+        required_one_of=[
+            ['name', 'containers']
+        ],
+        mutually_exclusive=[
+            ['name', 'containers']
+        ],
         required_if = ([
             ('archive', True, ['archive_path'])
         ]),
@@ -1761,6 +2369,9 @@ def main():
             msg='The `lxc` module is not importable. Check the requirements.'
         )
 
+    if module.params.get('containers'):
+        LxcContainerBulkManagement(module=module).run()
+
     lv_name = module.params.get('lv_name')
     if not lv_name:
         module.params['lv_name'] = module.params.get('name')
@@ -40,8 +40,9 @@ options:
   vmid:
     description:
       - the instance id
+      - required unless C(containers) is used
     default: null
-    required: true
+    required: false
   validate_certs:
     description:
       - enable / disable https certificate verification
@@ -155,6 +156,23 @@ options:
      - Indicate desired state of the instance
     choices: ['present', 'started', 'absent', 'stopped', 'restarted']
     default: present
+  containers:
+    description:
+      - list of instances to manage in one task, each a dict with C(vmid) and any of the instance
+        options above (C(node), C(hostname), C(ostemplate), C(state), ...)
+      - options not set in an entry are taken from the module options
+      - the cluster resources are read once, the tasks of all instances are submitted concurrently
+        and the running tasks are polled with one request per node
+    default: null
+    required: false
+    version_added: "2.1"
+  workers:
+    description:
+      - number of API requests submitted at the same time with C(containers)
+    default: 8
+    required: false
+    type: integer
+    version_added: "2.1"
 notes:
   - Requires proxmoxer and requests modules on host. This modules can be installed with pip.
 requirements: [ "proxmoxer", "requests" ]
@@ -185,10 +203,25 @@ EXAMPLES = '''
 
 # Remove container
 - proxmox: vmid=100 api_user='root@pam' api_password='1q2w3e' api_host='node1' state=absent
+
+# Create and start several containers across nodes in one task
+- proxmox:
+    api_user: root@pam
+    api_password: 1q2w3e
+    api_host: node1
+    password: 123456
+    ostemplate: 'local:vztmpl/ubuntu-14.04-x86_64.tar.gz'
+    timeout: 300
+    containers:
+      - { vmid: 101, node: uk-mc01, hostname: web1.example.org }
+      - { vmid: 102, node: uk-mc02, hostname: web2.example.org }
+      - { vmid: 103, node: uk-mc03, hostname: db1.example.org, memory: 2048 }
 '''
 
 import os
 import time
+import threading
+import Queue
 
 try:
   from proxmoxer import ProxmoxAPI
@@ -207,8 +240,20 @@ def content_check(proxmox, node, ostemplate, storage):
 def node_check(proxmox, node):
   return [ True for nd in proxmox.nodes.get() if nd['node'] == node ]
 
-def create_instance(module, proxmox, vmid, node, disk, storage, cpus, memory, swap, timeout, **kwargs):
-  proxmox_node = proxmox.nodes(node)
+def wait_for_task(module, proxmox, node, taskid, timeout, action):
+  deadline = time.time() + timeout
+  delay = 0.5
+  while True:
+    status = proxmox.nodes(node).tasks(taskid).status.get()
+    if status['status'] == 'stopped' and status['exitstatus'] == 'OK':
+      return True
+    if time.time() >= deadline:
+      module.fail_json(msg='Reached timeout while waiting for %s VM. Last line in task before timeout: %s'
+                       % (action, proxmox.nodes(node).tasks(taskid).log.get()[:1]))
+    time.sleep(delay)
+    delay = min(delay * 2, 5)
+
+def create_args(disk, storage, cpus, memory, swap, **kwargs):
   kwargs = dict((k,v) for k, v in kwargs.iteritems() if v is not None)
   if VZ_TYPE =='lxc':
       kwargs['cpulimit']=cpus
@@ -216,64 +261,239 @@ def create_instance(module, proxmox, vmid, node, disk, storage, cpus, memory, sw
   else:
       kwargs['cpus']=cpus
       kwargs['disk']=disk
-  taskid = getattr(proxmox_node, VZ_TYPE).create(vmid=vmid, storage=storage, memory=memory, swap=swap, **kwargs)
-
-  while timeout:
-    if ( proxmox_node.tasks(taskid).status.get()['status'] == 'stopped'
-        and proxmox_node.tasks(taskid).status.get()['exitstatus'] == 'OK' ):
-      return True
-    timeout = timeout - 1
-    if timeout == 0:
-      module.fail_json(msg='Reached timeout while waiting for creating VM. Last line in task before timeout: %s'
-                       % proxmox_node.tasks(taskid).log.get()[:1])
+  return dict(kwargs, storage=storage, memory=memory, swap=swap)
 
-    time.sleep(1)
-  return False
+def create_instance(module, proxmox, vmid, node, disk, storage, cpus, memory, swap, timeout, **kwargs):
+  taskid = getattr(proxmox.nodes(node), VZ_TYPE).create(vmid=vmid, **create_args(disk, storage, cpus, memory, swap, **kwargs))
+  return wait_for_task(module, proxmox, node, taskid, timeout, 'creating')
 
 def start_instance(module, proxmox, vm, vmid, timeout):
   taskid = getattr(proxmox.nodes(vm[0]['node']), VZ_TYPE)(vmid).status.start.post()
-  while timeout:
-    if ( proxmox.nodes(vm[0]['node']).tasks(taskid).status.get()['status'] == 'stopped'
-        and proxmox.nodes(vm[0]['node']).tasks(taskid).status.get()['exitstatus'] == 'OK' ):
-      return True
-    timeout = timeout - 1
-    if timeout == 0:
-      module.fail_json(msg='Reached timeout while waiting for starting VM. Last line in task before timeout: %s'
-                       % proxmox.nodes(vm[0]['node']).tasks(taskid).log.get()[:1])
-
-    time.sleep(1)
-  return False
+  return wait_for_task(module, proxmox, vm[0]['node'], taskid, timeout, 'starting')
 
 def stop_instance(module, proxmox, vm, vmid, timeout, force):
   if force:
     taskid = getattr(proxmox.nodes(vm[0]['node']), VZ_TYPE)(vmid).status.shutdown.post(forceStop=1)
   else:
     taskid = getattr(proxmox.nodes(vm[0]['node']), VZ_TYPE)(vmid).status.shutdown.post()
-  while timeout:
-    if ( proxmox.nodes(vm[0]['node']).tasks(taskid).status.get()['status'] == 'stopped'
-        and proxmox.nodes(vm[0]['node']).tasks(taskid).status.get()['exitstatus'] == 'OK' ):
-      return True
-    timeout = timeout - 1
-    if timeout == 0:
-      module.fail_json(msg='Reached timeout while waiting for stopping VM. Last line in task before timeout: %s'
-                       % proxmox_node.tasks(taskid).log.get()[:1])
-
-    time.sleep(1)
-  return False
+  return wait_for_task(module, proxmox, vm[0]['node'], taskid, timeout, 'stopping')
 
 def umount_instance(module, proxmox, vm, vmid, timeout):
   taskid = getattr(proxmox.nodes(vm[0]['node']), VZ_TYPE)(vmid).status.umount.post()
-  while timeout:
-    if ( proxmox.nodes(vm[0]['node']).tasks(taskid).status.get()['status'] == 'stopped'
-        and proxmox.nodes(vm[0]['node']).tasks(taskid).status.get()['exitstatus'] == 'OK' ):
-      return True
-    timeout = timeout - 1
-    if timeout == 0:
-      module.fail_json(msg='Reached timeout while waiting for unmounting VM. Last line in task before timeout: %s'
-                       % proxmox_node.tasks(taskid).log.get()[:1])
+  return wait_for_task(module, proxmox, vm[0]['node'], taskid, timeout, 'unmounting')
+
+# batch mode
+
+CONTAINER_OPTIONS = ['node', 'password', 'hostname', 'ostemplate', 'disk', 'cpus', 'memory', 'swap',
+                     'netif', 'ip_address', 'onboot', 'storage', 'cpuunits', 'nameserver',
+                     'searchdomain', 'force', 'state']
+
+def vm_index(proxmox):
+  return dict((vm['vmid'], vm) for vm in proxmox.cluster.resources.get(type='vm'))
+
+def submit_all(calls, workers):
+  """Run every (key, function) of calls on a pool of threads, return key -> (result, error)."""
+  results = {}
+  work = Queue.Queue()
+  for call in calls:
+    work.put(call)
+
+  def worker():
+    while True:
+      try:
+        key, func = work.get_nowait()
+      except Queue.Empty:
+        return
+      try:
+        results[key] = (func(), None)
+      except Exception, e:
+        results[key] = (None, str(e))
+
+  threads = [ threading.Thread(target=worker) for i in range(max(1, min(workers, len(calls)))) ]
+  for thread in threads:
+    thread.start()
+  for thread in threads:
+    thread.join()
+  return results
+
+def wait_for_tasks(proxmox, pending, timeout):
+  """Wait for the tasks in pending (vmid -> (node, upid)), return vmid -> error or None.
+
+  Each interval lists the tasks of every node with pending tasks once, so
+  the number of requests does not grow with the number of instances.
+  """
+  done = {}
+  deadline = time.time() + timeout
+  delay = 0.5
+  while pending:
+    by_node = {}
+    for vmid, (node, upid) in pending.items():
+      by_node.setdefault(node, {})[upid] = vmid
+    for node, upids in by_node.iteritems():
+      tasks = dict((task['upid'], task) for task in proxmox.nodes(node).tasks.get(limit=len(upids) + 500))
+      for upid, vmid in upids.iteritems():
+        task = tasks.get(upid)
+        if task is None:
+          # not in the node's task list (yet), ask for it directly
+          status = proxmox.nodes(node).tasks(upid).status.get()
+          if status['status'] != 'stopped':
+            continue
+          task = dict(status=status['exitstatus'], endtime=True)
+        if not task.get('endtime'):
+          continue
+        done[vmid] = None if task.get('status') == 'OK' else 'task %s failed: %s' % (upid, task.get('status'))
+        del pending[vmid]
+    if not pending:
+      break
+    if time.time() >= deadline:
+      for vmid, (node, upid) in pending.items():
+        done[vmid] = ('Reached timeout while waiting for task %s. Last line in task before timeout: %s'
+                      % (upid, proxmox.nodes(node).tasks(upid).log.get()[:1]))
+      break
+    time.sleep(delay)
+    delay = min(delay * 2, 5)
+  return done
+
+def batch_action(proxmox, params, vm, nodes, templates):
+  """Work out what to do for one instance: return (action, function submitting its task) or (msg, None)."""
+  vmid = params['vmid']
+  state = params['state']
+  if state == 'present':
+    if vm and not params['force']:
+      return ("VM with vmid = %s is already exists" % vmid, None)
+    node = params['node']
+    if not (node and params['hostname'] and params['password'] and params['ostemplate']):
+      raise Exception('node, hostname, password and ostemplate are mandatory for creating vm')
+    if node not in nodes:
+      raise Exception("node '%s' not exists in cluster" % node)
+    key = (node, params['storage'])
+    if key not in templates:
+      templates[key] = set(cnt['volid'] for cnt in proxmox.nodes(node).storage(params['storage']).content.get())
+    if params['ostemplate'] not in templates[key]:
+      raise Exception("ostemplate '%s' not exists on node %s and storage %s"
+                      % (params['ostemplate'], node, params['storage']))
+    args = create_args(params['disk'], params['storage'], params['cpus'], params['memory'], params['swap'],
+                       password = params['password'],
+                       hostname = params['hostname'],
+                       ostemplate = params['ostemplate'],
+                       netif = params['netif'],
+                       ip_address = params['ip_address'],
+                       onboot = int(params['onboot']),
+                       cpuunits = params['cpuunits'],
+                       nameserver = params['nameserver'],
+                       searchdomain = params['searchdomain'],
+                       force = int(params['force']))
+    return ('create', lambda: (node, getattr(proxmox.nodes(node), VZ_TYPE).create(vmid=vmid, **args)))
+
+  if not vm:
+    if state == 'absent':
+      return ("VM %s does not exist" % vmid, None)
+    raise Exception('VM with vmid = %s not exists in cluster' % vmid)
+  node = vm['node']
+  status = vm['status']
+  instance = lambda: getattr(proxmox.nodes(node), VZ_TYPE)(vmid)
+  if state == 'started':
+    if status == 'running':
+      return ("VM %s is already running" % vmid, None)
+    return ('start', lambda: (node, instance().status.start.post()))
+  if state == 'stopped':
+    if status == 'mounted':
+      if params['force']:
+        return ('umount', lambda: (node, instance().status.umount.post()))
+      return ("VM %s is already shutdown, but mounted. You can use force option to umount it." % vmid, None)
+    if status == 'stopped':
+      return ("VM %s is already shutdown" % vmid, None)
+  if state in ('stopped', 'restarted'):
+    if status in ('stopped', 'mounted'):
+      return ("VM %s is not running" % vmid, None)
+    if params['force']:
+      return ('stop', lambda: (node, instance().status.shutdown.post(forceStop=1)))
+    return ('stop', lambda: (node, instance().status.shutdown.post()))
+  if state == 'absent':
+    if status == 'running':
+      return ("VM %s is running. Stop it before deletion." % vmid, None)
+    if status == 'mounted':
+      return ("VM %s is mounted. Stop it with force option before deletion." % vmid, None)
+    return ('delete', lambda: (node, getattr(proxmox.nodes(node), VZ_TYPE).delete(vmid)))
+
+def batch_params(module):
+  """Options of every entry of containers on top of the task options, checked before any task is submitted."""
+  spec = module.argument_spec
+  batch = []
+  for container in module.params['containers']:
+    params = dict((k, module.params[k]) for k in CONTAINER_OPTIONS)
+    params.update(container)
+    try:
+      params['vmid'] = int(params.get('vmid'))
+    except (TypeError, ValueError):
+      module.fail_json(msg='vmid is mandatory for every entry of containers and must be an integer')
+    if params['state'] not in spec['state']['choices']:
+      module.fail_json(msg='state of vmid %s must be one of: %s' % (params['vmid'], ', '.join(spec['state']['choices'])))
+    for k in container:
+      if k not in spec or params[k] is None:
+        continue
+      if spec[k].get('type') == 'bool':
+        params[k] = module.boolean(params[k])
+      elif spec[k].get('type') == 'int':
+        try:
+          params[k] = int(params[k])
+        except (TypeError, ValueError):
+          module.fail_json(msg='%s of vmid %s must be an integer' % (k, params['vmid']))
+    batch.append(params)
+  return batch
+
+def run_batch(module, proxmox):
+  batch = batch_params(module)
+  index = vm_index(proxmox)
+  nodes = set(nd['node'] for nd in proxmox.nodes.get())
+  templates = {}
+  workers = module.params['workers']
+  timeout = module.params['timeout']
 
-    time.sleep(1)
-  return False
+  results = []
+  entries = {}
+  calls = []
+  for params in batch:
+    vmid = params['vmid']
+    result = dict(vmid=vmid, state=params['state'], changed=False)
+    results.append(result)
+    entries[vmid] = (params, result)
+    try:
+      action, func = batch_action(proxmox, params, index.get(vmid), nodes, templates)
+    except Exception, e:
+      result.update(failed=True, msg=str(e))
+      continue
+    if func is None:
+      result['msg'] = action
+    else:
+      result['action'] = action
+      calls.append((vmid, func))
+
+  # restarted instances get a second round of tasks to start them again
+  while calls:
+    pending = {}
+    for vmid, (task, error) in submit_all(calls, workers).iteritems():
+      if error:
+        entries[vmid][1].update(failed=True, msg=error)
+      else:
+        pending[vmid] = task
+    calls = []
+    for vmid, error in wait_for_tasks(proxmox, pending, timeout).iteritems():
+      params, result = entries[vmid]
+      if error:
+        result.update(failed=True, msg=error)
+        continue
+      result['changed'] = True
+      if params['state'] == 'restarted' and result['action'] == 'stop':
+        result['action'] = 'restart'
+        node = index[vmid]['node']
+        calls.append((vmid, lambda vmid=vmid, node=node: (node, getattr(proxmox.nodes(node), VZ_TYPE)(vmid).status.start.post())))
+
+  changed = any(result['changed'] for result in results)
+  failed = [ str(result['vmid']) for result in results if result.get('failed') ]
+  if failed:
+    module.fail_json(msg='failed to manage VM %s' % ', '.join(failed), changed=changed, containers=results)
+  module.exit_json(changed=changed, containers=results)
 
 def main():
   module = AnsibleModule(
@@ -281,7 +501,9 @@ def main():
       api_host = dict(required=True),
       api_user = dict(required=True),
       api_password = dict(no_log=True),
-      vmid = dict(required=True),
+      vmid = dict(),
+      containers = dict(type='list'),
+      workers = dict(type='int', default=8),
       validate_certs = dict(type='bool', default='no'),
       node = dict(),
       password = dict(no_log=True),
@@ -301,7 +523,9 @@ def main():
       timeout = dict(type='int', default=30),
       force = dict(type='bool', default='no'),
       state = dict(default='present', choices=['present', 'absent', 'stopped', 'started', 'restarted']),
-    )
+    ),
+    required_one_of = [['vmid', 'containers']],
+    mutually_exclusive = [['vmid', 'containers']],
   )
 
   if not HAS_PROXMOXER:
@@ -336,6 +560,12 @@ def main():
   except Exception, e:
     module.fail_json(msg='authorization on proxmox cluster failed with exception: %s' % e)
 
+  if module.params['containers'] is not None:
+    try:
+      run_batch(module, proxmox)
+    except Exception, e:
+      module.fail_json(msg="batch of %s VMs failed with exception: %s" % ( VZ_TYPE, e ))
+
   if state == 'present':
     try:
       if get_instance(proxmox, vmid) and not module.params['force']:
@@ -427,16 +657,8 @@ def main():
         module.exit_json(changed=False, msg="VM %s is mounted. Stop it with force option before deletion." % vmid)
 
       taskid = getattr(proxmox.nodes(vm[0]['node']), VZ_TYPE).delete(vmid)
-      while timeout:
-        if ( proxmox.nodes(vm[0]['node']).tasks(taskid).status.get()['status'] == 'stopped'
-            and proxmox.nodes(vm[0]['node']).tasks(taskid).status.get()['exitstatus'] == 'OK' ):
-          module.exit_json(changed=True, msg="VM %s removed" % vmid)
-        timeout = timeout - 1
-        if timeout == 0:
-          module.fail_json(msg='Reached timeout while waiting for removing VM. Last line in task before timeout: %s'
-                           % proxmox_node.tasks(taskid).log.get()[:1])
-
-        time.sleep(1)
+      if wait_for_task(module, proxmox, vm[0]['node'], taskid, timeout, 'removing'):
+        module.exit_json(changed=True, msg="VM %s removed" % vmid)
     except Exception, e:
       module.fail_json(msg="deletion of VM %s failed with exception: %s" % ( vmid, e ))
 
@@ -106,6 +106,13 @@ options:
     description:
       - how long before wait gives up, in seconds
     default: 600
+  workers:
+    description:
+      - the number of API requests sent at the same time when creating, starting, stopping or removing several
+        virtual machines. The requests of all the machines are submitted up front and then waited on together.
+    required: false
+    default: 10
+    version_added: "2.1"
   remove_boot_volume:
     description:
       - remove the bootVolume of the virtual machine you're destroying.
@@ -180,6 +187,8 @@ EXAMPLES = '''
 import re
 import uuid
 import time
+import threading
+import Queue
 
 HAS_PB_SDK = True
 
@@ -197,71 +206,157 @@ uuid_match = re.compile(
     '[\w]{8}-[\w]{4}-[\w]{4}-[\w]{4}-[\w]{12}', re.I)
 
 
-def _wait_for_completion(profitbricks, promise, wait_timeout, msg):
-    if not promise: return
-    wait_timeout = time.time() + wait_timeout
-    while wait_timeout > time.time():
-        time.sleep(5)
-        operation_result = profitbricks.get_request(
-            request_id=promise['requestId'],
-            status=True)
-
-        if operation_result['metadata']['status'] == "DONE":
-            return
-        elif operation_result['metadata']['status'] == "FAILED":
+def _run_concurrently(func, items, workers):
+    """
+    Calls func on every item with a pool of at most workers threads.
+
+    Returns a list of (result, error) in the order of items.
+    """
+    results = [None] * len(items)
+    work = Queue.Queue()
+    for index, item in enumerate(items):
+        work.put((index, item))
+
+    def worker():
+        while True:
+            try:
+                index, item = work.get_nowait()
+            except Queue.Empty:
+                return
+            try:
+                results[index] = (func(item), None)
+            except Exception as e:
+                results[index] = (None, str(e))
+
+    threads = [threading.Thread(target=worker)
+               for i in range(max(1, min(workers, len(items))))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def _has_request_id(promise):
+    return isinstance(promise, dict) and 'requestId' in promise
+
+
+def _wait_for_requests(profitbricks, promises, wait_timeout, msg, workers=10):
+    """
+    Waits for every request in promises, a dict of key -> promise.
+
+    All outstanding requests are polled together, every second at first
+    and then less often, up to every 10 seconds. Returns a dict of
+    key -> seconds the request took to complete.
+    """
+    started = time.time()
+    deadline = started + wait_timeout
+    pending = dict((key, promise) for key, promise in promises.items()
+                   if _has_request_id(promise))
+    completed = {}
+    failed = []
+    interval = 1
+    while pending:
+        time.sleep(interval)
+        keys = pending.keys()
+        statuses = _run_concurrently(
+            lambda key: profitbricks.get_request(
+                request_id=pending[key]['requestId'],
+                status=True)['metadata']['status'],
+            keys, workers)
+        errors = [error for status, error in statuses if error]
+        if errors:
+            raise Exception(
+                'Failed to poll the status of ' + msg + ': ' + '; '.join(errors))
+        for key, (status, error) in zip(keys, statuses):
+            if status == "DONE":
+                completed[key] = round(time.time() - started, 1)
+                del pending[key]
+            elif status == "FAILED":
+                failed.append(str(pending[key]['requestId']))
+                del pending[key]
+        if failed:
             raise Exception(
-                'Request failed to complete ' + msg + ' "' + str(
-                    promise['requestId']) + '" to complete.')
+                'Request failed to complete ' + msg + ' "' +
+                '", "'.join(failed) + '" to complete.')
+        if pending and time.time() >= deadline:
+            raise Exception(
+                'Timed out waiting for async operation ' + msg + ' "' +
+                '", "'.join(str(p['requestId']) for p in pending.values()) +
+                '" to complete.')
+        interval = min(interval * 1.5, 10)
+    return completed
 
-    raise Exception(
-        'Timed out waiting for async operation ' + msg + ' "' + str(
-            promise['requestId']
-            ) + '" to complete.')
 
-def _create_machine(module, profitbricks, datacenter, name):
-    image = module.params.get('image')
-    cores = module.params.get('cores')
-    ram = module.params.get('ram')
-    volume_size = module.params.get('volume_size')
-    bus = module.params.get('bus')
-    lan = module.params.get('lan')
-    assign_public_ip = module.params.get('assign_public_ip')
-    subscription_user = module.params.get('subscription_user')
-    subscription_password = module.params.get('subscription_password')
-    location = module.params.get('location')
-    image = module.params.get('image')
-    assign_public_ip = module.boolean(module.params.get('assign_public_ip'))
-    wait = module.params.get('wait')
-    wait_timeout = module.params.get('wait_timeout')
+def _wait_for_servers_removal(profitbricks, datacenter, server_ids, wait_timeout, msg):
+    """
+    Waits until none of server_ids is listed in datacenter anymore, for
+    deletes the API accepted without returning a request to poll.
 
-    try:
-        # Generate name, but grab first 10 chars so we don't
-        # screw up the uuid match routine.
-        v = Volume(
-            name=str(uuid.uuid4()).replace('-','')[:10],
-            size=volume_size,
-            image=image,
-            bus=bus)
+    The servers are listed every second at first and then less often,
+    up to every 10 seconds.
+    """
+    deadline = time.time() + wait_timeout
+    pending = set(server_ids)
+    interval = 1
+    while pending:
+        time.sleep(interval)
+        listed = set(server['id'] for server in
+                     profitbricks.list_servers(datacenter).get('items', []))
+        pending &= listed
+        if pending and time.time() >= deadline:
+            raise Exception(
+                'Timed out waiting for async operation ' + msg + ' "' +
+                '", "'.join(sorted(pending)) + '" to complete.')
+        interval = min(interval * 1.5, 10)
 
-        volume_response = profitbricks.create_volume(
-            datacenter_id=datacenter, volume=v)
 
-        # We're forced to wait on the volume creation since
-        # server create relies upon this existing.
+def _wait_for_completion(profitbricks, promise, wait_timeout, msg):
+    if not promise: return
+    _wait_for_requests(profitbricks, {msg: promise}, wait_timeout, msg)
 
-        _wait_for_completion(profitbricks, volume_response,
-                             wait_timeout, "create_volume")
-    except Exception as e:
-        module.fail_json(msg="failed to create the new volume: %s" % str(e))
 
-    if assign_public_ip:
+def _find_datacenter(profitbricks, datacenter):
+    """
+    Returns the UUID of a datacenter given by UUID or name, None if not found.
+    """
+    if uuid_match.match(datacenter):
+        return datacenter
+    datacenter_list = profitbricks.list_datacenters()
+    for d in datacenter_list['items']:
+        dc = profitbricks.get_datacenter(d['id'])
+        if datacenter == dc['properties']['name']:
+            return d['id']
+    return None
+
+
+def _find_servers(profitbricks, datacenter, instance_ids):
+    """
+    Resolves instance ids or names to server ids with one server listing.
+    """
+    server_ids = [n for n in instance_ids if uuid_match.match(n)]
+    names = [n for n in instance_ids if not uuid_match.match(n)]
+    if names:
+        servers_by_name = {}
+        for s in profitbricks.list_servers(datacenter)['items']:
+            servers_by_name.setdefault(s['properties']['name'], []).append(s['id'])
+        for n in names:
+            server_ids.extend(servers_by_name.get(n, []))
+    return server_ids
+
+
+def _find_lan(module, profitbricks, datacenter):
+    lan = module.params.get('lan')
+    wait_timeout = module.params.get('wait_timeout')
+
+    if module.boolean(module.params.get('assign_public_ip')):
         public_found = False
 
         lans = profitbricks.list_lans(datacenter)
-        for lan in lans['items']:
-            if lan['properties']['public']:
+        for l in lans['items']:
+            if l['properties']['public']:
                 public_found = True
-                lan = lan['id']
+                lan = l['id']
 
         if not public_found:
             i = LAN(
@@ -274,75 +369,140 @@ def _create_machine(module, profitbricks, datacenter, name):
 
             _wait_for_completion(profitbricks, lan_response,
                                  wait_timeout, "_create_machine")
+    return lan
+
 
+def _create_machines(module, profitbricks, datacenter, names):
+    """
+    Creates the servers in a pipeline: every boot volume is requested at
+    once, then every server once the volumes exist.
+
+    Returns the server responses and the seconds each server took.
+    """
+    image = module.params.get('image')
+    cores = module.params.get('cores')
+    ram = module.params.get('ram')
+    volume_size = module.params.get('volume_size')
+    bus = module.params.get('bus')
+    wait = module.params.get('wait')
+    wait_timeout = module.params.get('wait_timeout')
+    workers = module.params.get('workers')
+
+    lan = _find_lan(module, profitbricks, datacenter)
+
+    def create_volume(name):
+        # Generate name, but grab first 10 chars so we don't
+        # screw up the uuid match routine.
+        v = Volume(
+            name=str(uuid.uuid4()).replace('-','')[:10],
+            size=volume_size,
+            image=image,
+            bus=bus)
+
+        return profitbricks.create_volume(
+            datacenter_id=datacenter, volume=v)
+
+    indexes = range(len(names))
+    volumes = _run_concurrently(lambda i: create_volume(names[i]), indexes, workers)
+    errors = [error for volume_response, error in volumes if error]
+    if errors:
+        module.fail_json(msg="failed to create the new volume: %s" % '; '.join(errors))
+
+    # We're forced to wait on the volume creation since
+    # server create relies upon this existing.
     try:
+        _wait_for_requests(profitbricks,
+                           dict((i, volumes[i][0]) for i in indexes),
+                           wait_timeout, "create_volume", workers)
+    except Exception as e:
+        module.fail_json(msg="failed to create the new volume: %s" % str(e))
+
+    def create_server(i):
         n = NIC(
             lan=int(lan)
             )
 
-        nics = [n]
-
         s = Server(
-            name=name,
+            name=names[i],
             ram=ram,
             cores=cores,
-            nics=nics,
-            boot_volume_id=volume_response['id']
+            nics=[n],
+            boot_volume_id=volumes[i][0]['id']
             )
 
-        server_response = profitbricks.create_server(
+        return profitbricks.create_server(
             datacenter_id=datacenter, server=s)
 
-        if wait:
-            _wait_for_completion(profitbricks, server_response,
-                                 wait_timeout, "create_virtual_machine")
+    servers = _run_concurrently(create_server, indexes, workers)
+    errors = [error for server_response, error in servers if error]
+    if errors:
+        module.fail_json(msg="failed to create the new server: %s" % '; '.join(errors))
 
+    completed = {}
+    if wait:
+        try:
+            completed = _wait_for_requests(profitbricks,
+                                           dict((i, servers[i][0]) for i in indexes),
+                                           wait_timeout, "create_virtual_machine", workers)
+        except Exception as e:
+            module.fail_json(msg="failed to create the new server: %s" % str(e))
 
-        return (server_response)
-    except Exception as e:
-        module.fail_json(msg="failed to create the new server: %s" % str(e))
+    return ([server_response for server_response, error in servers],
+            [completed.get(i) for i in indexes])
 
-def _remove_machine(module, profitbricks, datacenter, name):
+
+def _remove_machines(module, profitbricks, datacenter, server_ids):
     remove_boot_volume = module.params.get('remove_boot_volume')
     wait = module.params.get('wait')
     wait_timeout = module.params.get('wait_timeout')
-    changed = False
+    workers = module.params.get('workers')
 
-    # User provided the actual UUID instead of the name.
-    try:
+    def remove(server_id):
+        volume_id = None
         if remove_boot_volume:
-            # Collect information needed for later. 
-            server = profitbricks.get_server(datacenter, name)
+            # Collect information needed for later.
+            server = profitbricks.get_server(datacenter, server_id)
             volume_id = server['properties']['bootVolume']['href'].split('/')[7]
-
-        server_response = profitbricks.delete_server(datacenter, name)
-        changed = True
-
-    except Exception as e:
-        module.fail_json(msg="failed to terminate the virtual server: %s" % str(e))
-
-    # Remove the bootVolume
-    if remove_boot_volume:
+        return (profitbricks.delete_server(datacenter, server_id), volume_id)
+
+    results = _run_concurrently(remove, server_ids, workers)
+    errors = [error for result, error in results if error]
+    if errors:
+        module.fail_json(msg="failed to terminate the virtual server: %s" % '; '.join(errors))
+
+    # The boot volumes go once their servers are gone
+    volume_ids = [volume_id for (server_response, volume_id), error in results if volume_id]
+    if volume_ids:
+        promises = dict((server_ids[i], results[i][0][0]) for i in range(len(server_ids)))
+        # delete_server only returns True when the API accepted the request
+        unpolled = [server_id for server_id, promise in promises.items()
+                    if not _has_request_id(promise)]
         try:
-            volume_response = profitbricks.delete_volume(datacenter, volume_id)
-
+            _wait_for_requests(profitbricks, promises,
+                               wait_timeout, "remove_virtual_machine", workers)
+            if unpolled:
+                _wait_for_servers_removal(profitbricks, datacenter, unpolled,
+                                          wait_timeout, "remove_virtual_machine")
         except Exception as e:
-            module.fail_json(msg="failed to remove the virtual server's bootvolume: %s" % str(e))
+            module.fail_json(msg="failed to terminate the virtual server: %s" % str(e))
 
-    return changed
+        volumes = _run_concurrently(
+            lambda volume_id: profitbricks.delete_volume(datacenter, volume_id),
+            volume_ids, workers)
+        errors = [error for volume_response, error in volumes if error]
+        if errors:
+            module.fail_json(msg="failed to remove the virtual server's bootvolume: %s" % '; '.join(errors))
 
-def _startstop_machine(module, profitbricks, datacenter, name):
-    state = module.params.get('state')
+        if wait:
+            try:
+                _wait_for_requests(profitbricks,
+                                   dict((volume_ids[i], volumes[i][0]) for i in range(len(volume_ids))),
+                                   wait_timeout, "remove_volume", workers)
+            except Exception as e:
+                module.fail_json(msg="failed to remove the virtual server's bootvolume: %s" % str(e))
 
-    try:
-        if state == 'running':
-            profitbricks.start_server(datacenter, name)
-        else:
-            profitbricks.stop_server(datacenter, name)
+    return bool(server_ids)
 
-        return True
-    except Exception as e:
-        module.fail_json(msg="failed to start or stop the virtual machine %s: %s" % (name, str(e)))
 
 def _create_datacenter(module, profitbricks):
     datacenter = module.params.get('datacenter')
@@ -377,31 +537,23 @@ def create_virtual_machine(module, profitbricks):
     datacenter = module.params.get('datacenter')
     name = module.params.get('name')
     auto_increment = module.params.get('auto_increment')
-    count = module.params.get('count')
+    count = int(module.params.get('count'))
     lan = module.params.get('lan')
     wait_timeout = module.params.get('wait_timeout')
     failed = True
-    datacenter_found = False
 
     virtual_machines = []
-    virtual_machine_ids = []
 
     # Locate UUID for Datacenter
-    if not (uuid_match.match(datacenter)):
-        datacenter_list = profitbricks.list_datacenters()
-        for d in datacenter_list['items']:
-            dc = profitbricks.get_datacenter(d['id'])
-            if datacenter == dc['properties']['name']:
-                datacenter = d['id']
-                datacenter_found = True
-                break
+    datacenter_id = _find_datacenter(profitbricks, datacenter)
 
-    if not datacenter_found:
+    if datacenter_id is None:
         datacenter_response = _create_datacenter(module, profitbricks)
-        datacenter = datacenter_response['id']
+        datacenter_id = datacenter_response['id']
 
         _wait_for_completion(profitbricks, datacenter_response,
                              wait_timeout, "create_virtual_machine")
+    datacenter = str(datacenter_id)
 
     if auto_increment:
         numbers = set()
@@ -424,12 +576,17 @@ def create_virtual_machine(module, profitbricks):
     else:
         names = [name] * count
 
-    for name in  names: 
-        create_response = _create_machine(module, profitbricks, str(datacenter), name)
-        nics = profitbricks.list_nics(datacenter,create_response['id'])
-        for n in nics['items']:
+    create_responses, completion_seconds = _create_machines(module, profitbricks, datacenter, names)
+
+    nics_lists = _run_concurrently(
+        lambda create_response: profitbricks.list_nics(datacenter, create_response['id']),
+        create_responses, module.params.get('workers'))
+    for create_response, seconds, (nics, error) in zip(create_responses, completion_seconds, nics_lists):
+        for n in (nics or {}).get('items', []):
             if lan == n['properties']['lan']:
                 create_response.update({ 'public_ip': n['properties']['ips'][0] })
+        if seconds is not None:
+            create_response.update({ 'completion_seconds': seconds })
 
         virtual_machines.append(create_response)
         failed = False
@@ -462,29 +619,12 @@ def remove_virtual_machine(module, profitbricks):
     if not isinstance(module.params.get('instance_ids'), list) or len(module.params.get('instance_ids')) < 1:
         module.fail_json(msg='instance_ids should be a list of virtual machine ids or names, aborting')
 
-    datacenter = module.params.get('datacenter')
-    instance_ids = module.params.get('instance_ids')
+    datacenter = _find_datacenter(profitbricks, module.params.get('datacenter'))
+    if datacenter is None:
+        return False
 
-    # Locate UUID for Datacenter
-    if not (uuid_match.match(datacenter)):
-        datacenter_list = profitbricks.list_datacenters()
-        for d in datacenter_list['items']:
-            dc = profitbricks.get_datacenter(d['id'])
-            if datacenter == dc['properties']['name']:
-                datacenter = d['id']
-                break
-
-    for n in instance_ids:
-        if(uuid_match.match(n)):
-            _remove_machine(module, profitbricks, d['id'], n)
-        else:
-            servers = profitbricks.list_servers(d['id'])
-
-            for s in servers['items']:
-                if n == s['properties']['name']:
-                    server_id = s['id']
-
-                    _remove_machine(module, profitbricks, datacenter, server_id)
+    server_ids = _find_servers(profitbricks, datacenter, module.params.get('instance_ids'))
+    return _remove_machines(module, profitbricks, datacenter, server_ids)
 
 def startstop_machine(module, profitbricks, state):
     """
@@ -501,57 +641,44 @@ def startstop_machine(module, profitbricks, state):
 
     wait = module.params.get('wait')
     wait_timeout = module.params.get('wait_timeout')
-    changed = False
-
-    datacenter = module.params.get('datacenter')
-    instance_ids = module.params.get('instance_ids')
+    workers = module.params.get('workers')
 
-    # Locate UUID for Datacenter
-    if not (uuid_match.match(datacenter)):
-        datacenter_list = profitbricks.list_datacenters()
-        for d in datacenter_list['items']:
-            dc = profitbricks.get_datacenter(d['id'])
-            if datacenter == dc['properties']['name']:
-                datacenter = d['id']
-                break
+    datacenter = _find_datacenter(profitbricks, module.params.get('datacenter'))
+    if datacenter is None:
+        module.fail_json(msg="datacenter %s not found" % module.params.get('datacenter'))
 
-    for n in instance_ids:
-        if(uuid_match.match(n)):
-            _startstop_machine(module, profitbricks, datacenter, n)
+    server_ids = _find_servers(profitbricks, datacenter, module.params.get('instance_ids'))
 
-            changed = True
-        else:
-            servers = profitbricks.list_servers(d['id'])
-
-            for s in servers['items']:
-                if n == s['properties']['name']:
-                    server_id = s['id']
-                    _startstop_machine(module, profitbricks, datacenter, server_id)
+    def startstop(server_id):
+        if state == 'running':
+            return profitbricks.start_server(datacenter, server_id)
+        return profitbricks.stop_server(datacenter, server_id)
 
-                    changed = True
+    errors = [error for result, error in _run_concurrently(startstop, server_ids, workers) if error]
+    if errors:
+        module.fail_json(msg="failed to start or stop the virtual machine: %s" % '; '.join(errors))
 
+    completion_seconds = {}
     if wait:
-        wait_timeout = time.time() + wait_timeout
-        while wait_timeout > time.time():
-            matched_instances = []
+        vm_state = 'running' if state == 'running' else 'shutoff'
+        started = time.time()
+        wait_timeout = started + wait_timeout
+        interval = 1
+        pending = set(server_ids)
+        while pending:
             for res in profitbricks.list_servers(datacenter)['items']:
-                if state == 'running':
-                    if res['properties']['vmState'].lower() == state:
-                        matched_instances.append(res)
-                elif state == 'stopped':
-                    if res['properties']['vmState'].lower() == 'shutoff':
-                        matched_instances.append(res)                    
-
-            if len(matched_instances) < len(instance_ids):
-                time.sleep(5)
-            else:
+                if res['id'] in pending and res['properties']['vmState'].lower() == vm_state:
+                    completion_seconds[res['id']] = round(time.time() - started, 1)
+                    pending.discard(res['id'])
+            if not pending:
                 break
+            if wait_timeout <= time.time():
+                # waiting took too long
+                module.fail_json(msg = "wait for virtual machine state timeout on %s" % time.asctime())
+            time.sleep(interval)
+            interval = min(interval * 1.5, 10)
 
-        if wait_timeout <= time.time():
-            # waiting took too long
-            module.fail_json(msg = "wait for virtual machine state timeout on %s" % time.asctime())
-
-    return (changed)
+    return (bool(server_ids), completion_seconds)
 
 def main():
     module = AnsibleModule(
@@ -574,6 +701,7 @@ def main():
             wait=dict(type='bool', default=True),
             wait_timeout=dict(type='int', default=600),
             remove_boot_volume=dict(type='bool', default=True),
+            workers=dict(type='int', default=10),
             state=dict(default='present'),
         )
     )
@@ -598,7 +726,7 @@ def main():
                 'for running or stopping machines.')
 
         try:
-            (changed) = remove_virtual_machine(module, profitbricks)
+            changed = remove_virtual_machine(module, profitbricks)
             module.exit_json(changed=changed)
         except Exception as e:
             module.fail_json(msg='failed to set instance state: %s' % str(e))
@@ -608,8 +736,8 @@ def main():
             module.fail_json(msg='datacenter parameter is required for ' + 
                 'running or stopping machines.')
         try:
-            (changed) = startstop_machine(module, profitbricks, state)
-            module.exit_json(changed=changed)
+            (changed, completion_seconds) = startstop_machine(module, profitbricks, state)
+            module.exit_json(changed=changed, completion_seconds=completion_seconds)
         except Exception as e:
             module.fail_json(msg='failed to set instance state: %s' % str(e))
 
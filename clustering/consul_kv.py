@@ -45,13 +45,15 @@ options:
             lock associated with a key/value pair with the states 'acquire' or
             'release' respectively. a valid session must be supplied to make the
             attempt changed will be true if the attempt is successful, false
-            otherwise.
+            otherwise. The state 'sync' treats key as a prefix and makes the
+            subtree below it match the keys supplied with tree or tree_src.
         required: false
-        choices: ['present', 'absent', 'acquire', 'release']
+        choices: ['present', 'absent', 'acquire', 'release', 'sync']
         default: present
     key:
         description:
-          - the key at which the value should be stored.
+          - the key at which the value should be stored, or the prefix of the
+            subtree when state is 'sync'.
         required: true
     value:
         description:
@@ -111,6 +113,29 @@ options:
         required: false
         default: True
         version_added: "2.1"
+    tree:
+        description:
+          - dict of keys, relative to the key prefix, and the values they
+            should hold when state is 'sync'. Nested dicts are flattened into
+            '/' separated keys.
+        required: false
+        default: None
+        version_added: "2.1"
+    tree_src:
+        description:
+          - path of a local JSON file holding a dict as for tree, or of a
+            directory whose files are stored under their relative paths, used
+            when state is 'sync'. Keys given in tree take precedence.
+        required: false
+        default: None
+        version_added: "2.1"
+    purge:
+        description:
+          - when state is 'sync', delete keys below the prefix which are not
+            part of the desired tree.
+        required: false
+        default: false
+        version_added: "2.1"
 """
 
 
@@ -130,12 +155,28 @@ EXAMPLES = '''
     consul_kv:
       key: ansible/groups/dc1/somenode
       value: 'top_secret'
+
+  - name: make the config subtree of a service match a local directory,
+          reading it with one request and writing it through transactions
+    consul_kv:
+      key: config/myservice
+      state: sync
+      tree_src: files/myservice-config/
+      purge: yes
 '''
 
+import base64
+import os
 import sys
 
+try:
+    import json
+except ImportError:
+    import simplejson as json
+
 try:
     import consul
+    import requests
     from requests.exceptions import ConnectionError
     python_consul_installed = True
 except ImportError, e:
@@ -151,6 +192,8 @@ def execute(module):
         lock(module, state)
     if state == 'present':
         add_value(module)
+    elif state == 'sync':
+        sync_tree(module)
     else:
         remove_value(module)
 
@@ -227,6 +270,136 @@ def remove_value(module):
                      data=existing)
 
 
+# consul refuses transactions with more than 64 operations
+TXN_MAX_OPS = 64
+
+
+def to_bytes(value):
+    ''' utf-8 bytes of a string, the str() of any other scalar '''
+    if isinstance(value, unicode):
+        return value.encode('utf-8')
+    return str(value)
+
+
+def flatten_tree(tree, prefix=''):
+    flat = {}
+    for k, v in tree.items():
+        path = '/'.join(p for p in (prefix, to_bytes(k).strip('/')) if p)
+        if isinstance(v, dict):
+            flat.update(flatten_tree(v, path))
+        elif v is None:
+            flat[path] = ''
+        else:
+            flat[path] = to_bytes(v)
+    return flat
+
+
+def load_tree(module):
+    ''' build the desired subtree from the tree_src path and the tree dict,
+    keyed by path relative to the prefix '''
+    desired = {}
+    src = module.params.get('tree_src')
+    if src:
+        src = os.path.expanduser(src)
+        if os.path.isdir(src):
+            for root, dirs, files in os.walk(src):
+                for name in files:
+                    path = os.path.join(root, name)
+                    key = os.path.relpath(path, src).replace(os.sep, '/')
+                    f = open(path, 'rb')
+                    try:
+                        desired[key] = f.read()
+                    finally:
+                        f.close()
+        elif os.path.isfile(src):
+            f = open(src)
+            try:
+                desired.update(flatten_tree(json.load(f)))
+            finally:
+                f.close()
+        else:
+            module.fail_json(msg='tree_src %s does not exist' % src)
+    if module.params.get('tree'):
+        desired.update(flatten_tree(module.params.get('tree')))
+    return desired
+
+
+def txn_op(verb, key, value=None, index=None):
+    op = dict(Verb=verb, Key=key)
+    if value is not None:
+        op['Value'] = base64.b64encode(value)
+    if index is not None:
+        op['Index'] = index
+    return dict(KV=op)
+
+
+def apply_txn(module, ops):
+    ''' submit the operations through /v1/txn in batches of TXN_MAX_OPS. Each
+    batch is atomic; a batch rolled back because a ModifyIndex moved fails the
+    module with the errors reported by consul. '''
+    url = '%s://%s:%s/v1/txn' % (module.params.get('scheme'),
+                                 module.params.get('host'),
+                                 module.params.get('port'))
+    session = requests.Session()
+    session.verify = module.params.get('validate_certs')
+    session.headers['X-Consul-Token'] = module.params.get('token')
+
+    for i in range(0, len(ops), TXN_MAX_OPS):
+        batch = ops[i:i + TXN_MAX_OPS]
+        r = session.put(url, data=json.dumps(batch))
+        if r.status_code == 409:
+            module.fail_json(msg='transaction rolled back, keys were modified concurrently',
+                             errors=r.json().get('Errors'), applied_operations=i)
+        elif r.status_code != 200:
+            module.fail_json(msg='transaction failed with status %s' % r.status_code,
+                             details=r.text, applied_operations=i)
+
+
+def sync_tree(module):
+    ''' make the subtree below the key prefix match the desired tree. The current
+    subtree is read with a single recursive get and the changes are written with
+    check-and-set on the ModifyIndex that was read, so concurrent modifications
+    abort the transaction instead of being overwritten. '''
+    consul_api = get_consul_api(module)
+
+    prefix = module.params.get('key').rstrip('/')
+    desired = dict(('%s/%s' % (prefix, k), v) for k, v in load_tree(module).items())
+
+    index, entries = consul_api.kv.get(prefix + '/', recurse=True)
+    current = dict((e['Key'], e) for e in entries or [])
+
+    ops = []
+    created, updated, deleted = [], [], []
+    for key in sorted(desired):
+        value = desired[key]
+        existing = current.get(key)
+        if existing is None:
+            ops.append(txn_op('cas', key, value, 0))
+            created.append(key)
+        elif (existing['Value'] or '') != value:
+            ops.append(txn_op('cas', key, value, existing['ModifyIndex']))
+            updated.append(key)
+
+    if module.params.get('purge'):
+        for key in sorted(set(current) - set(desired)):
+            if key.endswith('/') and current[key]['Value'] is None:
+                # folder placeholders go away with their children
+                continue
+            ops.append(txn_op('delete-cas', key, index=current[key]['ModifyIndex']))
+            deleted.append(key)
+
+    if ops and not module.check_mode:
+        apply_txn(module, ops)
+
+    module.exit_json(changed=bool(ops),
+                     index=index,
+                     key=prefix,
+                     created=created,
+                     updated=updated,
+                     deleted=deleted,
+                     operations=len(ops))
+
+
 def get_consul_api(module, token=None):
     return consul.Consul(host=module.params.get('host'),
                          port=module.params.get('port'),
@@ -251,9 +424,12 @@ def main():
         port=dict(default=8500, type='int'),
         recurse=dict(required=False, type='bool'),
         retrieve=dict(required=False, default=True),
-        state=dict(default='present', choices=['present', 'absent']),
+        state=dict(default='present', choices=['present', 'absent', 'sync']),
         token=dict(required=False, default='anonymous', no_log=True),
-        value=dict(required=False)
+        value=dict(required=False),
+        tree=dict(required=False, type='dict'),
+        tree_src=dict(required=False),
+        purge=dict(required=False, default=False, type='bool')
     )
 
     module = AnsibleModule(argument_spec, supports_check_mode=False)
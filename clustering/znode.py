@@ -56,6 +56,15 @@ options:
         default: False
         required: false
         version_added: "2.1"
+    tree:
+        description:
+            - A dict of paths, relative to name, and the values they should hold. With state=present
+              the subtree is read with pipelined asynchronous calls and all creations and updates are
+              applied in a single multi-op transaction; with state=absent the listed paths are deleted
+              in a single transaction. Use op=get_tree to read the whole subtree below name.
+        default: None
+        required: false
+        version_added: "2.1"
 requirements:
     - kazoo >= 2.1
     - python >= 2.6
@@ -77,6 +86,19 @@ EXAMPLES = """
 
 # Deleting a znode at path /mypath
 - action: znode hosts=localhost:2181 name=/mypath state=absent
+
+# Seeding a configuration subtree in one transaction
+- znode:
+    hosts: localhost:2181
+    name: /config/myapp
+    state: present
+    tree:
+      db/host: db1.example.com
+      db/port: 5432
+      features/search: enabled
+
+# Reading every znode below /config/myapp
+- action: znode hosts=localhost:2181 name=/config/myapp op=get_tree
 """
 
 try:
@@ -94,10 +116,11 @@ def main():
             hosts=dict(required=True, type='str'),
             name=dict(required=True, type='str'),
             value=dict(required=False, default=None, type='str'),
-            op=dict(required=False, default=None, choices=['get', 'wait', 'list']),
+            op=dict(required=False, default=None, choices=['get', 'wait', 'list', 'get_tree']),
             state=dict(choices=['present', 'absent']),
             timeout=dict(required=False, default=300, type='int'),
-            recursive=dict(required=False, default=False, type='bool')
+            recursive=dict(required=False, default=False, type='bool'),
+            tree=dict(required=False, default=None, type='dict')
         ),
         supports_check_mode=False
     )
@@ -119,13 +142,19 @@ def main():
         'op': {
             'get': zoo.get,
             'list': zoo.list,
-            'wait': zoo.wait
+            'wait': zoo.wait,
+            'get_tree': zoo.get_tree
         },
         'state': {
             'present': zoo.present,
             'absent': zoo.absent
         }
     }
+    if module.params['tree'] is not None:
+        command_dict['state'] = {
+            'present': zoo.tree_present,
+            'absent': zoo.tree_absent
+        }
 
     command_type = 'op' if 'op' in module.params and module.params['op'] is not None else 'state'
     method = module.params[command_type]
@@ -180,6 +209,108 @@ class KazooCommandProxy():
     def wait(self):
         return self._wait(self.module.params['name'], self.module.params['timeout'])
 
+    def get_tree(self):
+        tree = self._read_tree(self.module.params['name'])
+        if not tree:
+            return False, {'msg': 'The requested node does not exist.'}
+        return True, {'msg': 'Retrieved the znode tree.', 'znode': self.module.params['name'],
+                      'count': len(tree), 'tree': dict((path, value) for path, (value, version) in tree.items())}
+
+    def tree_present(self):
+        root = self.module.params['name'].rstrip('/') or '/'
+        desired = self._desired_tree(root)
+        current = self._read_tree(root)
+
+        if root not in current:
+            parent = root.rsplit('/', 1)[0]
+            if parent:
+                self.zk.ensure_path(parent)
+            desired.setdefault(root, None)
+
+        created, updated = [], []
+        transaction = self.zk.transaction()
+        # parents sort before their children, so every create finds its parent
+        for path in sorted(desired, key=lambda p: (p.count('/'), p)):
+            value = desired[path]
+            if path not in current:
+                transaction.create(path, value or '')
+                created.append(path)
+            elif value is not None and current[path][0] != value:
+                transaction.set_data(path, value, version=current[path][1])
+                updated.append(path)
+
+        if not created and not updated:
+            return True, {'changed': False, 'msg': 'No changes were necessary.', 'znode': root}
+        self._commit(transaction)
+        return True, {'changed': True, 'msg': 'Applied the znode tree.', 'znode': root,
+                      'created': created, 'updated': updated}
+
+    def tree_absent(self):
+        root = self.module.params['name'].rstrip('/') or '/'
+        current = self._read_tree(root)
+        paths = [p for p in self._desired_tree(root, parents=False) if p in current and p != root]
+        if not paths:
+            return True, {'changed': False, 'msg': 'No changes were necessary.', 'znode': root}
+
+        transaction = self.zk.transaction()
+        deleted = set()
+        # children go first; descendants of listed paths are removed with them
+        for path in sorted(paths, key=lambda p: -p.count('/')):
+            for child in sorted(current, key=lambda p: -p.count('/')):
+                if child.startswith(path + '/') and child not in deleted:
+                    transaction.delete(child, version=current[child][1])
+                    deleted.add(child)
+            if path not in deleted:
+                transaction.delete(path, version=current[path][1])
+                deleted.add(path)
+        self._commit(transaction)
+        return True, {'changed': True, 'msg': 'Deleted the znodes.', 'znode': root, 'deleted': sorted(deleted)}
+
+    def _commit(self, transaction):
+        results = transaction.commit()
+        errors = [str(r) for r in results if isinstance(r, Exception)]
+        if errors:
+            self.module.fail_json(msg='The transaction was rolled back.', errors=errors)
+
+    def _desired_tree(self, root, parents=True):
+        desired = {}
+        for path, value in self.module.params['tree'].items():
+            path = path.strip('/')
+            if not path:
+                full = root
+            else:
+                full = '%s/%s' % (root.rstrip('/'), path)
+            desired[full] = None if value is None else str(value)
+            if not parents:
+                continue
+            # intermediate nodes are created empty when missing
+            parent = full.rsplit('/', 1)[0]
+            while parent.startswith(root) and len(parent) > len(root):
+                desired.setdefault(parent, None)
+                parent = parent.rsplit('/', 1)[0]
+        return desired
+
+    def _read_tree(self, root):
+        """Read the subtree below root one level at a time, issuing the get and
+        get_children calls of a whole level before waiting on any of them.
+
+        Returns a dict of path -> (value, version).
+        """
+        tree = {}
+        level = [root]
+        while level:
+            pending = [(path, self.zk.get_async(path), self.zk.get_children_async(path)) for path in level]
+            level = []
+            for path, data, children in pending:
+                try:
+                    value, zstat = data.get()
+                    names = children.get()
+                except NoNodeError:
+                    continue
+                tree[path] = (value, zstat.version)
+                level.extend('%s/%s' % (path.rstrip('/'), name) for name in names)
+        return tree
+
     def _absent(self, znode):
         if self.exists(znode):
             self.zk.delete(znode, recursive=self.module.params['recursive'])
@@ -188,8 +319,12 @@ class KazooCommandProxy():
             return True, {'changed': False, 'msg': 'The znode does not exist.'}
 
     def _get(self, path):
-        if self.exists(path):
+        try:
             value, zstat = self.zk.get(path)
+        except NoNodeError:
+            zstat = None
+
+        if zstat is not None:
             stat_dict = {}
             for i in dir(zstat):
                 if not i.startswith('_'):
@@ -204,8 +339,12 @@ class KazooCommandProxy():
         return result
 
     def _present(self, path, value):
-        if self.exists(path):
+        try:
             (current_value, zstat) = self.zk.get(path)
+        except NoNodeError:
+            zstat = None
+
+        if zstat is not None:
             if value != current_value:
                 self.zk.set(path, value)
                 return True, {'changed': True, 'msg': 'Updated the znode value.', 'znode': path,
@@ -66,9 +66,18 @@ options:
     name:
         description:
             - The name of the user to add or remove
-        required: true
+            - Required unless I(users) is given.
+        required: false
         default: null
         aliases: [ 'user' ]
+    users:
+        version_added: "2.1"
+        description:
+            - "A list of users to manage in one task instead of I(name), each a dict with C(name) and optionally C(password), C(roles), C(state), C(update_password) and C(database). Missing keys default to the module options."
+            - "The existing users are read with one query, roles are compared in memory, and only the needed createUser, updateUser, grantRolesToUser, revokeRolesFromUser and dropUser commands are sent, over a single connection."
+            - "This param requires mongodb 2.6+."
+        required: false
+        default: null
     password:
         description:
             - The password to use for the user
@@ -142,6 +151,15 @@ EXAMPLES = '''
     roles:
      - { db: "local"  , role: "read" }
 
+# Sync many users of the 'burgers' database at once, leaving the passwords of existing users alone
+- mongodb_user:
+    database: burgers
+    update_password: on_create
+    users:
+      - { name: bob, password: 12345, roles: [ read ] }
+      - { name: jim, password: 12345, roles: [ readWrite, dbAdmin ] }
+      - { name: joe, state: absent }
+
 '''
 
 import ConfigParser
@@ -166,11 +184,20 @@ else:
 #
 
 def user_find(client, user, db_name):
-    for mongo_user in client["admin"].system.users.find():
-        if mongo_user['user'] == user and mongo_user['db'] == db_name:
-            return mongo_user
+    mongo_user = client["admin"].system.users.find_one({'user': user, 'db': db_name})
+    if mongo_user:
+        return mongo_user
     return False
 
+def users_find(client, names_by_db):
+    """Return {(db, user): user document} for all the users, with a single query."""
+    query = {'$or': [{'db': db_name, 'user': {'$in': list(names)}}
+                     for db_name, names in names_by_db.items()]}
+    found = {}
+    for mongo_user in client["admin"].system.users.find(query, {'credentials': 0}):
+        found[(mongo_user['db'], mongo_user['user'])] = mongo_user
+    return found
+
 def user_add(module, client, db_name, user, password, roles):
     #pymongo's user_add is a _create_or_update_user so we won't know if it was changed or updated
     #without reproducing a lot of the logic in database.py of pymongo
@@ -197,6 +224,73 @@ def user_remove(module, client, db_name, user):
     else:
         module.exit_json(changed=False, user=user)
 
+def roles_as_dicts(roles, db_name):
+    output = list()
+    for role in roles or []:
+        if isinstance(role, basestring):
+            output.append({ "role": role, "db": db_name })
+        else:
+            output.append({ "role": role['role'], "db": role['db'] })
+    return output
+
+def users_sync(module, client, entries):
+    """Bring all the users in entries to their state, return the action taken for each."""
+    params = module.params
+    users = []
+    names_by_db = {}
+    for entry in entries:
+        if not entry.get('name'):
+            module.fail_json(msg='every entry of users needs a name')
+        user = dict((key, entry.get(key, params.get(key)))
+                    for key in ('password', 'roles', 'state', 'update_password'))
+        user['name'] = entry['name']
+        user['database'] = entry.get('database', params['database'])
+        if user['state'] not in ('present', 'absent'):
+            module.fail_json(msg='state of user %s must be present or absent' % user['name'])
+        if user['state'] == 'present' and user['password'] is None and user['update_password'] == 'always':
+            module.fail_json(msg='password required for user %s unless update_password is set to on_create' % user['name'])
+        users.append(user)
+        names_by_db.setdefault(user['database'], set()).add(user['name'])
+
+    existing = users_find(client, names_by_db)
+
+    commands = []
+    results = []
+    for user in users:
+        db_name = user['database']
+        uinfo = existing.get((db_name, user['name']))
+        actions = []
+        if user['state'] == 'absent':
+            if uinfo:
+                actions.append(('dropUser', {}))
+        elif not uinfo:
+            actions.append(('createUser', dict(pwd=user['password'], roles=roles_as_dicts(user['roles'], db_name))))
+        else:
+            if user['update_password'] == 'always':
+                actions.append(('updateUser', dict(pwd=user['password'])))
+            if user['roles'] is not None:
+                wanted = roles_as_dicts(user['roles'], db_name)
+                current = [{ "role": role['role'], "db": role['db'] } for role in uinfo.get('roles', [])]
+                grant = [role for role in wanted if role not in current]
+                revoke = [role for role in current if role not in wanted]
+                if grant:
+                    actions.append(('grantRolesToUser', dict(roles=grant)))
+                if revoke:
+                    actions.append(('revokeRolesFromUser', dict(roles=revoke)))
+        results.append(dict(name=user['name'], database=db_name,
+                            actions=[command for command, args in actions]))
+        commands.extend((db_name, user['name'], command, args) for command, args in actions)
+
+    if not module.check_mode:
+        for index, (db_name, name, command, args) in enumerate(commands):
+            try:
+                client[db_name].command(command, name, **args)
+            except OperationFailure, e:
+                module.fail_json(msg='Unable to %s %s: %s' % (command, name, str(e)),
+                                 changed=index > 0, users=results)
+
+    return bool(commands), results
+
 def load_mongocnf():
     config = ConfigParser.RawConfigParser()
     mongocnf = os.path.expanduser('~/.mongodb.cnf')
@@ -264,13 +358,16 @@ def main():
             login_database=dict(default=None),
             replica_set=dict(default=None),
             database=dict(required=True, aliases=['db']),
-            name=dict(required=True, aliases=['user']),
+            name=dict(default=None, aliases=['user']),
+            users=dict(default=None, type='list'),
             password=dict(aliases=['pass']),
             ssl=dict(default=False, type='bool'),
             roles=dict(default=None, type='list'),
             state=dict(default='present', choices=['absent', 'present']),
             update_password=dict(default="always", choices=["always", "on_create"]),
         ),
+        required_one_of=[['name', 'users']],
+        mutually_exclusive=[['name', 'users']],
         supports_check_mode=True
     )
 
@@ -316,6 +413,10 @@ def main():
     except ConnectionFailure, e:
         module.fail_json(msg='unable to connect to database: %s' % str(e))
 
+    if module.params['users'] is not None:
+        changed, results = users_sync(module, client, module.params['users'])
+        module.exit_json(changed=changed, users=results)
+
     if state == 'present':
         if password is None and update_password == 'always':
             module.fail_json(msg='password parameter required when adding a user unless update_password is set to on_create')
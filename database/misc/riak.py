@@ -76,6 +76,25 @@ options:
     default: None
     aliases: []
     choices: ['kv']
+  service_timeout:
+    description:
+      - Number of seconds to wait for the service given in C(wait_for_service).
+    required: false
+    default: 600
+    type: 'int'
+    version_added: "2.1"
+  http_nodes:
+    description:
+      - List of C(address:port) of the Riak HTTP interfaces to wait on, defaults to C(http_conn).
+      - All the waits (handoffs, ring, service) run together on all the nodes, polling C(/stats) and
+        C(/ping) of every node, every quarter of a second at first and then less often, up to every
+        ten seconds.
+      - The node name, ring members and the C(join) check always use C(http_conn).
+      - Once C(/ping) answers on every node, C(riak-admin wait_for_service) is run once for each
+        node to confirm the service given in C(wait_for_service).
+    required: false
+    default: null
+    version_added: "2.1"
   validate_certs:
     description:
       - If C(no), SSL certificates will not be validated. This should only be used
@@ -95,6 +114,12 @@ EXAMPLES = '''
 
 # Wait for riak_kv service to startup
 - riak: wait_for_service=kv
+
+# Wait for riak_kv and ring agreement on three nodes during a rolling upgrade
+- riak:
+    wait_for_service: kv
+    wait_for_ring: 600
+    http_nodes: [ '10.1.1.1:8098', '10.1.1.2:8098', '10.1.1.3:8098' ]
 '''
 
 import time
@@ -111,6 +136,73 @@ except ImportError:
         pass
 
 
+class RiakNode(object):
+    """ One Riak HTTP interface """
+
+    def __init__(self, module, http_conn):
+        self.module = module
+        self.http_conn = http_conn
+
+    def get(self, path):
+        response, info = fetch_url(self.module, 'http://%s%s' % (self.http_conn, path),
+                                   headers={'Accept': 'application/json'}, force=True, timeout=5)
+        if info['status'] != 200:
+            return info['status'], None
+        return info['status'], response.read()
+
+    def stats(self):
+        status, body = self.get('/stats')
+        if status != 200:
+            return None
+        try:
+            return json.loads(body)
+        except ValueError:
+            return None
+
+    def is_up(self):
+        return self.get('/ping')[0] == 200
+
+
+def stats_agree_on_ring(riak_nodes):
+    """ whether every node is up and reports the same ring, with all members connected """
+    rings = []
+    for riak_node in riak_nodes:
+        stats = riak_node.stats()
+        if stats is None:
+            return False
+        members = sorted(stats['ring_members'])
+        connected = set(stats.get('connected_nodes', [])) | set([stats['nodename']])
+        if not set(members) <= connected:
+            return False
+        rings.append((members, stats.get('ring_ownership')))
+    for ring in rings:
+        if ring != rings[0]:
+            return False
+    return True
+
+
+def wait_for_conditions(conditions):
+    """ Poll every condition ({name: (check, timeout)}) until each one holds,
+    backing off from a quarter of a second up to ten seconds.
+    Return the seconds each condition took and the ones that timed out. """
+    started = time.time()
+    delay = 0.25
+    converged = {}
+    while True:
+        for name, (check, timeout) in conditions.items():
+            if name not in converged and check():
+                converged[name] = round(time.time() - started, 2)
+        pending = [name for name in conditions if name not in converged]
+        if not pending:
+            return converged, []
+        elapsed = time.time() - started
+        expired = [name for name in pending if elapsed > conditions[name][1]]
+        if expired:
+            return converged, expired
+        time.sleep(delay)
+        delay = min(delay * 2, 10)
+
+
 def ring_check(module, riak_admin_bin):
     cmd = '%s ringready' % riak_admin_bin
     rc, out, err = module.run_command(cmd)
@@ -132,6 +224,8 @@ def main():
         wait_for_ring=dict(default=False, type='int'),
         wait_for_service=dict(
             required=False, default=None, choices=['kv']),
+        service_timeout=dict(default=600, type='int'),
+        http_nodes=dict(default=None, type='list'),
         validate_certs = dict(default='yes', type='bool'))
     )
 
@@ -150,21 +244,20 @@ def main():
     riak_bin = module.get_bin_path('riak')
     riak_admin_bin = module.get_bin_path('riak-admin')
 
+    # the node identity always comes from http_conn, http_nodes are only waited on
+    local_node = RiakNode(module, http_conn)
+    riak_nodes = [RiakNode(module, node) for node in (module.params.get('http_nodes') or [http_conn])]
+
+    stats = None
     timeout = time.time() + 120
-    while True:
+    delay = 0.25
+    while stats is None:
         if time.time() > timeout:
             module.fail_json(msg='Timeout, could not fetch Riak stats.')
-        (response, info) = fetch_url(module, 'http://%s/stats' % (http_conn), force=True, timeout=5)
-        if info['status'] == 200:
-            stats_raw = response.read()
-            break
-        time.sleep(5)
-
-    # here we attempt to load those stats,
-    try:
-        stats = json.loads(stats_raw)
-    except:
-        module.fail_json(msg='Could not parse Riak stats.')
+        stats = local_node.stats()
+        if stats is None:
+            time.sleep(delay)
+            delay = min(delay * 2, 5)
 
     node_name = stats['nodename']
     nodes = stats['ring_members']
@@ -225,33 +318,62 @@ def main():
             module.fail_json(msg=out)
 
 # this could take a while, recommend to run in async mode
-    if wait_for_handoffs:
-        timeout = time.time() + wait_for_handoffs
-        while True:
-            cmd = '%s transfers' % riak_admin_bin
+    def handoffs_done():
+        rc, out, err = module.run_command('%s transfers' % riak_admin_bin)
+        return 'No transfers active' in out
+
+    def ring_ready():
+        # /stats is cheap to poll; riak-admin only confirms once it agrees
+        return stats_agree_on_ring(riak_nodes) and ring_check(module, riak_admin_bin)
+
+    service_ready = set()
+
+    def service_up():
+        # /ping only tells the node answers HTTP, riak-admin then confirms
+        # the service once per node
+        for riak_node in riak_nodes:
+            if not riak_node.is_up():
+                return False
+        for riak_node in riak_nodes:
+            if riak_node.http_conn in service_ready:
+                continue
+            stats = riak_node.stats()
+            if stats is None:
+                return False
+            cmd = [riak_admin_bin, 'wait_for_service', 'riak_%s' % wait_for_service, stats['nodename']]
             rc, out, err = module.run_command(cmd)
-            if 'No transfers active' in out:
-                result['handoffs'] = 'No transfers active.'
-                break
-            time.sleep(10)
-            if time.time() > timeout:
-                module.fail_json(msg='Timeout waiting for handoffs.')
+            if rc != 0:
+                return False
+            service_ready.add(riak_node.http_conn)
+        return True
 
+    conditions = {}
+    if wait_for_handoffs:
+        conditions['handoffs'] = (handoffs_done, wait_for_handoffs)
+    if wait_for_ring:
+        conditions['ring'] = (ring_ready, wait_for_ring)
     if wait_for_service:
-        cmd = [riak_admin_bin, 'wait_for_service', 'riak_%s' % wait_for_service, node_name ]
-        rc, out, err = module.run_command(cmd)
-        result['service'] = out
+        conditions['service'] = (service_up, module.params.get('service_timeout'))
 
-    if wait_for_ring:
-        timeout = time.time() + wait_for_ring
-        while True:
-            if ring_check(module, riak_admin_bin):
-                break
-            time.sleep(10)
-        if time.time() > timeout:
-            module.fail_json(msg='Timeout waiting for nodes to agree on ring.')
+    converged, expired = wait_for_conditions(conditions)
+    result['convergence_seconds'] = converged
+
+    if 'handoffs' in expired:
+        module.fail_json(msg='Timeout waiting for handoffs.')
+    if 'service' in expired:
+        module.fail_json(msg='Timeout waiting for riak_%s service.' % wait_for_service)
+    if 'ring' in expired:
+        module.fail_json(msg='Timeout waiting for nodes to agree on ring.')
 
-    result['ring_ready'] = ring_check(module, riak_admin_bin)
+    if 'handoffs' in converged:
+        result['handoffs'] = 'No transfers active.'
+    if 'service' in converged:
+        result['service'] = 'riak_%s is up' % wait_for_service
+
+    if 'ring' in converged:
+        result['ring_ready'] = True
+    else:
+        result['ring_ready'] = ring_check(module, riak_admin_bin)
 
     module.exit_json(**result)
 
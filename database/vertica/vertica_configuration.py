@@ -82,6 +82,8 @@ except ImportError:
 else:
     pyodbc_found = True
 
+FETCH_SIZE = 1000
+
 class NotSupportedError(Exception):
     pass
 
@@ -99,7 +101,7 @@ def get_configuration_facts(cursor, parameter_name=''):
         and (? = '' or c.parameter_name ilike ?)
     """, parameter_name, parameter_name)
     while True:
-        rows = cursor.fetchmany(100)
+        rows = cursor.fetchmany(FETCH_SIZE)
         if not rows:
             break
         for row in rows:
@@ -74,6 +74,9 @@ except ImportError:
 else:
     pyodbc_found = True
 
+# rows pulled from the server per round trip when reading the catalog
+FETCH_SIZE = 1000
+
 class NotSupportedError(Exception):
     pass
 
@@ -82,37 +85,32 @@ class NotSupportedError(Exception):
 def get_schema_facts(cursor, schema=''):
     facts = {}
     cursor.execute("""
-        select schema_name, schema_owner, create_time
-        from schemata
-        where not is_system_schema and schema_name not in ('public')
-        and (? = '' or schema_name ilike ?)
-    """, schema, schema)
-    while True:
-        rows = cursor.fetchmany(100)
-        if not rows:
-            break
-        for row in rows:
-            facts[row.schema_name.lower()] = {
-                'name': row.schema_name,
-                'owner': row.schema_owner,
-                'create_time': str(row.create_time),
-                'usage_roles': [],
-                'create_roles': []}
-    cursor.execute("""
-        select g.object_name as schema_name, r.name as role_name,
+        select s.schema_name, s.schema_owner, s.create_time, r.name as role_name,
         lower(g.privileges_description) privileges_description
-        from roles r join grants g
-        on g.grantee = r.name and g.object_type='SCHEMA'
+        from schemata s
+        left join grants g
+        on g.object_type = 'SCHEMA' and g.object_name = s.schema_name
         and g.privileges_description like '%USAGE%'
         and g.grantee not in ('public', 'dbadmin')
-        and (? = '' or g.object_name ilike ?)
+        left join roles r on g.grantee_id = r.role_id
+        where not s.is_system_schema and s.schema_name not in ('public')
+        and (? = '' or s.schema_name ilike ?)
     """, schema, schema)
     while True:
-        rows = cursor.fetchmany(100)
+        rows = cursor.fetchmany(FETCH_SIZE)
         if not rows:
             break
         for row in rows:
             schema_key = row.schema_name.lower()
+            if schema_key not in facts:
+                facts[schema_key] = {
+                    'name': row.schema_name,
+                    'owner': row.schema_owner,
+                    'create_time': str(row.create_time),
+                    'usage_roles': [],
+                    'create_roles': []}
+            if row.role_name is None:
+                continue
             if 'create' in row.privileges_description:
                 facts[schema_key]['create_roles'].append(row.role_name)
             else:
@@ -131,7 +129,7 @@ def get_user_facts(cursor, user=''):
         and (? = '' or u.user_name ilike ?)
      """, user, user)
     while True:
-        rows = cursor.fetchmany(100)
+        rows = cursor.fetchmany(FETCH_SIZE)
         if not rows:
             break
         for row in rows:
@@ -161,7 +159,7 @@ def get_role_facts(cursor, role=''):
         where (? = '' or r.name ilike ?)
     """, role, role)
     while True:
-        rows = cursor.fetchmany(100)
+        rows = cursor.fetchmany(FETCH_SIZE)
         if not rows:
             break
         for row in rows:
@@ -182,7 +180,7 @@ def get_configuration_facts(cursor, parameter=''):
         and (? = '' or c.parameter_name ilike ?)
     """, parameter, parameter)
     while True:
-        rows = cursor.fetchmany(100)
+        rows = cursor.fetchmany(FETCH_SIZE)
         if not rows:
             break
         for row in rows:
@@ -200,7 +198,7 @@ def get_node_facts(cursor, schema=''):
         from nodes
     """)
     while True:
-        rows = cursor.fetchmany(100)
+        rows = cursor.fetchmany(FETCH_SIZE)
         if not rows:
             break
         for row in rows:
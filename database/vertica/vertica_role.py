@@ -27,7 +27,20 @@ options:
   name:
     description:
       - Name of the role to add or remove.
-    required: true
+      - Required unless I(roles) is given.
+    required: false
+  roles:
+    description:
+      - List of roles to manage together instead of I(name), each a dict with C(name) and
+        optionally C(assigned_roles) and C(state).
+      - All the roles are read in one query, compared in memory, and the changes applied with
+        the grants of the same role batched into one statement.
+      - Vertica commits every statement on its own, so a failure leaves the earlier statements
+        applied. They are returned in C(applied_statements).
+      - Mutually exclusive with I(name).
+    required: false
+    default: null
+    version_added: "2.1"
   assigned_roles:
     description:
       - Comma separated list of roles to assign to the role.
@@ -84,6 +97,14 @@ EXAMPLES = """
 
 - name: creating a new vertica role with other role assigned
   vertica_role: name=role_name assigned_role=other_role_name state=present
+
+- name: syncing many vertica roles at once
+  vertica_role:
+    db: db_name
+    roles:
+      - { name: app_ro }
+      - { name: app_rw, assigned_roles: app_ro }
+      - { name: legacy_rw, state: absent }
 """
 
 try:
@@ -93,6 +114,9 @@ except ImportError:
 else:
     pyodbc_found = True
 
+FETCH_SIZE = 1000
+BATCH_SIZE = 200
+
 class NotSupportedError(Exception):
     pass
 
@@ -109,7 +133,7 @@ def get_role_facts(cursor, role=''):
         where (? = '' or r.name ilike ?)
     """, role, role)
     while True:
-        rows = cursor.fetchmany(100)
+        rows = cursor.fetchmany(FETCH_SIZE)
         if not rows:
             break
         for row in rows:
@@ -164,13 +188,66 @@ def absent(role_facts, cursor, role, assigned_roles):
     else:
         return False
 
+def bulk_statements(role_facts, entries):
+    """Statements bringing every role in entries to its state.
+
+    The diff is worked out against role_facts in memory and grants of the
+    same role are grouped into one statement.
+    """
+    creates = []
+    drops = []
+    grants = {}
+    revokes = {}
+    for entry in entries:
+        role = entry['name']
+        role_key = role.lower()
+        assigned_roles = as_list(entry.get('assigned_roles'))
+        if entry.get('state', 'present') == 'absent':
+            if role_key in role_facts:
+                for assigned_role in role_facts[role_key]['assigned_roles']:
+                    revokes.setdefault(assigned_role, []).append(role)
+                drops.append("drop role {0} cascade".format(role_facts[role_key]['name']))
+            continue
+        if role_key not in role_facts:
+            creates.append("create role {0}".format(role))
+            existing = []
+        elif assigned_roles:
+            existing = role_facts[role_key]['assigned_roles']
+        else:
+            continue
+        for assigned_role in set(existing) - set(assigned_roles):
+            revokes.setdefault(assigned_role, []).append(role)
+        for assigned_role in set(assigned_roles) - set(existing):
+            grants.setdefault(assigned_role, []).append(role)
+    return (creates +
+            grouped_statements("revoke {0} from {1}", revokes) +
+            grouped_statements("grant {0} to {1}", grants) +
+            drops)
+
+def as_list(value):
+    if not value:
+        return []
+    if isinstance(value, basestring):
+        value = value.split(',')
+    return filter(None, [item.strip() for item in value])
+
+def grouped_statements(template, grouped):
+    """One statement per target, covering BATCH_SIZE grantees at a time."""
+    statements = []
+    for target in sorted(grouped):
+        grantees = grouped[target]
+        for start in range(0, len(grantees), BATCH_SIZE):
+            statements.append(template.format(target, ','.join(grantees[start:start + BATCH_SIZE])))
+    return statements
+
 # module logic
 
 def main():
 
     module = AnsibleModule(
         argument_spec=dict(
-            role=dict(required=True, aliases=['name']),
+            role=dict(default=None, aliases=['name']),
+            roles=dict(default=None, type='list'),
             assigned_roles=dict(default=None, aliases=['assigned_role']),
             state=dict(default='present', choices=['absent', 'present']),
             db=dict(default=None),
@@ -178,7 +255,10 @@ def main():
             port=dict(default='5433'),
             login_user=dict(default='dbadmin'),
             login_password=dict(default=None),
-        ), supports_check_mode = True)
+        ),
+        required_one_of=[['role', 'roles']],
+        mutually_exclusive=[['role', 'roles']],
+        supports_check_mode = True)
 
     if not pyodbc_found:
         module.fail_json(msg="The python pyodbc module is required.")
@@ -211,6 +291,24 @@ def main():
     except Exception, e:
         module.fail_json(msg="Unable to connect to database: {0}.".format(e))
 
+    if module.params['roles'] is not None:
+        applied = []
+        try:
+            role_facts = get_role_facts(cursor)
+            statements = bulk_statements(role_facts, module.params['roles'])
+            if statements and not module.check_mode:
+                # vertica commits every DDL statement, a failure leaves the earlier ones applied
+                for statement in statements:
+                    cursor.execute(statement)
+                    applied.append(statement)
+                role_facts = get_role_facts(cursor)
+        except pyodbc.Error, e:
+            module.fail_json(msg=str(e), applied_statements=applied)
+        except KeyError, e:
+            module.fail_json(msg="Missing {0} in an entry of roles.".format(e))
+        module.exit_json(changed=bool(statements), statement_count=len(statements),
+            ansible_facts={'vertica_roles': role_facts})
+
     try:
         role_facts = get_role_facts(cursor)
         if module.check_mode:
@@ -32,7 +32,20 @@ options:
   name:
     description:
       - Name of the schema to add or remove.
-    required: true
+      - Required unless I(schemas) is given.
+    required: false
+  schemas:
+    description:
+      - List of schemas to manage together instead of I(name), each a dict with C(name) and
+        optionally C(usage_roles), C(create_roles), C(owner) and C(state).
+      - All the schemas and their grants are read in one query and compared in memory before
+        the changes are applied.
+      - Vertica commits every statement on its own, so a failure leaves the earlier statements
+        applied. They are returned in C(applied_statements).
+      - Mutually exclusive with I(name).
+    required: false
+    default: null
+    version_added: "2.1"
   usage_roles:
     description:
       - Comma separated list of roles to create and grant usage access to the schema.
@@ -108,6 +121,14 @@ EXAMPLES = """
     usage_roles=schema_name_ro,schema_name_rw
     db=db_name
     state=present
+
+- name: syncing many schemas at once
+  vertica_schema:
+    db: db_name
+    schemas:
+      - { name: sales, create_roles: sales_all, usage_roles: "sales_ro,sales_rw" }
+      - { name: staging, owner: etl }
+      - { name: legacy, state: absent }
 """
 
 try:
@@ -117,6 +138,8 @@ except ImportError:
 else:
     pyodbc_found = True
 
+FETCH_SIZE = 1000
+
 class NotSupportedError(Exception):
     pass
 
@@ -128,37 +151,32 @@ class CannotDropError(Exception):
 def get_schema_facts(cursor, schema=''):
     facts = {}
     cursor.execute("""
-        select schema_name, schema_owner, create_time
-        from schemata
-        where not is_system_schema and schema_name not in ('public', 'TxtIndex')
-        and (? = '' or schema_name ilike ?)
-    """, schema, schema)
-    while True:
-        rows = cursor.fetchmany(100)
-        if not rows:
-            break
-        for row in rows:
-            facts[row.schema_name.lower()] = {
-                'name': row.schema_name,
-                'owner': row.schema_owner,
-                'create_time': str(row.create_time),
-                'usage_roles': [],
-                'create_roles': []}
-    cursor.execute("""
-        select g.object_name as schema_name, r.name as role_name,
+        select s.schema_name, s.schema_owner, s.create_time, r.name as role_name,
         lower(g.privileges_description) privileges_description
-        from roles r join grants g
-        on g.grantee_id = r.role_id and g.object_type='SCHEMA'
+        from schemata s
+        left join grants g
+        on g.object_type = 'SCHEMA' and g.object_name = s.schema_name
         and g.privileges_description like '%USAGE%'
         and g.grantee not in ('public', 'dbadmin')
-        and (? = '' or g.object_name ilike ?)
+        left join roles r on g.grantee_id = r.role_id
+        where not s.is_system_schema and s.schema_name not in ('public', 'TxtIndex')
+        and (? = '' or s.schema_name ilike ?)
     """, schema, schema)
     while True:
-        rows = cursor.fetchmany(100)
+        rows = cursor.fetchmany(FETCH_SIZE)
         if not rows:
             break
         for row in rows:
             schema_key = row.schema_name.lower()
+            if schema_key not in facts:
+                facts[schema_key] = {
+                    'name': row.schema_name,
+                    'owner': row.schema_owner,
+                    'create_time': str(row.create_time),
+                    'usage_roles': [],
+                    'create_roles': []}
+            if row.role_name is None:
+                continue
             if 'create' in row.privileges_description:
                 facts[schema_key]['create_roles'].append(row.role_name)
             else:
@@ -231,13 +249,73 @@ def absent(schema_facts, cursor, schema, usage_roles, create_roles):
     else:
         return False
 
+def bulk_statements(schema_facts, entries):
+    """Statements bringing every schema in entries to its state.
+
+    Follows update_roles for each schema, but the diff is worked out
+    against schema_facts in memory and the privileges granted on one
+    schema go out as one statement.
+    """
+    creates = []
+    role_drops = []
+    role_creates = []
+    privileges = []
+    drops = []
+    for entry in entries:
+        schema = entry['name']
+        schema_key = schema.lower()
+        usage_roles = as_list(entry.get('usage_roles'))
+        create_roles = as_list(entry.get('create_roles'))
+        owner = entry.get('owner')
+        if entry.get('state', 'present') == 'absent':
+            if schema_key not in schema_facts:
+                continue
+            usage_roles, create_roles, owner = [], [], None
+            drops.append("drop schema {0} restrict".format(schema_facts[schema_key]['name']))
+        if schema_key not in schema_facts:
+            query_fragments = ["create schema {0}".format(schema)]
+            if owner:
+                query_fragments.append("authorization {0}".format(owner))
+            creates.append(' '.join(query_fragments))
+            usage_existing, create_existing = [], []
+        else:
+            if owner and owner.lower() != schema_facts[schema_key]['owner'].lower():
+                raise NotSupportedError((
+                    "Changing owner of schema {0} is not supported. "
+                    "Current owner: {1}."
+                    ).format(schema, schema_facts[schema_key]['owner']))
+            usage_existing = schema_facts[schema_key]['usage_roles']
+            create_existing = schema_facts[schema_key]['create_roles']
+        existing = set(usage_existing + create_existing)
+        required = set(usage_roles + create_roles)
+        role_drops.extend("drop role {0} cascade".format(role) for role in sorted(existing - required))
+        role_creates.extend("create role {0}".format(role) for role in sorted(required - existing))
+        revoke_create = sorted(set(create_existing) - set(create_roles) - (existing - required))
+        if revoke_create:
+            privileges.append("revoke create on schema {0} from {1}".format(schema, ','.join(revoke_create)))
+        grant_usage = sorted(required - existing)
+        if grant_usage:
+            privileges.append("grant usage on schema {0} to {1}".format(schema, ','.join(grant_usage)))
+        grant_create = sorted(set(create_roles) - set(create_existing))
+        if grant_create:
+            privileges.append("grant create on schema {0} to {1}".format(schema, ','.join(grant_create)))
+    return creates + role_drops + role_creates + privileges + drops
+
+def as_list(value):
+    if not value:
+        return []
+    if isinstance(value, basestring):
+        value = value.split(',')
+    return filter(None, [item.strip() for item in value])
+
 # module logic
 
 def main():
 
     module = AnsibleModule(
         argument_spec=dict(
-            schema=dict(required=True, aliases=['name']),
+            schema=dict(default=None, aliases=['name']),
+            schemas=dict(default=None, type='list'),
             usage_roles=dict(default=None, aliases=['usage_role']),
             create_roles=dict(default=None, aliases=['create_role']),
             owner=dict(default=None),
@@ -247,7 +325,10 @@ def main():
             port=dict(default='5433'),
             login_user=dict(default='dbadmin'),
             login_password=dict(default=None),
-        ), supports_check_mode = True)
+        ),
+        required_one_of=[['schema', 'schemas']],
+        mutually_exclusive=[['schema', 'schemas']],
+        supports_check_mode = True)
 
     if not pyodbc_found:
         module.fail_json(msg="The python pyodbc module is required.")
@@ -285,6 +366,26 @@ def main():
     except Exception, e:
         module.fail_json(msg="Unable to connect to database: {0}.".format(e))
 
+    if module.params['schemas'] is not None:
+        applied = []
+        try:
+            schema_facts = get_schema_facts(cursor)
+            statements = bulk_statements(schema_facts, module.params['schemas'])
+            if statements and not module.check_mode:
+                # vertica commits every DDL statement, a failure leaves the earlier ones applied
+                for statement in statements:
+                    cursor.execute(statement)
+                    applied.append(statement)
+                schema_facts = get_schema_facts(cursor)
+        except NotSupportedError, e:
+            module.fail_json(msg=str(e), ansible_facts={'vertica_schemas': schema_facts})
+        except pyodbc.Error, e:
+            module.fail_json(msg=str(e), applied_statements=applied)
+        except KeyError, e:
+            module.fail_json(msg="Missing {0} in an entry of schemas.".format(e))
+        module.exit_json(changed=bool(statements), statement_count=len(statements),
+            ansible_facts={'vertica_schemas': schema_facts})
+
     try:
         schema_facts = get_schema_facts(cursor)
         if module.check_mode:
@@ -30,7 +30,21 @@ options:
   name:
     description:
       - Name of the user to add or remove.
-    required: true
+      - Required unless I(users) is given.
+    required: false
+  users:
+    description:
+      - List of users to manage together instead of I(name), each a dict with C(name) and
+        optionally C(profile), C(resource_pool), C(password), C(expired), C(ldap), C(roles)
+        and C(state).
+      - All the users are read in one query, compared in memory, and the changes applied with
+        the grants of the same role or resource pool batched into one statement.
+      - Vertica commits every statement on its own, so a failure leaves the earlier statements
+        applied. They are returned in C(applied_statements).
+      - Mutually exclusive with I(name).
+    required: false
+    default: null
+    version_added: "2.1"
   profile:
     description:
       - Sets the user's profile.
@@ -121,6 +135,15 @@ EXAMPLES = """
     db=db_name
     roles=schema_name_ro
     state=present
+
+- name: syncing the whole access model in one task
+  vertica_user:
+    db: db_name
+    users:
+      - { name: alice, ldap: true, roles: "sales_ro,staging_rw" }
+      - { name: etl, password: "md5<encrypted_password>", resource_pool: batch, roles: staging_all }
+      - { name: bob, state: locked }
+      - { name: mallory, state: absent }
 """
 
 try:
@@ -130,6 +153,9 @@ except ImportError:
 else:
     pyodbc_found = True
 
+FETCH_SIZE = 1000
+BATCH_SIZE = 200
+
 class NotSupportedError(Exception):
     pass
 
@@ -150,7 +176,7 @@ def get_user_facts(cursor, user=''):
         and (? = '' or u.user_name ilike ?)
     """, user, user)
     while True:
-        rows = cursor.fetchmany(100)
+        rows = cursor.fetchmany(FETCH_SIZE)
         if not rows:
             break
         for row in rows:
@@ -289,13 +315,126 @@ def absent(user_facts, cursor, user, roles):
     else:
         return False
 
+def bulk_statements(user_facts, entries):
+    """Statements bringing every user in entries to its state.
+
+    Follows present and absent for each user, but the diff is worked out
+    against user_facts in memory and the grants of the same role or
+    resource pool are grouped into one statement.
+    """
+    users = []
+    default_roles = []
+    drops = []
+    grants = {}
+    revokes = {}
+    pool_grants = {}
+    pool_revokes = {}
+    for entry in entries:
+        user = entry['name']
+        user_key = user.lower()
+        state = entry.get('state', 'present')
+        roles = as_list(entry.get('roles'))
+        if state == 'absent':
+            if user_key in user_facts:
+                for role in user_facts[user_key]['roles']:
+                    revokes.setdefault(role, []).append(user)
+                drops.append("drop user {0}".format(user_facts[user_key]['name']))
+            continue
+        locked = state == 'locked'
+        profile = entry.get('profile')
+        if profile:
+            profile = profile.lower()
+        resource_pool = entry.get('resource_pool')
+        if resource_pool:
+            resource_pool = resource_pool.lower()
+        password = entry.get('password')
+        expired = entry.get('expired')
+        ldap = entry.get('ldap')
+        if user_key not in user_facts:
+            query_fragments = ["create user {0}".format(user)]
+            if locked:
+                query_fragments.append("account lock")
+            if password:
+                query_fragments.append("identified by '{0}'".format(password))
+            elif ldap:
+                query_fragments.append("identified by '$ldap$'")
+            if expired or ldap:
+                query_fragments.append("password expire")
+            if profile:
+                query_fragments.append("profile {0}".format(profile))
+            if resource_pool:
+                query_fragments.append("resource pool {0}".format(resource_pool))
+            users.append(' '.join(query_fragments))
+            if resource_pool and resource_pool != 'general':
+                pool_grants.setdefault(resource_pool, []).append(user)
+            existing_roles = []
+        else:
+            facts = user_facts[user_key]
+            query_fragments = []
+            if locked != (facts['locked'] == 'True'):
+                query_fragments.append("account {0}".format(locked and 'lock' or 'unlock'))
+            if password and password != facts['password']:
+                query_fragments.append("identified by '{0}'".format(password))
+            if ldap:
+                if ldap != (facts['expired'] == 'True'):
+                    query_fragments.append("password expire")
+            elif expired is not None and expired != (facts['expired'] == 'True'):
+                if expired:
+                    query_fragments.append("password expire")
+                else:
+                    raise NotSupportedError(
+                        "Unexpiring password of user {0} is not supported.".format(user))
+            if profile and profile != facts['profile']:
+                query_fragments.append("profile {0}".format(profile))
+            if resource_pool and resource_pool != facts['resource_pool']:
+                query_fragments.append("resource pool {0}".format(resource_pool))
+                if facts['resource_pool'] != 'general':
+                    pool_revokes.setdefault(facts['resource_pool'], []).append(user)
+                if resource_pool != 'general':
+                    pool_grants.setdefault(resource_pool, []).append(user)
+            if query_fragments:
+                users.append("alter user {0} {1}".format(user, ' '.join(query_fragments)))
+            if not roles or (sorted(roles) == sorted(facts['roles']) and
+                             sorted(roles) == sorted(facts['default_roles'])):
+                continue
+            existing_roles = facts['roles']
+        for role in set(existing_roles) - set(roles):
+            revokes.setdefault(role, []).append(user)
+        for role in set(roles) - set(existing_roles):
+            grants.setdefault(role, []).append(user)
+        if roles:
+            default_roles.append("alter user {0} default role {1}".format(user, ','.join(roles)))
+    return (users +
+            grouped_statements("revoke usage on resource pool {0} from {1}", pool_revokes) +
+            grouped_statements("grant usage on resource pool {0} to {1}", pool_grants) +
+            grouped_statements("revoke {0} from {1}", revokes) +
+            grouped_statements("grant {0} to {1}", grants) +
+            default_roles + drops)
+
+def as_list(value):
+    if not value:
+        return []
+    if isinstance(value, basestring):
+        value = value.split(',')
+    return filter(None, [item.strip() for item in value])
+
+def grouped_statements(template, grouped):
+    """One statement per target, covering BATCH_SIZE grantees at a time."""
+    statements = []
+    for target in sorted(grouped):
+        grantees = grouped[target]
+        for start in range(0, len(grantees), BATCH_SIZE):
+            statements.append(template.format(target, ','.join(grantees[start:start + BATCH_SIZE])))
+    return statements
+
 # module logic
 
 def main():
 
     module = AnsibleModule(
         argument_spec=dict(
-            user=dict(required=True, aliases=['name']),
+            user=dict(default=None, aliases=['name']),
+            users=dict(default=None, type='list'),
             profile=dict(default=None),
             resource_pool=dict(default=None),
             password=dict(default=None),
@@ -308,7 +447,10 @@ def main():
             port=dict(default='5433'),
             login_user=dict(default='dbadmin'),
             login_password=dict(default=None),
-        ), supports_check_mode = True)
+        ),
+        required_one_of=[['user', 'users']],
+        mutually_exclusive=[['user', 'users']],
+        supports_check_mode = True)
 
     if not pyodbc_found:
         module.fail_json(msg="The python pyodbc module is required.")
@@ -354,6 +496,26 @@ def main():
     except Exception, e:
         module.fail_json(msg="Unable to connect to database: {0}.".format(e))
 
+    if module.params['users'] is not None:
+        applied = []
+        try:
+            user_facts = get_user_facts(cursor)
+            statements = bulk_statements(user_facts, module.params['users'])
+            if statements and not module.check_mode:
+                # vertica commits every DDL statement, a failure leaves the earlier ones applied
+                for statement in statements:
+                    cursor.execute(statement)
+                    applied.append(statement)
+                user_facts = get_user_facts(cursor)
+        except NotSupportedError, e:
+            module.fail_json(msg=str(e), ansible_facts={'vertica_users': user_facts})
+        except pyodbc.Error, e:
+            module.fail_json(msg=str(e), applied_statements=applied)
+        except KeyError, e:
+            module.fail_json(msg="Missing {0} in an entry of users.".format(e))
+        module.exit_json(changed=bool(statements), statement_count=len(statements),
+            ansible_facts={'vertica_users': user_facts})
+
     try:
         user_facts = get_user_facts(cursor)
         if module.check_mode:
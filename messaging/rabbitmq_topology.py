@@ -0,0 +1,406 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+DOCUMENTATION = '''
+---
+module: rabbitmq_topology
+version_added: "2.1"
+short_description: Synchronise queues, exchanges, bindings and policies of a rabbitMQ vhost
+description:
+  - Converges a whole vhost topology in one task instead of one object per task
+    as M(rabbitmq_queue), M(rabbitmq_exchange), M(rabbitmq_binding) and
+    M(rabbitmq_policy) do.
+  - The current state is read with a single GET of C(/api/definitions/{vhost}),
+    the differences are computed in memory and applied over a pooled HTTP session.
+  - When only additions are needed they are uploaded with a single definitions POST,
+    otherwise changes are applied concurrently, exchanges and queues first, then
+    bindings and policies.
+requirements: [ python requests ]
+options:
+    login_user:
+        description:
+            - rabbitMQ user for connection
+        required: false
+        default: guest
+    login_password:
+        description:
+            - rabbitMQ password for connection
+        required: false
+        default: guest
+    login_host:
+        description:
+            - rabbitMQ host for connection
+        required: false
+        default: localhost
+    login_port:
+        description:
+            - rabbitMQ management api port
+        required: false
+        default: 15672
+    vhost:
+        description:
+            - rabbitMQ virtual host
+        required: false
+        default: "/"
+    queues:
+        description:
+            - List of queues, each a dict with C(name) and optional C(durable),
+              C(auto_delete) and C(arguments) keys.
+        required: false
+        default: []
+    exchanges:
+        description:
+            - List of exchanges, each a dict with C(name) and optional C(type),
+              C(durable), C(auto_delete), C(internal) and C(arguments) keys.
+        required: false
+        default: []
+    bindings:
+        description:
+            - List of bindings, each a dict with C(source), C(destination) and optional
+              C(destination_type) (queue or exchange), C(routing_key) and C(arguments) keys.
+        required: false
+        default: []
+    policies:
+        description:
+            - List of policies, each a dict with C(name), C(pattern), C(definition) and
+              optional C(apply_to) and C(priority) keys.
+        required: false
+        default: []
+    purge:
+        description:
+            - Delete queues, exchanges, bindings and policies of the vhost which are not
+              listed. Built-in C(amq.*) exchanges and server-named queues are never removed.
+        required: false
+        choices: [ "yes", "no" ]
+        default: no
+    workers:
+        description:
+            - Number of concurrent requests (and pooled connections) used to apply changes.
+        required: false
+        default: 8
+author: "Ansible Core Team"
+'''
+
+EXAMPLES = '''
+- rabbitmq_topology:
+    vhost: /orders
+    exchanges:
+      - { name: orders, type: topic }
+    queues:
+      - { name: orders.created, arguments: { x-message-ttl: 60000 } }
+      - { name: orders.cancelled }
+    bindings:
+      - { source: orders, destination: orders.created, routing_key: "created.#" }
+      - { source: orders, destination: orders.cancelled, routing_key: "cancelled.#" }
+    policies:
+      - { name: ha, pattern: ".*", definition: { ha-mode: all } }
+
+# Remove everything which is not declared
+- rabbitmq_topology: vhost=/orders purge=yes
+  args:
+    queues: "{{ order_queues }}"
+'''
+
+import urllib
+import threading
+import Queue
+
+try:
+    import json
+except ImportError:
+    import simplejson as json
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    HAS_REQUESTS = True
+except ImportError:
+    HAS_REQUESTS = False
+
+
+def _quote(value):
+    return urllib.quote(value, '')
+
+
+def run_concurrently(func, items, workers):
+    """Call func on every item using at most workers threads.
+
+    Returns a list of (item, error) tuples for the calls which raised.
+    """
+    work = Queue.Queue()
+    for item in items:
+        work.put(item)
+    errors = []
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            try:
+                item = work.get_nowait()
+            except Queue.Empty:
+                return
+            try:
+                func(item)
+            except Exception, e:
+                lock.acquire()
+                try:
+                    errors.append((item, str(e)))
+                finally:
+                    lock.release()
+
+    threads = [threading.Thread(target=worker) for i in range(min(workers, len(items)))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return errors
+
+
+class RabbitMqTopology(object):
+
+    QUEUE_DEFAULTS = dict(durable=True, auto_delete=False, arguments={})
+    EXCHANGE_DEFAULTS = dict(type='direct', durable=True, auto_delete=False, internal=False, arguments={})
+    BINDING_DEFAULTS = dict(destination_type='queue', routing_key='#', arguments={})
+    POLICY_DEFAULTS = dict(apply_to='all', priority=0)
+
+    def __init__(self, module):
+        self._module = module
+        self._vhost = module.params['vhost']
+        self._purge = module.params['purge']
+        self._workers = max(1, module.params['workers'])
+        self._base = "http://%s:%s/api" % (module.params['login_host'], module.params['login_port'])
+
+        self._session = requests.Session()
+        self._session.auth = (module.params['login_user'], module.params['login_password'])
+        self._session.headers.update({"content-type": "application/json"})
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self._workers)
+        self._session.mount('http://', adapter)
+
+    def _url(self, *parts):
+        return '/'.join([self._base] + [_quote(p) for p in parts])
+
+    def _request(self, method, url, data=None):
+        if data is not None:
+            data = json.dumps(data)
+        r = self._session.request(method, url, data=data)
+        if r.status_code not in (200, 201, 204):
+            raise Exception("%s %s returned %s: %s" % (method, url, r.status_code, r.text))
+        return r
+
+    def fetch(self):
+        r = self._session.get(self._url('definitions', self._vhost))
+        if r.status_code != 200:
+            self._module.fail_json(msg="Invalid response from RESTAPI when fetching definitions",
+                                   status=r.status_code, details=r.text)
+        return r.json()
+
+    # Every object is reduced to a key and a body holding the attributes
+    # which are compared and sent to the API.
+
+    def _normalise(self, kind, items, defaults, required):
+        result = {}
+        for item in items:
+            for attr in required:
+                if attr not in item:
+                    self._module.fail_json(msg="Missing '%s' in %s" % (attr, item))
+            body = dict(defaults)
+            body.update(item)
+            body.pop('vhost', None)
+            if kind == 'policies':
+                if 'apply-to' in body:
+                    body['apply_to'] = body.pop('apply-to')
+                body['priority'] = int(body['priority'])
+                key = body['name']
+            elif kind == 'bindings':
+                if body['destination_type'] not in ('queue', 'exchange'):
+                    self._module.fail_json(msg="destination_type must be queue or exchange", binding=item)
+                key = (body['source'], body['destination_type'], body['destination'],
+                       body['routing_key'], json.dumps(body['arguments'], sort_keys=True))
+            else:
+                key = body['name']
+            result[key] = body
+        return result
+
+    def _normalise_all(self, queues, exchanges, bindings, policies):
+        return dict(
+            queues=self._normalise('queues', queues, self.QUEUE_DEFAULTS, ['name']),
+            exchanges=self._normalise('exchanges', exchanges, self.EXCHANGE_DEFAULTS, ['name']),
+            bindings=self._normalise('bindings', bindings, self.BINDING_DEFAULTS, ['source', 'destination']),
+            policies=self._normalise('policies', policies, self.POLICY_DEFAULTS, ['name', 'pattern', 'definition']),
+        )
+
+    def desired(self):
+        p = self._module.params
+        return self._normalise_all(p['queues'], p['exchanges'], p['bindings'], p['policies'])
+
+    def current(self, definitions):
+        exchanges = [e for e in definitions.get('exchanges', [])
+                     if e['name'] and not e['name'].startswith('amq.')]
+        queues = [q for q in definitions.get('queues', []) if not q['name'].startswith('amq.gen-')]
+        bindings = [b for b in definitions.get('bindings', []) if b['source']]
+        return self._normalise_all(queues, exchanges, bindings, definitions.get('policies', []))
+
+    def diff(self, desired, current):
+        create, update, delete = [], [], []
+        for kind in ('exchanges', 'queues', 'bindings', 'policies'):
+            for key, body in desired[kind].items():
+                if key not in current[kind]:
+                    create.append((kind, body))
+                elif kind == 'policies':
+                    if current[kind][key] != body:
+                        update.append((kind, body))
+                elif kind != 'bindings':
+                    existing = current[kind][key]
+                    changed = [a for a in body if existing.get(a) != body[a]]
+                    if changed:
+                        self._module.fail_json(
+                            msg="RabbitMQ RESTAPI doesn't support attribute changes for existing %s" % kind,
+                            name=body['name'], attributes=changed)
+            if self._purge:
+                for key, body in current[kind].items():
+                    if key not in desired[kind]:
+                        delete.append((kind, body))
+        return create, update, delete
+
+    def _put(self, change):
+        kind, body = change
+        if kind == 'exchanges':
+            data = dict((k, body[k]) for k in ('type', 'durable', 'auto_delete', 'internal', 'arguments'))
+            self._request('PUT', self._url('exchanges', self._vhost, body['name']), data)
+        elif kind == 'queues':
+            data = dict((k, body[k]) for k in ('durable', 'auto_delete', 'arguments'))
+            self._request('PUT', self._url('queues', self._vhost, body['name']), data)
+        elif kind == 'bindings':
+            url = "%s/%s/%s" % (self._url('bindings', self._vhost, 'e', body['source']),
+                                body['destination_type'][0], _quote(body['destination']))
+            self._request('POST', url, dict(routing_key=body['routing_key'], arguments=body['arguments']))
+        else:
+            data = {'pattern': body['pattern'], 'definition': body['definition'],
+                    'priority': int(body['priority']), 'apply-to': body['apply_to']}
+            self._request('PUT', self._url('policies', self._vhost, body['name']), data)
+
+    def _delete(self, change):
+        kind, body = change
+        if kind == 'bindings':
+            url = "%s/%s/%s" % (self._url('bindings', self._vhost, 'e', body['source']),
+                                body['destination_type'][0], _quote(body['destination']))
+            for binding in self._request('GET', url).json():
+                if binding['routing_key'] == body['routing_key'] and \
+                        binding.get('arguments', {}) == body['arguments']:
+                    self._request('DELETE', "%s/%s" % (url, _quote(binding['properties_key'])))
+        else:
+            self._request('DELETE', self._url(kind, self._vhost, body['name']))
+
+    def _post_definitions(self, create):
+        definitions = dict(queues=[], exchanges=[], bindings=[], policies=[])
+        for kind, body in create:
+            item = dict(body)
+            item['vhost'] = self._vhost
+            if kind == 'policies':
+                item['apply-to'] = item.pop('apply_to')
+            definitions[kind].append(item)
+        self._request('POST', self._url('definitions', self._vhost), definitions)
+
+    def apply(self, create, update, delete):
+        errors = []
+        if create and not update and not delete:
+            try:
+                self._post_definitions(create)
+            except Exception, e:
+                errors.append((None, str(e)))
+            return errors
+
+        # Bindings go before the exchanges and queues they reference when
+        # deleting, and after them when creating.
+        phases = [
+            [c for c in delete if c[0] in ('bindings', 'policies')],
+            [c for c in delete if c[0] in ('exchanges', 'queues')],
+        ]
+        for phase in phases:
+            errors.extend(run_concurrently(self._delete, phase, self._workers))
+        phases = [
+            [c for c in create if c[0] in ('exchanges', 'queues')],
+            [c for c in create + update if c[0] in ('bindings', 'policies')],
+        ]
+        for phase in phases:
+            errors.extend(run_concurrently(self._put, phase, self._workers))
+        return errors
+
+
+def summarise(changes):
+    result = dict(queues=[], exchanges=[], bindings=[], policies=[])
+    for kind, body in changes:
+        if kind == 'bindings':
+            result[kind].append(dict((k, body[k]) for k in ('source', 'destination', 'destination_type', 'routing_key')))
+        else:
+            result[kind].append(body['name'])
+    return result
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec = dict(
+            login_user = dict(default='guest', type='str'),
+            login_password = dict(default='guest', type='str', no_log=True),
+            login_host = dict(default='localhost', type='str'),
+            login_port = dict(default='15672', type='str'),
+            vhost = dict(default='/', type='str'),
+            queues = dict(default=[], type='list'),
+            exchanges = dict(default=[], type='list'),
+            bindings = dict(default=[], type='list'),
+            policies = dict(default=[], type='list'),
+            purge = dict(default=False, type='bool'),
+            workers = dict(default=8, type='int'),
+        ),
+        supports_check_mode = True
+    )
+
+    if not HAS_REQUESTS:
+        module.fail_json(msg="requests is required for this module")
+
+    topology = RabbitMqTopology(module)
+    current = topology.current(topology.fetch())
+    create, update, delete = topology.diff(topology.desired(), current)
+    changed = bool(create or update or delete)
+
+    result = dict(
+        changed = changed,
+        vhost = module.params['vhost'],
+        created = summarise(create),
+        updated = summarise(update),
+        deleted = summarise(delete),
+    )
+
+    if changed and not module.check_mode:
+        errors = topology.apply(create, update, delete)
+        if errors:
+            result['errors'] = []
+            for c, e in errors:
+                if c:
+                    change = summarise([c])
+                else:
+                    change = None
+                result['errors'].append(dict(change=change, error=e))
+            module.fail_json(msg="Error applying topology changes", **result)
+
+    module.exit_json(**result)
+
+# import module snippets
+from ansible.module_utils.basic import *
+main()
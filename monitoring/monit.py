@@ -18,6 +18,7 @@
 # You should have received a copy of the GNU General Public License
 # along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
 #
+import base64
 import time
 
 DOCUMENTATION = '''
@@ -30,7 +31,10 @@ version_added: "1.2"
 options:
   name:
     description:
-      - The name of the I(monit) program/process to manage
+      - The name of the I(monit) program/process to manage.
+      - Since 2.1 this can be a list of names, or names separated by commas. The action of every
+        service is issued first and the services are then waited on together, each one finishing
+        as soon as it reaches the requested state.
     required: true
     default: null
   state:
@@ -43,10 +47,29 @@ options:
     description:
       - If there are pending actions for the service monitored by monit, then Ansible will check
         for up to this many seconds to verify the the requested action has been performed.
-        Ansible will sleep for five seconds between each check.
+        The delay between checks starts at 0.1 seconds and doubles up to five seconds.
     required: false
     default: 300
     version_added: "2.1"
+  http_url:
+    description:
+      - URL of the monit HTTP interface, i.e. C(http://localhost:2812). When set, the status of
+        the services is read from C(/_status?format=xml) instead of running C(monit summary).
+    required: false
+    default: null
+    version_added: "2.1"
+  http_username:
+    description:
+      - Username for the monit HTTP interface.
+    required: false
+    default: null
+    version_added: "2.1"
+  http_password:
+    description:
+      - Password for the monit HTTP interface.
+    required: false
+    default: null
+    version_added: "2.1"
 requirements: [ ]
 author: "Darryl Stoflet (@dstoflet)" 
 '''
@@ -54,35 +77,117 @@ author: "Darryl Stoflet (@dstoflet)"
 EXAMPLES = '''
 # Manage the state of program "httpd" to be in "started" state.
 - monit: name=httpd state=started
+
+# Restart several programs at once, reading their status from the monit HTTP interface
+- monit: name=httpd,php-fpm,memcached state=restarted http_url=http://localhost:2812
+'''
+
+RETURN = '''
+services:
+    description: status of each service and how long it took to reach the requested state, when
+                 more than one name is given
+    returned: success
+    type: list
+    sample: [{"name": "httpd", "action": "restart", "status": "running", "wait_seconds": 1.62}]
 '''
 
+# Pending actions reported by the monit HTTP interface
+MONIT_ACTIONS = {
+    1: 'alert',
+    2: 'restart',
+    3: 'stop',
+    4: 'exec',
+    5: 'unmonitor',
+    6: 'start',
+    7: 'monitor',
+}
+
+
+def is_pending(status):
+    return status == '' or 'pending' in status or 'initializing' in status
+
+
 def main():
     arg_spec = dict(
-        name=dict(required=True),
+        name=dict(required=True, type='list'),
         timeout=dict(default=300, type='int'),
-        state=dict(required=True, choices=['present', 'started', 'restarted', 'stopped', 'monitored', 'unmonitored', 'reloaded'])
+        state=dict(required=True, choices=['present', 'started', 'restarted', 'stopped', 'monitored', 'unmonitored', 'reloaded']),
+        http_url=dict(default=None),
+        http_username=dict(default=None),
+        http_password=dict(default=None, no_log=True),
     )
 
     module = AnsibleModule(argument_spec=arg_spec, supports_check_mode=True)
 
-    name = module.params['name']
+    names = module.params['name']
+    name = names[0]
     state = module.params['state']
     timeout = module.params['timeout']
+    http_url = module.params['http_url']
 
     MONIT = module.get_bin_path('monit', True)
 
-    def status():
-        """Return the status of the process in monit, or the empty string if not present."""
+    def summary():
+        """Return the status of every process in monit, from one `monit summary`."""
         rc, out, err = module.run_command('%s summary' % MONIT, check_rc=True)
+        statuses = {}
         for line in out.split('\n'):
             # Sample output lines:
             # Process 'name'    Running
             # Process 'name'    Running - restart pending
             parts = line.split()
-            if len(parts) > 2 and parts[0].lower() == 'process' and parts[1] == "'%s'" % name:
-                return ' '.join(parts[2:]).lower()
-        else:
-            return ''
+            if len(parts) > 2 and parts[0].lower() == 'process':
+                statuses[parts[1].strip("'")] = ' '.join(parts[2:]).lower()
+        return statuses
+
+    def http_status():
+        """Return the status of every service in monit, from the HTTP interface."""
+        headers = {}
+        if module.params['http_username']:
+            headers['Authorization'] = 'Basic %s' % base64.b64encode('%s:%s' % (
+                module.params['http_username'], module.params['http_password'] or ''))
+        url = '%s/_status?format=xml' % http_url.rstrip('/')
+        response, info = fetch_url(module, url, headers=headers)
+        if info['status'] != 200:
+            module.fail_json(msg='unable to read the monit status from %s: %s' % (url, info['msg']))
+        try:
+            import xml.etree.ElementTree as ET
+        except ImportError:
+            try:
+                import elementtree.ElementTree as ET
+            except ImportError:
+                module.fail_json(msg='http_url requires python >= 2.5 or the elementtree module')
+        try:
+            root = ET.fromstring(response.read())
+        except Exception, e:
+            # ParseError on python >= 2.7, ExpatError before
+            module.fail_json(msg='unable to parse the monit status from %s: %s' % (url, e))
+
+        statuses = {}
+        for service in root.findall('service'):
+            monitor = int(service.findtext('monitor') or 0)
+            if monitor == 0:
+                status = 'not monitored'
+            elif monitor == 2:
+                status = 'initializing'
+            elif int(service.findtext('status') or 0) == 0:
+                status = 'running'
+            else:
+                status = 'failed'
+            action = MONIT_ACTIONS.get(int(service.findtext('pendingaction') or 0))
+            if action:
+                status = '%s - %s pending' % (status, action)
+            statuses[service.findtext('name')] = status
+        return statuses
+
+    def status_all():
+        if http_url:
+            return http_status()
+        return summary()
+
+    def status():
+        """Return the status of the process in monit, or the empty string if not present."""
+        return status_all().get(name, '')
 
     def run_command(command):
         """Runs a monit command, and returns the new status."""
@@ -92,10 +197,10 @@ def main():
     def wait_for_monit_to_stop_pending():
         """Fails this run if there is no status or it's pending/initalizing for timeout"""
         timeout_time = time.time() + timeout
-        sleep_time = 5
+        sleep_time = 0.1
 
         running_status = status()
-        while running_status == '' or 'pending' in running_status or 'initializing' in running_status:
+        while is_pending(running_status):
             if time.time() >= timeout_time:
                 module.fail_json(
                     msg='waited too long for "pending", or "initiating" status to go away ({0})'.format(
@@ -105,8 +210,41 @@ def main():
                 )
 
             time.sleep(sleep_time)
+            sleep_time = min(sleep_time * 2, 5)
             running_status = status()
 
+    def wait_for_services(targets):
+        """Poll the status of all services until each one reaches its target.
+
+        targets maps a service name to a function telling whether a status is
+        the requested one. Returns the seconds each service took.
+        """
+        started = time.time()
+        timeout_time = started + timeout
+        sleep_time = 0.1
+        waits = {}
+        statuses = status_all()
+        while True:
+            for service, reached in targets.items():
+                if service not in waits and reached(statuses.get(service, '')):
+                    waits[service] = round(time.time() - started, 2)
+            waiting = [service for service in targets if service not in waits]
+            if not waiting:
+                return waits, statuses
+            if time.time() >= timeout_time:
+                module.fail_json(
+                    msg='waited too long for %s to reach the %s state' % (', '.join(waiting), state),
+                    state=state,
+                    services=[dict(name=service, status=statuses.get(service, ''),
+                                   wait_seconds=waits.get(service)) for service in names]
+                )
+            time.sleep(sleep_time)
+            sleep_time = min(sleep_time * 2, 5)
+            statuses = status_all()
+
+    if len(names) > 1:
+        main_services(module, names, state, status_all, wait_for_services, MONIT)
+
     if state == 'reloaded':
         if module.check_mode:
             module.exit_json(changed=True)
@@ -180,7 +318,86 @@ def main():
 
     module.exit_json(changed=False, name=name, state=state)
 
+
+def main_services(module, names, state, status_all, wait_for_services, monit):
+    """Bring several services to the same state.
+
+    Every action is issued before waiting, then all services are polled
+    together until each one reaches the requested state.
+    """
+    def running(status):
+        return 'running' in status and not is_pending(status)
+
+    def not_monitored(status):
+        return status == 'not monitored'
+
+    def monitored(status):
+        return not not_monitored(status) and not is_pending(status)
+
+    def settled(status):
+        return not is_pending(status)
+
+    if state == 'reloaded':
+        if module.check_mode:
+            module.exit_json(changed=True)
+        rc, out, err = module.run_command('%s reload' % monit)
+        if rc != 0:
+            module.fail_json(msg='monit reload failed', stdout=out, stderr=err)
+        waits, statuses = wait_for_services(dict((name, settled) for name in names))
+        module.exit_json(changed=True, state=state, services=[
+            dict(name=name, action='reload', status=statuses.get(name, ''), wait_seconds=waits[name])
+            for name in names])
+
+    statuses = status_all()
+    missing = [name for name in names if name not in statuses]
+    if state == 'present':
+        if not missing:
+            module.exit_json(changed=False, state=state)
+        if module.check_mode:
+            module.exit_json(changed=True)
+        module.run_command('%s reload' % monit, check_rc=True)
+        waits, statuses = wait_for_services(dict((name, lambda status: status != '') for name in missing))
+        module.exit_json(changed=True, state=state, services=[
+            dict(name=name, action='reload', status=statuses.get(name, ''), wait_seconds=waits.get(name))
+            for name in names])
+    if missing:
+        module.fail_json(msg='%s process not presently configured with monit' % ', '.join(missing),
+                         name=names, state=state)
+
+    waits, statuses = wait_for_services(dict((name, settled) for name in names))
+
+    actions = {}
+    targets = {}
+    for name in names:
+        is_running = 'running' in statuses[name]
+        if state == 'restarted':
+            actions[name], targets[name] = 'restart', running
+        elif state == 'started' and not is_running:
+            actions[name], targets[name] = 'start', running
+        elif state == 'monitored' and not is_running:
+            actions[name], targets[name] = 'monitor', monitored
+        elif state == 'stopped' and is_running:
+            actions[name], targets[name] = 'stop', not_monitored
+        elif state == 'unmonitored' and is_running:
+            actions[name], targets[name] = 'unmonitor', not_monitored
+
+    if not actions:
+        module.exit_json(changed=False, state=state, services=[
+            dict(name=name, action=None, status=statuses[name], wait_seconds=0) for name in names])
+    if module.check_mode:
+        module.exit_json(changed=True)
+
+    for name in names:
+        if name in actions:
+            module.run_command('%s %s %s' % (monit, actions[name], name), check_rc=True)
+
+    waits, statuses = wait_for_services(targets)
+    module.exit_json(changed=True, state=state, services=[
+        dict(name=name, action=actions.get(name), status=statuses.get(name, ''), wait_seconds=waits.get(name, 0))
+        for name in names])
+
 # import module snippets
 from ansible.module_utils.basic import *
+from ansible.module_utils.urls import *
 
 main()
@@ -22,6 +22,7 @@ short_description: Perform common tasks in Nagios related to downtime and notifi
 description:
   - "The M(nagios) module has two basic functions: scheduling downtime and toggling alerts for services or hosts."
   - All actions require the I(host) parameter to be given explicitly. In playbooks you can use the C({{inventory_hostname}}) variable to refer to the host the playbook is currently running on.
+  - I(host) and I(hostgroup) accept lists, so one task can schedule downtime or toggle alerts for many hosts. All external commands are built first and written to the command file with a single open, in chunks of at most PIPE_BUF bytes so they are not interleaved with commands written by other processes.
   - You can specify multiple services at once by separating them with commas, .e.g., C(services=httpd,nfs,puppet).
   - When specifying what service to handle there is a special service value, I(host), which will handle alerts/downtime for the I(host itself), e.g., C(service=host). This keyword may not be given with other services at the same time. I(Setting alerts/downtime for a host does not affect alerts/downtime for any of the services running on it.) To schedule downtime for all services on particular host use keyword "all", e.g., C(service=all).
   - When using the M(nagios) module you will need to specify your Nagios server using the C(delegate_to) parameter.
@@ -37,7 +38,16 @@ options:
                "servicegroup_host_downtime" ]
   host:
     description:
-      - Host to operate on in Nagios.
+      - Host to operate on in Nagios. Since 2.1 this can be a list, or hosts separated by commas.
+    required: false
+    default: null
+  hostgroup:
+    version_added: "2.1"
+    description:
+      - Hostgroups to operate on in Nagios, as a list or separated by commas.
+        Usable with the C(downtime), C(enable_alerts), C(disable_alerts), C(silence) and C(unsilence)
+        actions, in place of or together with I(host). With C(downtime), C(enable_alerts) and
+        C(disable_alerts), I(services) must be C(host) or C(all).
     required: false
     default: null
   cmdfile:
@@ -74,7 +84,8 @@ options:
   servicegroup:
     version_added: "2.0"
     description:
-      - The Servicegroup we want to set downtimes/alerts for.
+      - The Servicegroup we want to set downtimes/alerts for. Since 2.1 this can be a list, or
+        servicegroups separated by commas.
         B(Required) option when using the C(servicegroup_service_downtime) amd C(servicegroup_host_downtime).
   command:
     description:
@@ -86,6 +97,24 @@ options:
 author: "Tim Bielawa (@tbielawa)"
 '''
 
+RETURN = '''
+nagios_commands:
+    description: the external commands written to the command file
+    returned: success
+    type: list
+    sample: ["[1449094600] DISABLE_HOST_NOTIFICATIONS;web1"]
+command_count:
+    description: number of external commands written
+    returned: success
+    type: int
+    sample: 1600
+write_seconds:
+    description: time spent writing the commands to the command file
+    returned: success
+    type: float
+    sample: 0.0213
+'''
+
 EXAMPLES = '''
 # set 30 minutes of apache downtime
 - nagios: action=downtime minutes=30 service=httpd host={{ inventory_hostname }}
@@ -124,6 +153,15 @@ EXAMPLES = '''
 # unsilence all alerts
 - nagios: action=unsilence host={{ inventory_hostname }}
 
+# schedule an hour of downtime for a maintenance window over many hosts
+- nagios: action=downtime minutes=60 service=all host={{ groups['rack12'] | join(',') }}
+
+# schedule host downtime for whole hostgroups
+- nagios: action=downtime minutes=60 service=host hostgroup=web,db
+
+# silence every host of a hostgroup
+- nagios: action=silence hostgroup=web
+
 # SHUT UP NAGIOS
 - nagios: action=silence_nagios
 
@@ -137,7 +175,12 @@ EXAMPLES = '''
 import ConfigParser
 import types
 import time
+import os
 import os.path
+import select
+
+# Writes to a pipe of at most PIPE_BUF bytes are atomic
+PIPE_BUF = getattr(select, 'PIPE_BUF', 512)
 
 ######################################################################
 
@@ -198,8 +241,9 @@ def main():
             action=dict(required=True, default=None, choices=ACTION_CHOICES),
             author=dict(default='Ansible'),
             comment=dict(default='Scheduling downtime'),
-            host=dict(required=False, default=None),
-            servicegroup=dict(required=False, default=None),
+            host=dict(required=False, default=None, type='list'),
+            hostgroup=dict(required=False, default=None, type='list'),
+            servicegroup=dict(required=False, default=None, type='list'),
             minutes=dict(default=30),
             cmdfile=dict(default=which_cmdfile()),
             services=dict(default=None, aliases=['service']),
@@ -209,6 +253,7 @@ def main():
 
     action = module.params['action']
     host = module.params['host']
+    hostgroup = module.params['hostgroup']
     servicegroup = module.params['servicegroup']
     minutes = module.params['minutes']
     services = module.params['services']
@@ -226,10 +271,17 @@ def main():
     # 'minutes' and 'service' manually.
 
     ##################################################################
-    if action not in ['command', 'silence_nagios', 'unsilence_nagios']:
+    if action in ['downtime', 'enable_alerts', 'disable_alerts', 'silence', 'unsilence']:
+        if not host and not hostgroup:
+            module.fail_json(msg='no host or hostgroup specified for action requiring one')
+    elif action not in ['command', 'silence_nagios', 'unsilence_nagios']:
         if not host:
             module.fail_json(msg='no host specified for action requiring one')
     ######################################################################
+    if hostgroup and action in ['downtime', 'enable_alerts', 'disable_alerts']:
+        if services not in ['host', 'all']:
+            module.fail_json(msg='services must be host or all when a hostgroup is given')
+    ######################################################################
     if action == 'downtime':
         # Make sure there's an actual service selected
         if not services:
@@ -298,8 +350,9 @@ class Nagios(object):
         self.action = kwargs['action']
         self.author = kwargs['author']
         self.comment = kwargs['comment']
-        self.host = kwargs['host']
-        self.servicegroup = kwargs['servicegroup']
+        self.hosts = kwargs['host'] or []
+        self.hostgroups = kwargs['hostgroup'] or []
+        self.servicegroups = kwargs['servicegroup'] or []
         self.minutes = int(kwargs['minutes'])
         self.cmdfile = kwargs['cmdfile']
         self.command = kwargs['command']
@@ -310,6 +363,8 @@ class Nagios(object):
             self.services = kwargs['services'].split(',')
 
         self.command_results = []
+        self.pending_commands = []
+        self.write_seconds = 0
 
     def _now(self):
         """
@@ -320,18 +375,46 @@ class Nagios(object):
 
     def _write_command(self, cmd):
         """
-        Write the given command to the Nagios command file
+        Queue the given command for the Nagios command file, the
+        queued commands are written by _flush_commands
+        """
+
+        self.pending_commands.append(cmd)
+        self.command_results.append(cmd.strip())
+        return True
+
+    def _flush_commands(self):
+        """
+        Write the queued commands to the Nagios command file with a
+        single open. Commands are grouped in writes of at most
+        PIPE_BUF bytes, so that every write is atomic and whole
+        command lines are never interleaved with other writers.
         """
 
+        chunks = []
+        chunk = ''
+        for cmd in self.pending_commands:
+            if chunk and len(chunk) + len(cmd) > PIPE_BUF:
+                chunks.append(chunk)
+                chunk = ''
+            chunk += cmd
+        if chunk:
+            chunks.append(chunk)
+
+        start = time.time()
         try:
-            fp = open(self.cmdfile, 'w')
-            fp.write(cmd)
-            fp.flush()
-            fp.close()
-            self.command_results.append(cmd.strip())
-        except IOError:
+            fd = os.open(self.cmdfile, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0644)
+            try:
+                for chunk in chunks:
+                    while chunk:
+                        chunk = chunk[os.write(fd, chunk):]
+            finally:
+                os.close(fd)
+        except (IOError, OSError):
             self.module.fail_json(msg='unable to write to nagios command file',
                                   cmdfile=self.cmdfile)
+        self.write_seconds = time.time() - start
+        self.pending_commands = []
 
     def _fmt_dt_str(self, cmd, host, duration, author=None,
                     comment=None, start=None,
@@ -841,6 +924,37 @@ class Nagios(object):
         else:
             return "Fail: could not write to the command file"
 
+    def silence_hostgroup(self, hostgroup):
+        """
+        This command is used to prevent notifications from being sent
+        out for the hosts and all services of the hosts in the
+        specified hostgroup.
+
+        This is equivalent to calling disable_hostgroup_svc_notifications
+        and disable_hostgroup_host_notifications.
+
+        Syntax: DISABLE_HOSTGROUP_SVC_NOTIFICATIONS;<hostgroup_name>
+        Syntax: DISABLE_HOSTGROUP_HOST_NOTIFICATIONS;<hostgroup_name>
+        """
+
+        self.disable_hostgroup_svc_notifications(hostgroup)
+        self.disable_hostgroup_host_notifications(hostgroup)
+
+    def unsilence_hostgroup(self, hostgroup):
+        """
+        This command is used to enable notifications for the hosts and
+        all services of the hosts in the specified hostgroup.
+
+        This is equivalent to calling enable_hostgroup_svc_notifications
+        and enable_hostgroup_host_notifications.
+
+        Syntax: ENABLE_HOSTGROUP_SVC_NOTIFICATIONS;<hostgroup_name>
+        Syntax: ENABLE_HOSTGROUP_HOST_NOTIFICATIONS;<hostgroup_name>
+        """
+
+        self.enable_hostgroup_svc_notifications(hostgroup)
+        self.enable_hostgroup_host_notifications(hostgroup)
+
     def silence_nagios(self):
         """
         This command is used to disable notifications for all hosts and services
@@ -883,46 +997,70 @@ class Nagios(object):
         """
         # host or service downtime?
         if self.action == 'downtime':
-            if self.services == 'host':
-                self.schedule_host_downtime(self.host, self.minutes)
-            elif self.services == 'all':
-                self.schedule_host_svc_downtime(self.host, self.minutes)
-            else:
-                self.schedule_svc_downtime(self.host,
-                                           services=self.services,
-                                           minutes=self.minutes)
+            for host in self.hosts:
+                if self.services == 'host':
+                    self.schedule_host_downtime(host, self.minutes)
+                elif self.services == 'all':
+                    self.schedule_host_svc_downtime(host, self.minutes)
+                else:
+                    self.schedule_svc_downtime(host,
+                                               services=self.services,
+                                               minutes=self.minutes)
+            for hostgroup in self.hostgroups:
+                if self.services == 'host':
+                    self.schedule_hostgroup_host_downtime(hostgroup, self.minutes)
+                else:
+                    self.schedule_hostgroup_svc_downtime(hostgroup, self.minutes)
         elif self.action == "servicegroup_host_downtime":
-            if self.servicegroup:
-                self.schedule_servicegroup_host_downtime(servicegroup = self.servicegroup, minutes = self.minutes)
+            for servicegroup in self.servicegroups:
+                self.schedule_servicegroup_host_downtime(servicegroup = servicegroup, minutes = self.minutes)
         elif self.action == "servicegroup_service_downtime":
-            if self.servicegroup:
-                self.schedule_servicegroup_svc_downtime(servicegroup = self.servicegroup, minutes = self.minutes)
+            for servicegroup in self.servicegroups:
+                self.schedule_servicegroup_svc_downtime(servicegroup = servicegroup, minutes = self.minutes)
 
         # toggle the host AND service alerts
         elif self.action == 'silence':
-            self.silence_host(self.host)
+            for host in self.hosts:
+                self.silence_host(host)
+            for hostgroup in self.hostgroups:
+                self.silence_hostgroup(hostgroup)
 
         elif self.action == 'unsilence':
-            self.unsilence_host(self.host)
+            for host in self.hosts:
+                self.unsilence_host(host)
+            for hostgroup in self.hostgroups:
+                self.unsilence_hostgroup(hostgroup)
 
         # toggle host/svc alerts
         elif self.action == 'enable_alerts':
-            if self.services == 'host':
-                self.enable_host_notifications(self.host)
-            elif self.services == 'all':
-                self.enable_host_svc_notifications(self.host)
-            else:
-                self.enable_svc_notifications(self.host,
-                                              services=self.services)
+            for host in self.hosts:
+                if self.services == 'host':
+                    self.enable_host_notifications(host)
+                elif self.services == 'all':
+                    self.enable_host_svc_notifications(host)
+                else:
+                    self.enable_svc_notifications(host,
+                                                  services=self.services)
+            for hostgroup in self.hostgroups:
+                if self.services == 'host':
+                    self.enable_hostgroup_host_notifications(hostgroup)
+                else:
+                    self.enable_hostgroup_svc_notifications(hostgroup)
 
         elif self.action == 'disable_alerts':
-            if self.services == 'host':
-                self.disable_host_notifications(self.host)
-            elif self.services == 'all':
-                self.disable_host_svc_notifications(self.host)
-            else:
-                self.disable_svc_notifications(self.host,
-                                               services=self.services)
+            for host in self.hosts:
+                if self.services == 'host':
+                    self.disable_host_notifications(host)
+                elif self.services == 'all':
+                    self.disable_host_svc_notifications(host)
+                else:
+                    self.disable_svc_notifications(host,
+                                                   services=self.services)
+            for hostgroup in self.hostgroups:
+                if self.services == 'host':
+                    self.disable_hostgroup_host_notifications(hostgroup)
+                else:
+                    self.disable_hostgroup_svc_notifications(hostgroup)
         elif self.action == 'silence_nagios':
             self.silence_nagios()
 
@@ -937,7 +1075,10 @@ class Nagios(object):
             self.module.fail_json(msg="unknown action specified: '%s'" % \
                                       self.action)
 
+        self._flush_commands()
         self.module.exit_json(nagios_commands=self.command_results,
+                              command_count=len(self.command_results),
+                              write_seconds=round(self.write_seconds, 4),
                               changed=True)
 
 ######################################################################
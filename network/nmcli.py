@@ -380,6 +380,7 @@ tenant_ip: "192.168.200.21/23"
 '''
 # import ansible.module_utils.basic
 import os
+import re
 import sys
 import dbus
 from gi.repository import NetworkManager, NMClient
@@ -430,6 +431,8 @@ class Nmcli(object):
                  110: "Deactivating",
                  120: "Failed"
             }
+    # Settings which may hold secrets, fetched with GetSecrets on demand
+    SECRET_SETTINGS=('802-11-wireless', '802-11-wireless-security', '802-1x', 'gsm', 'cdma', 'ppp')
 
 
     def __init__(self, module):
@@ -466,6 +469,10 @@ class Nmcli(object):
         self.flags=module.params['flags']
         self.ingress=module.params['ingress']
         self.egress=module.params['egress']
+        # connection index and settings, loaded on demand and reused during the run
+        self._connections=None
+        self._settings={}
+        self._secrets_loaded=set()
 
     def execute_command(self, cmd, use_unsafe_shell=False, data=None):
         return self.module.run_command(cmd, use_unsafe_shell=use_unsafe_shell, data=data)
@@ -514,47 +521,88 @@ class Nmcli(object):
         return setting_list
         # print ""
 
-    def list_connection_info(self):
-        # Ask the settings service for the list of connections it provides
-        bus=dbus.SystemBus()
+    def reset_connection_index(self):
+        # forget the connection index and settings after a change to the connections
+        self._connections=None
+        self._settings={}
+        self._secrets_loaded=set()
+
+    def connection_index(self):
+        # list the id, uuid, type and D-Bus path of every connection once, without
+        # fetching any settings or secrets
+        if self._connections is None:
+            self._connections=self._list_connections_nmcli()
+        if self._connections is None:
+            self._connections=self._list_connections_dbus()
+        return self._connections
+
+    def _list_connections_nmcli(self):
+        # one nmcli call lists every connection; terse output escapes ':' and '\'
+        cmd=[self.module.get_bin_path('nmcli', True), '-t', '-f', 'NAME,UUID,TYPE,DBUS-PATH', 'con', 'show']
+        (rc, out, err)=self.execute_command(cmd)
+        if rc!=0:
+            return None
+        connection_list=[]
+        for line in out.splitlines():
+            fields=[re.sub(r'\\(.)', r'\1', field) for field in re.split(r'(?<!\\):', line)]
+            if len(fields)!=4:
+                continue
+            connection_list.append(dict(id=fields[0], uuid=fields[1], type=fields[2], path=fields[3]))
+        return connection_list
 
-        service_name="org.freedesktop.NetworkManager"
-        proxy=bus.get_object(service_name, "/org/freedesktop/NetworkManager/Settings")
+    def _list_connections_dbus(self):
+        # older nmcli without the DBUS-PATH field: ask the settings service, keeping
+        # the settings we had to fetch anyway but no secrets
+        proxy=self.bus.get_object("org.freedesktop.NetworkManager", "/org/freedesktop/NetworkManager/Settings")
         settings=dbus.Interface(proxy, "org.freedesktop.NetworkManager.Settings")
-        connection_paths=settings.ListConnections()
         connection_list=[]
-        # List each connection's name, UUID, and type
-        for path in connection_paths:
-            con_proxy=bus.get_object(service_name, path)
-            settings_connection=dbus.Interface(con_proxy, "org.freedesktop.NetworkManager.Settings.Connection")
-            config=settings_connection.GetSettings()
-
-            # Now get secrets too; we grab the secrets for each type of connection
-            # (since there isn't a "get all secrets" call because most of the time
-            # you only need 'wifi' secrets or '802.1x' secrets, not everything) and
-            # merge that into the configuration data - To use at a later stage
-            self.merge_secrets(settings_connection, config, '802-11-wireless')
-            self.merge_secrets(settings_connection, config, '802-11-wireless-security')
-            self.merge_secrets(settings_connection, config, '802-1x')
-            self.merge_secrets(settings_connection, config, 'gsm')
-            self.merge_secrets(settings_connection, config, 'cdma')
-            self.merge_secrets(settings_connection, config, 'ppp')
-
-            # Get the details of the 'connection' setting
+        for path in settings.ListConnections():
+            config=self._settings_connection(path).GetSettings()
+            self._settings[path]=config
             s_con=config['connection']
-            connection_list.append(s_con['id'])
-            connection_list.append(s_con['uuid'])
-            connection_list.append(s_con['type'])
+            connection_list.append(dict(id=s_con['id'], uuid=s_con['uuid'], type=s_con['type'], path=path))
+        return connection_list
+
+    def _settings_connection(self, path):
+        con_proxy=self.bus.get_object("org.freedesktop.NetworkManager", path)
+        return dbus.Interface(con_proxy, "org.freedesktop.NetworkManager.Settings.Connection")
+
+    def connection_settings(self, connection, secrets=False):
+        # GetSettings for a single connection, merging its secrets only when asked
+        # for and only for the settings the connection actually has
+        path=connection['path']
+        if path not in self._settings:
+            self._settings[path]=self._settings_connection(path).GetSettings()
+        config=self._settings[path]
+        if secrets and path not in self._secrets_loaded:
+            settings_connection=self._settings_connection(path)
+            for setting_name in self.SECRET_SETTINGS:
+                if setting_name in config:
+                    self.merge_secrets(settings_connection, config, setting_name)
+            self._secrets_loaded.add(path)
+        return config
+
+    def find_connection(self):
+        # the connection matching conn_name by name or uuid, if any
+        for connection in self.connection_index():
+            if self.conn_name in (connection['id'], connection['uuid']):
+                return connection
+        return None
+
+    def list_connection_info(self):
+        # name, UUID, type and configuration including secrets of each connection
+        connection_list=[]
+        for connection in self.connection_index():
+            config=self.connection_settings(connection, secrets=True)
+            connection_list.append(connection['id'])
+            connection_list.append(connection['uuid'])
+            connection_list.append(connection['type'])
             connection_list.append(self.connection_to_string(config))
         return connection_list
 
     def connection_exists(self):
-        # we are going to use name and type in this instance to find if that connection exists and is of type x
-        connections=self.list_connection_info()
-
-        for con_item in connections:
-            if self.conn_name==con_item:
-                return True
+        # we are going to use the connection index to find if a connection of that name or uuid exists
+        return self.find_connection() is not None
 
     def down_connection(self):
         cmd=[self.module.get_bin_path('nmcli', True)]
@@ -879,6 +927,7 @@ class Nmcli(object):
         return cmd
 
     def create_connection(self):
+        self.reset_connection_index()
         cmd=[]
         if self.type=='team':
             # cmd=self.create_connection_team()
@@ -934,6 +983,7 @@ class Nmcli(object):
         return self.execute_command(cmd)
 
     def remove_connection(self):
+        self.reset_connection_index()
         # self.down_connection()
         cmd=[self.module.get_bin_path('nmcli', True)]
         cmd.append('con')
@@ -942,6 +992,7 @@ class Nmcli(object):
         return self.execute_command(cmd)
 
     def modify_connection(self):
+        self.reset_connection_index()
         cmd=[]
         if self.type=='team':
             cmd=self.modify_connection_team()
@@ -24,7 +24,14 @@ __author__ = 'cschmidt'
 from lxml import etree
 import os
 import hashlib
-import sys
+import threading
+import time
+import Queue
+
+try:
+    import json
+except ImportError:
+    import simplejson as json
 
 DOCUMENTATION = '''
 ---
@@ -42,12 +49,12 @@ requirements:
 options:
     group_id:
         description:
-            - The Maven groupId coordinate
-        required: true
+            - The Maven groupId coordinate, required unless artifacts is used
+        required: false
     artifact_id:
         description:
-            - The maven artifactId coordinate
-        required: true
+            - The maven artifactId coordinate, required unless artifacts is used
+        required: false
     version:
         description:
             - The maven version coordinate
@@ -80,9 +87,9 @@ options:
         default: null
     dest:
         description:
-            - The path where the artifact should be written to
-        required: true
-        default: false
+            - The path where the artifact should be written to, required unless artifacts is used
+        required: false
+        default: null
     state:
         description:
             - The desired state of the artifact
@@ -96,6 +103,29 @@ options:
         default: 'yes'
         choices: ['yes', 'no']
         version_added: "1.9.3"
+    artifacts:
+        description:
+            - A list of artifacts to download concurrently, each a dict with the group_id, artifact_id, dest and
+              optional version, classifier and extension keys. Mutually exclusive with group_id and artifact_id.
+        required: false
+        default: null
+        version_added: "2.1"
+    workers:
+        description:
+            - The number of artifacts downloaded at the same time when artifacts is used.
+        required: false
+        default: 4
+        version_added: "2.1"
+    checksum:
+        description:
+            - The digest used to verify downloads against the sidecar file published next to the artifact
+              (for example C(.sha1)). Downloads go to a C(.part) file, are resumed with HTTP Range requests after
+              an interruption and are renamed into place once verified. The digest, ETag and Last-Modified of each
+              artifact are cached in a hidden file next to dest, so unchanged artifacts are not hashed again.
+        required: false
+        default: sha1
+        choices: [sha1, sha256, md5]
+        version_added: "2.1"
 '''
 
 EXAMPLES = '''
@@ -110,6 +140,14 @@ EXAMPLES = '''
 
 # Download a WAR File to the Tomcat webapps directory to be deployed
 - maven_artifact: group_id=com.company artifact_id=web-app extension=war repository_url=https://repo.company.com/maven dest=/var/lib/tomcat7/webapps/web-app.war
+
+# Download several artifacts concurrently, verified against their .sha256 sidecars
+- maven_artifact:
+    repository_url: https://repo.company.com/maven
+    checksum: sha256
+    artifacts:
+      - { group_id: com.company, artifact_id: web-app, extension: war, version: 1.4.2, dest: /var/lib/tomcat7/webapps/web-app.war }
+      - { group_id: com.company, artifact_id: api, extension: war, version: 2.0.1, dest: /var/lib/tomcat7/webapps/api.war }
 '''
 
 class Artifact(object):
@@ -180,8 +218,9 @@ class Artifact(object):
 
 
 class MavenDownloader:
-    def __init__(self, module, base="http://repo1.maven.org/maven2"):
+    def __init__(self, module, base="http://repo1.maven.org/maven2", checksum="sha1"):
         self.module = module
+        self.checksum = checksum
         if base.endswith("/"):
             base = base.rstrip("/")
         self.base = base
@@ -214,79 +253,199 @@ class MavenDownloader:
 
         return self.base + "/" + artifact.path() + "/" + artifact.artifact_id + "-" + version + "." + artifact.extension
 
-    def _request(self, url, failmsg, f):
+    def _fetch_url(self, url, headers=None, method=None):
         # Hack to add parameters in the way that fetch_url expects
         self.module.params['url_username'] = self.module.params.get('username', '')
         self.module.params['url_password'] = self.module.params.get('password', '')
         self.module.params['http_agent'] = self.module.params.get('user_agent', None)
 
-        response, info = fetch_url(self.module, url)
+        return fetch_url(self.module, url, headers=headers, method=method)
+
+    def _request(self, url, failmsg, f):
+        response, info = self._fetch_url(url)
         if info['status'] != 200:
             raise ValueError(failmsg + " because of " + info['msg'] + "for URL " + url)
         else:
             return f(response)
 
-
-    def download(self, artifact, filename=None):
-        filename = artifact.get_filename(filename)
+    def resolve(self, artifact):
         if not artifact.version or artifact.version == "latest":
             artifact = Artifact(artifact.group_id, artifact.artifact_id, self._find_latest_version_available(artifact),
                                 artifact.classifier, artifact.extension)
+        return artifact
+
+    def download(self, artifact, filename=None):
+        """Make filename hold the artifact, returns whether it had to be downloaded."""
+        filename = artifact.get_filename(filename)
+        artifact = self.resolve(artifact)
 
         url = self.find_uri_for_artifact(artifact)
-        if not self.verify_md5(filename, url + ".md5"):
-            response = self._request(url, "Failed to download artifact " + str(artifact), lambda r: r)
-            if response:
-                with open(filename, 'w') as f:
-                    # f.write(response.read())
-                    self._write_chunks(response, f, report_hook=self.chunk_report)
-                return True
-            else:
-                return False
-        else:
-            return True
+        remote_digest = self._remote_digest(url)
+        if self.is_current(filename, url, remote_digest):
+            return False
 
-    def chunk_report(self, bytes_so_far, chunk_size, total_size):
-        percent = float(bytes_so_far) / total_size
-        percent = round(percent * 100, 2)
-        sys.stdout.write("Downloaded %d of %d bytes (%0.2f%%)\r" %
-                         (bytes_so_far, total_size, percent))
+        self._download_to(url, filename, remote_digest)
+        return True
 
-        if bytes_so_far >= total_size:
-            sys.stdout.write('\n')
+    def _remote_digest(self, url):
+        response, info = self._fetch_url(url + "." + self.checksum)
+        if info['status'] != 200:
+            return None
+        # sidecars may hold "<digest>  <filename>"
+        content = response.read().strip().split()
+        if content:
+            return content[0].lower()
 
-    def _write_chunks(self, response, file, chunk_size=8192, report_hook=None):
-        total_size = response.info().getheader('Content-Length').strip()
-        total_size = int(total_size)
+    def is_current(self, filename, url, remote_digest):
+        if not os.path.exists(filename):
+            return False
+
+        cache = self._load_cache(filename)
+        st = os.stat(filename)
+        if cache and cache.get('url') == url and cache.get('size') == st.st_size \
+                and cache.get('mtime') == st.st_mtime and cache.get('algorithm') == self.checksum:
+            local_digest = cache['digest']
+        else:
+            local_digest = self._local_digest(filename)
+            cache = dict(url=url, digest=local_digest, algorithm=self.checksum)
+            self._save_cache(filename, cache)
+
+        if remote_digest:
+            return local_digest == remote_digest
+
+        # no sidecar in the repository, fall back to a conditional request
+        headers = {}
+        if cache.get('etag'):
+            headers['If-None-Match'] = cache['etag']
+        if cache.get('last_modified'):
+            headers['If-Modified-Since'] = cache['last_modified']
+        if not headers:
+            return False
+        response, info = self._fetch_url(url, headers=headers, method='HEAD')
+        return info['status'] == 304
+
+    def _download_to(self, url, filename, remote_digest):
+        """Download into a partial file, resuming a previous attempt with an HTTP
+        Range request, verify the digest and atomically rename it into place."""
+        partial = filename + ".part"
+        digest = hashlib.new(self.checksum)
+        offset = 0
+        if os.path.exists(partial):
+            offset = os.path.getsize(partial)
+            self._local_digest(partial, digest)
+
+        headers = None
+        if offset:
+            headers = {'Range': 'bytes=%d-' % offset}
+        response, info = self._fetch_url(url, headers=headers)
+
+        if info['status'] == 416:
+            # the partial file is already complete
+            pass
+        elif info['status'] in (200, 206):
+            if info['status'] == 200 and offset:
+                # the server ignored the range, start over
+                digest = hashlib.new(self.checksum)
+                offset = 0
+            mode = offset and 'ab' or 'wb'
+            with open(partial, mode) as f:
+                self._write_chunks(response, f, digest)
+        else:
+            raise ValueError("Failed to download artifact because of " + info['msg'] + " for URL " + url)
+
+        local_digest = digest.hexdigest()
+        if remote_digest and local_digest != remote_digest:
+            os.remove(partial)
+            if offset:
+                # the resumed partial file may have been stale, retry from scratch
+                return self._download_to(url, filename, remote_digest)
+            raise ValueError("Checksum mismatch for %s: expected %s %s, got %s" % (url, self.checksum, remote_digest, local_digest))
+
+        os.rename(partial, filename)
+        st = os.stat(filename)
+        self._save_cache(filename, dict(url=url, digest=local_digest, algorithm=self.checksum,
+                                        etag=info.get('etag'), last_modified=info.get('last-modified'),
+                                        size=st.st_size, mtime=st.st_mtime))
+
+    def _write_chunks(self, response, file, digest, chunk_size=65536):
         bytes_so_far = 0
 
         while 1:
             chunk = response.read(chunk_size)
-            bytes_so_far += len(chunk)
-
             if not chunk:
                 break
 
+            bytes_so_far += len(chunk)
+            digest.update(chunk)
             file.write(chunk)
-            if report_hook:
-                report_hook(bytes_so_far, chunk_size, total_size)
 
         return bytes_so_far
 
-    def verify_md5(self, file, remote_md5):
-        if not os.path.exists(file):
-            return False
-        else:
-            local_md5 = self._local_md5(file)
-            remote = self._request(remote_md5, "Failed to download MD5", lambda r: r.read())
-            return local_md5 == remote
-
-    def _local_md5(self, file):
-        md5 = hashlib.md5()
+    def _local_digest(self, file, digest=None):
+        if digest is None:
+            digest = hashlib.new(self.checksum)
         with open(file, 'rb') as f:
-            for chunk in iter(lambda: f.read(8192), ''):
-                md5.update(chunk)
-        return md5.hexdigest()
+            for chunk in iter(lambda: f.read(65536), ''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _cache_path(self, filename):
+        return os.path.join(os.path.dirname(filename), "." + os.path.basename(filename) + ".maven_artifact")
+
+    def _load_cache(self, filename):
+        try:
+            with open(self._cache_path(filename)) as f:
+                return json.load(f)
+        except (IOError, ValueError):
+            return None
+
+    def _save_cache(self, filename, cache):
+        if 'size' not in cache:
+            st = os.stat(filename)
+            cache['size'] = st.st_size
+            cache['mtime'] = st.st_mtime
+        try:
+            with open(self._cache_path(filename), 'w') as f:
+                json.dump(cache, f)
+        except IOError:
+            pass
+
+
+def download_all(downloader, items, workers):
+    """Download (artifact, dest) pairs using up to workers threads.
+
+    Returns a list of result dicts in the order of items.
+    """
+    results = [None] * len(items)
+    work = Queue.Queue()
+    for i, item in enumerate(items):
+        work.put((i, item))
+
+    def worker():
+        while True:
+            try:
+                i, (artifact, dest) = work.get_nowait()
+            except Queue.Empty:
+                return
+            result = dict(artifact=str(artifact), dest=dest)
+            start = time.time()
+            try:
+                result['changed'] = downloader.download(artifact, dest)
+            except ValueError as e:
+                result['failed'] = True
+                result['msg'] = e.args[0]
+            except Exception as e:
+                result['failed'] = True
+                result['msg'] = str(e)
+            result['elapsed'] = round(time.time() - start, 3)
+            results[i] = result
+
+    threads = [threading.Thread(target=worker) for i in range(max(1, min(workers, len(items))))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
 
 
 def main():
@@ -303,7 +462,11 @@ def main():
             state = dict(default="present", choices=["present","absent"]), # TODO - Implement a "latest" state
             dest = dict(type="path", default=None),
             validate_certs = dict(required=False, default=True, type='bool'),
-        )
+            artifacts = dict(required=False, default=None, type='list'),
+            workers = dict(required=False, default=4, type='int'),
+            checksum = dict(required=False, default='sha1', choices=['sha1', 'sha256', 'md5']),
+        ),
+        mutually_exclusive = [['artifacts', 'group_id'], ['artifacts', 'artifact_id']],
     )
 
     group_id = module.params["group_id"]
@@ -321,21 +484,45 @@ def main():
         repository_url = "http://repo1.maven.org/maven2"
 
     #downloader = MavenDownloader(module, repository_url, repository_username, repository_password)
-    downloader = MavenDownloader(module, repository_url)
+    downloader = MavenDownloader(module, repository_url, module.params["checksum"])
+
+    if module.params["artifacts"]:
+        items = []
+        for spec in module.params["artifacts"]:
+            try:
+                artifact = Artifact(spec.get("group_id"), spec.get("artifact_id"), spec.get("version", "latest"),
+                                    spec.get("classifier"), spec.get("extension", "jar"))
+            except ValueError as e:
+                module.fail_json(msg=e.args[0], artifact=spec)
+            if not spec.get("dest"):
+                module.fail_json(msg="dest must be set", artifact=spec)
+            item_dest = os.path.expanduser(spec["dest"])
+            if os.path.isdir(item_dest):
+                item_dest = item_dest + "/" + artifact.artifact_id + "-" + artifact.version + "." + artifact.extension
+            elif not os.path.exists(os.path.dirname(item_dest)):
+                os.makedirs(os.path.dirname(item_dest))
+            items.append((artifact, item_dest))
+
+        results = download_all(downloader, items, module.params["workers"])
+        changed = any(r.get("changed") for r in results)
+        if any(r.get("failed") for r in results):
+            module.fail_json(msg="Unable to download some of the artifacts", results=results, changed=changed)
+        module.exit_json(state=state, results=results, repository_url=repository_url, changed=changed)
 
     try:
         artifact = Artifact(group_id, artifact_id, version, classifier, extension)
     except ValueError as e:
         module.fail_json(msg=e.args[0])
 
+    if not dest:
+        module.fail_json(msg="dest must be set")
+
     prev_state = "absent"
     if os.path.isdir(dest):
         dest = dest + "/" + artifact_id + "-" + version + "." + extension
     if os.path.lexists(dest):
         if not artifact.is_snapshot():
             prev_state = "present"
-        elif downloader.verify_md5(dest, downloader.find_uri_for_artifact(artifact) + '.md5'):
-            prev_state = "present"
     else:
         path = os.path.dirname(dest)
         if not os.path.exists(path):
@@ -345,10 +532,8 @@ def main():
         module.exit_json(dest=dest, state=state, changed=False)
 
     try:
-        if downloader.download(artifact, dest):
-            module.exit_json(state=state, dest=dest, group_id=group_id, artifact_id=artifact_id, version=version, classifier=classifier, extension=extension, repository_url=repository_url, changed=True)
-        else:
-            module.fail_json(msg="Unable to download the artifact")
+        changed = downloader.download(artifact, dest)
+        module.exit_json(state=state, dest=dest, group_id=group_id, artifact_id=artifact_id, version=version, classifier=classifier, extension=extension, repository_url=repository_url, changed=changed)
     except ValueError as e:
         module.fail_json(msg=e.args[0])
 
@@ -66,7 +66,11 @@ options:
         required: false
         default: null
         version_added: "1.4"
-notes:  []
+notes:
+    - The installed and outdated formulae are read once with C(brew info --json=v1 --installed)
+      and C(brew outdated --json=v1), and missing or outdated formulae are installed, upgraded or
+      removed with a single brew command. Versions of brew without JSON output fall back to
+      checking each formula on its own.
 '''
 EXAMPLES = '''
 # Install formula foo with 'brew' in default path (C(/usr/local/bin))
@@ -89,12 +93,18 @@ EXAMPLES = '''
 - homebrew: name=foo state=linked
 - homebrew: name=foo state=absent
 - homebrew: name=foo,bar state=absent
+- homebrew: name=git,wget,jq,tmux state=present
 - homebrew: name=foo state=present install_options=with-baz,enable-debug
 '''
 
 import os.path
 import re
 
+try:
+    import json
+except ImportError:
+    import simplejson as json
+
 
 # exceptions -------------------------------------------------------------- {{{
 class HomebrewException(Exception):
@@ -331,6 +341,8 @@ class Homebrew(object):
                                   upgrade_all=upgrade_all,
                                   install_options=install_options, )
 
+        self._snapshot = None
+        self._snapshot_stale = True
         self._prep()
 
     # prep --------------------------------------------------------- {{{
@@ -387,6 +399,69 @@ class Homebrew(object):
 
         return (failed, changed, message)
 
+    # snapshot ----------------------------------------------------- {{{
+    def _load_snapshot(self):
+        rc, out, err = self.module.run_command([
+            self.brew_path,
+            'info',
+            '--json=v1',
+            '--installed',
+        ])
+        if rc != 0:
+            return None
+        try:
+            installed = json.loads(out)
+        except ValueError:
+            return None
+
+        # brew outdated exits non-zero when formulae are outdated, so
+        # only its output tells whether it failed
+        rc, out, err = self.module.run_command([
+            self.brew_path,
+            'outdated',
+            '--json=v1',
+        ])
+        if not out.strip():
+            if rc != 0:
+                return None
+            outdated = []
+        else:
+            try:
+                outdated = json.loads(out)
+            except ValueError:
+                return None
+        if isinstance(outdated, dict):
+            outdated = outdated.get('formulae', [])
+
+        formulae = dict()
+        for formula in installed:
+            names = [formula.get('name'), formula.get('full_name')]
+            names.extend(formula.get('aliases') or [])
+            for name in names:
+                if name:
+                    formulae[name] = formula
+
+        return {
+            'formulae': formulae,
+            'outdated': set(formula.get('name') for formula in outdated),
+        }
+
+    def _get_snapshot(self):
+        '''Installed and outdated formulae, read once and again after changes.
+
+        None when brew can not report them as JSON, checks then run
+        brew for each package.
+        '''
+        if self._snapshot_stale:
+            self._snapshot = self._load_snapshot()
+            self._snapshot_stale = False
+
+        return self._snapshot
+
+    def _invalidate_snapshot(self):
+        self._snapshot_stale = True
+    # /snapshot ---------------------------------------------------- }}}
+
     # checks ------------------------------------------------------- {{{
     def _current_package_is_installed(self):
         if not self.valid_package(self.current_package):
@@ -394,6 +469,11 @@ class Homebrew(object):
             self.message = 'Invalid package: {0}.'.format(self.current_package)
             raise HomebrewException(self.message)
 
+        snapshot = self._get_snapshot()
+        if snapshot is not None:
+            formula = snapshot['formulae'].get(self.current_package)
+            return bool(formula and formula.get('installed'))
+
         cmd = [
             "{brew_path}".format(brew_path=self.brew_path),
             "info",
@@ -413,6 +493,15 @@ class Homebrew(object):
         if not self.valid_package(self.current_package):
             return False
 
+        snapshot = self._get_snapshot()
+        if snapshot is not None:
+            formula = snapshot['formulae'].get(self.current_package)
+            if not formula:
+                return False
+            return bool(snapshot['outdated'] & set(
+                [formula.get('name'), formula.get('full_name')]
+            ))
+
         rc, out, err = self.module.run_command([
             self.brew_path,
             'outdated',
@@ -427,6 +516,14 @@ class Homebrew(object):
         elif not self._current_package_is_installed():
             return False
 
+        snapshot = self._get_snapshot()
+        if snapshot is not None:
+            formula = snapshot['formulae'].get(self.current_package)
+            return any(
+                str(keg.get('version', '')).startswith('HEAD')
+                for keg in formula.get('installed', [])
+            )
+
         rc, out, err = self.module.run_command([
             self.brew_path,
             'info',
@@ -439,6 +536,26 @@ class Homebrew(object):
             return False
 
         return version_info.split(' ')[-1] == 'HEAD'
+
+    def _verify_packages(self, packages, action, check, err):
+        failed = []
+        for package in packages:
+            self.current_package = package
+            if check():
+                self.changed_count += 1
+                self.changed = True
+            else:
+                failed.append(package)
+
+        if failed:
+            self.failed = True
+            self.message = err.strip() or 'Package not {0}: {1}'.format(
+                action, ', '.join(failed),
+            )
+            raise HomebrewException(self.message)
+
+        self.message = 'Package {0}: {1}'.format(action, ', '.join(packages))
+        return True
     # /checks ------------------------------------------------------ }}}
 
     # commands ----------------------------------------------------- {{{
@@ -469,6 +586,7 @@ class Homebrew(object):
             self.brew_path,
             'update',
         ])
+        self._invalidate_snapshot()
         if rc == 0:
             if out and isinstance(out, basestring):
                 already_updated = any(
@@ -495,6 +613,7 @@ class Homebrew(object):
             self.brew_path,
             'upgrade',
         ])
+        self._invalidate_snapshot()
         if rc == 0:
             if not out:
                 self.message = 'Homebrew packages already upgraded.'
@@ -511,23 +630,25 @@ class Homebrew(object):
     # /_upgrade_all -------------------------- }}}
 
     # installed ------------------------------ {{{
-    def _install_current_package(self):
-        if not self.valid_package(self.current_package):
-            self.failed = True
-            self.message = 'Invalid package: {0}.'.format(self.current_package)
-            raise HomebrewException(self.message)
+    def _install_packages(self):
+        missing = []
+        for package in self.packages:
+            self.current_package = package
+            if self._current_package_is_installed():
+                self.unchanged_count += 1
+                self.message = 'Package already installed: {0}'.format(
+                    self.current_package,
+                )
+            elif package not in missing:
+                missing.append(package)
 
-        if self._current_package_is_installed():
-            self.unchanged_count += 1
-            self.message = 'Package already installed: {0}'.format(
-                self.current_package,
-            )
+        if not missing:
             return True
 
         if self.module.check_mode:
             self.changed = True
             self.message = 'Package would be installed: {0}'.format(
-                self.current_package
+                ', '.join(missing)
             )
             raise HomebrewException(self.message)
 
@@ -539,72 +660,24 @@ class Homebrew(object):
         opts = (
             [self.brew_path, 'install']
             + self.install_options
-            + [self.current_package, head]
+            + missing
+            + [head]
         )
         cmd = [opt for opt in opts if opt]
         rc, out, err = self.module.run_command(cmd)
+        self._invalidate_snapshot()
 
-        if self._current_package_is_installed():
-            self.changed_count += 1
-            self.changed = True
-            self.message = 'Package installed: {0}'.format(self.current_package)
-            return True
-        else:
-            self.failed = True
-            self.message = err.strip()
-            raise HomebrewException(self.message)
-
-    def _install_packages(self):
-        for package in self.packages:
-            self.current_package = package
-            self._install_current_package()
-
-        return True
+        return self._verify_packages(
+            missing, 'installed', self._current_package_is_installed, err,
+        )
     # /installed ----------------------------- }}}
 
     # upgraded ------------------------------- {{{
-    def _upgrade_current_package(self):
-        command = 'upgrade'
-
-        if not self.valid_package(self.current_package):
-            self.failed = True
-            self.message = 'Invalid package: {0}.'.format(self.current_package)
-            raise HomebrewException(self.message)
-
-        if not self._current_package_is_installed():
-            command = 'install'
-
-        if self._current_package_is_installed() and not self._current_package_is_outdated():
-            self.message = 'Package is already upgraded: {0}'.format(
-                self.current_package,
-            )
-            self.unchanged_count += 1
-            return True
-
-        if self.module.check_mode:
-            self.changed = True
-            self.message = 'Package would be upgraded: {0}'.format(
-                self.current_package
-            )
-            raise HomebrewException(self.message)
-
-        opts = (
-            [self.brew_path, command]
-            + self.install_options
-            + [self.current_package]
+    def _current_package_is_upgraded(self):
+        return (
+            self._current_package_is_installed()
+            and not self._current_package_is_outdated()
         )
-        cmd = [opt for opt in opts if opt]
-        rc, out, err = self.module.run_command(cmd)
-
-        if self._current_package_is_installed() and not self._current_package_is_outdated():
-            self.changed_count += 1
-            self.changed = True
-            self.message = 'Package upgraded: {0}'.format(self.current_package)
-            return True
-        else:
-            self.failed = True
-            self.message = err.strip()
-            raise HomebrewException(self.message)
 
     def _upgrade_all_packages(self):
         opts = (
@@ -613,6 +686,7 @@ class Homebrew(object):
         )
         cmd = [opt for opt in opts if opt]
         rc, out, err = self.module.run_command(cmd)
+        self._invalidate_snapshot()
 
         if rc == 0:
             self.changed = True
@@ -625,59 +699,94 @@ class Homebrew(object):
 
     def _upgrade_packages(self):
         if not self.packages:
-            self._upgrade_all_packages()
-        else:
-            for package in self.packages:
-                self.current_package = package
-                self._upgrade_current_package()
+            return self._upgrade_all_packages()
+
+        to_install = []
+        to_upgrade = []
+        for package in self.packages:
+            self.current_package = package
+            if package in to_install or package in to_upgrade:
+                continue
+            elif not self._current_package_is_installed():
+                to_install.append(package)
+            elif self._current_package_is_outdated():
+                to_upgrade.append(package)
+            else:
+                self.unchanged_count += 1
+                self.message = 'Package is already upgraded: {0}'.format(
+                    self.current_package,
+                )
+
+        if not to_install and not to_upgrade:
             return True
-    # /upgraded ------------------------------ }}}
 
-    # uninstalled ---------------------------- {{{
-    def _uninstall_current_package(self):
-        if not self.valid_package(self.current_package):
-            self.failed = True
-            self.message = 'Invalid package: {0}.'.format(self.current_package)
+        if self.module.check_mode:
+            self.changed = True
+            self.message = 'Package would be upgraded: {0}'.format(
+                ', '.join(to_install + to_upgrade)
+            )
             raise HomebrewException(self.message)
 
-        if not self._current_package_is_installed():
-            self.unchanged_count += 1
-            self.message = 'Package already uninstalled: {0}'.format(
-                self.current_package,
+        errors = []
+        for command, packages in (('install', to_install),
+                                  ('upgrade', to_upgrade)):
+            if not packages:
+                continue
+            opts = (
+                [self.brew_path, command]
+                + self.install_options
+                + packages
             )
+            cmd = [opt for opt in opts if opt]
+            rc, out, err = self.module.run_command(cmd)
+            errors.append(err.strip())
+        self._invalidate_snapshot()
+
+        return self._verify_packages(
+            to_install + to_upgrade, 'upgraded',
+            self._current_package_is_upgraded, '\n'.join(errors),
+        )
+    # /upgraded ------------------------------ }}}
+
+    # uninstalled ---------------------------- {{{
+    def _current_package_is_uninstalled(self):
+        return not self._current_package_is_installed()
+
+    def _uninstall_packages(self):
+        installed = []
+        for package in self.packages:
+            self.current_package = package
+            if not self._current_package_is_installed():
+                self.unchanged_count += 1
+                self.message = 'Package already uninstalled: {0}'.format(
+                    self.current_package,
+                )
+            elif package not in installed:
+                installed.append(package)
+
+        if not installed:
             return True
 
         if self.module.check_mode:
             self.changed = True
             self.message = 'Package would be uninstalled: {0}'.format(
-                self.current_package
+                ', '.join(installed)
             )
             raise HomebrewException(self.message)
 
         opts = (
             [self.brew_path, 'uninstall']
             + self.install_options
-            + [self.current_package]
+            + installed
         )
         cmd = [opt for opt in opts if opt]
         rc, out, err = self.module.run_command(cmd)
+        self._invalidate_snapshot()
 
-        if not self._current_package_is_installed():
-            self.changed_count += 1
-            self.changed = True
-            self.message = 'Package uninstalled: {0}'.format(self.current_package)
-            return True
-        else:
-            self.failed = True
-            self.message = err.strip()
-            raise HomebrewException(self.message)
-
-    def _uninstall_packages(self):
-        for package in self.packages:
-            self.current_package = package
-            self._uninstall_current_package()
-
-        return True
+        return self._verify_packages(
+            installed, 'uninstalled', self._current_package_is_uninstalled,
+            err,
+        )
     # /uninstalled ----------------------------- }}}
 
     # linked --------------------------------- {{{
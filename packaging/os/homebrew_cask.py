@@ -35,10 +35,14 @@ options:
         choices: [ 'present', 'absent' ]
         required: false
         default: present
+notes:
+    - The installed casks are listed once, and missing casks are installed or removed with a
+      single C(brew cask) command.
 '''
 EXAMPLES = '''
 - homebrew_cask: name=alfred state=present
 - homebrew_cask: name=alfred state=absent
+- homebrew_cask: name=alfred,iterm2,firefox state=present
 '''
 
 import os.path
@@ -256,6 +260,7 @@ class HomebrewCask(object):
         self._setup_instance_vars(module=module, path=path, casks=casks,
                                   state=state)
 
+        self._installed_casks = None
         self._prep()
 
     # prep --------------------------------------------------------- {{{
@@ -324,18 +329,49 @@ class HomebrewCask(object):
             self.message = 'Invalid cask: {0}.'.format(self.current_cask)
             raise HomebrewCaskException(self.message)
 
+        return self.current_cask in self._get_installed_casks()
+
+    def _get_installed_casks(self):
+        '''Installed casks, listed once and again after changes.'''
+        if self._installed_casks is not None:
+            return self._installed_casks
+
         cmd = [self.brew_path, 'cask', 'list']
         rc, out, err = self.module.run_command(cmd, path_prefix=self.path[0])
 
         if 'nothing to list' in err:
-            return False
+            self._installed_casks = set()
         elif rc == 0:
-            casks = [cask_.strip() for cask_ in out.split('\n') if cask_.strip()]
-            return self.current_cask in casks
+            self._installed_casks = set(
+                cask_.strip() for cask_ in out.split('\n') if cask_.strip()
+            )
         else:
             self.failed = True
             self.message = err.strip()
             raise HomebrewCaskException(self.message)
+
+        return self._installed_casks
+
+    def _verify_casks(self, casks, action, installed, err):
+        self._installed_casks = None
+        failed = []
+        for cask in casks:
+            self.current_cask = cask
+            if self._current_cask_is_installed() == installed:
+                self.changed_count += 1
+                self.changed = True
+            else:
+                failed.append(cask)
+
+        if failed:
+            self.failed = True
+            self.message = err.strip() or 'Cask not {0}: {1}'.format(
+                action, ', '.join(failed),
+            )
+            raise HomebrewCaskException(self.message)
+
+        self.message = 'Cask {0}: {1}'.format(action, ', '.join(casks))
+        return True
     # /checks ------------------------------------------------------ }}}
 
     # commands ----------------------------------------------------- {{{
@@ -375,93 +411,61 @@ class HomebrewCask(object):
     # /updated ------------------------------- }}}
 
     # installed ------------------------------ {{{
-    def _install_current_cask(self):
-        if not self.valid_cask(self.current_cask):
-            self.failed = True
-            self.message = 'Invalid cask: {0}.'.format(self.current_cask)
-            raise HomebrewCaskException(self.message)
+    def _install_casks(self):
+        missing = []
+        for cask in self.casks:
+            self.current_cask = cask
+            if self._current_cask_is_installed():
+                self.unchanged_count += 1
+                self.message = 'Cask already installed: {0}'.format(
+                    self.current_cask,
+                )
+            elif cask not in missing:
+                missing.append(cask)
 
-        if self._current_cask_is_installed():
-            self.unchanged_count += 1
-            self.message = 'Cask already installed: {0}'.format(
-                self.current_cask,
-            )
+        if not missing:
             return True
 
         if self.module.check_mode:
             self.changed = True
             self.message = 'Cask would be installed: {0}'.format(
-                self.current_cask
+                ', '.join(missing)
             )
             raise HomebrewCaskException(self.message)
 
-        cmd = [opt
-               for opt in (self.brew_path, 'cask', 'install', self.current_cask)
-               if opt]
-
+        cmd = [self.brew_path, 'cask', 'install'] + missing
         rc, out, err = self.module.run_command(cmd, path_prefix=self.path[0])
 
-        if self._current_cask_is_installed():
-            self.changed_count += 1
-            self.changed = True
-            self.message = 'Cask installed: {0}'.format(self.current_cask)
-            return True
-        else:
-            self.failed = True
-            self.message = err.strip()
-            raise HomebrewCaskException(self.message)
-
-    def _install_casks(self):
-        for cask in self.casks:
-            self.current_cask = cask
-            self._install_current_cask()
-
-        return True
+        return self._verify_casks(missing, 'installed', True, err)
     # /installed ----------------------------- }}}
 
     # uninstalled ---------------------------- {{{
-    def _uninstall_current_cask(self):
-        if not self.valid_cask(self.current_cask):
-            self.failed = True
-            self.message = 'Invalid cask: {0}.'.format(self.current_cask)
-            raise HomebrewCaskException(self.message)
+    def _uninstall_casks(self):
+        installed = []
+        for cask in self.casks:
+            self.current_cask = cask
+            if not self._current_cask_is_installed():
+                self.unchanged_count += 1
+                self.message = 'Cask already uninstalled: {0}'.format(
+                    self.current_cask,
+                )
+            elif cask not in installed:
+                installed.append(cask)
 
-        if not self._current_cask_is_installed():
-            self.unchanged_count += 1
-            self.message = 'Cask already uninstalled: {0}'.format(
-                self.current_cask,
-            )
+        if not installed:
             return True
 
         if self.module.check_mode:
             self.changed = True
             self.message = 'Cask would be uninstalled: {0}'.format(
-                self.current_cask
+                ', '.join(installed)
             )
             raise HomebrewCaskException(self.message)
 
-        cmd = [opt
-               for opt in (self.brew_path, 'cask', 'uninstall', self.current_cask)
-               if opt]
-
+        cmd = [self.brew_path, 'cask', 'uninstall'] + installed
         rc, out, err = self.module.run_command(cmd, path_prefix=self.path[0])
 
-        if not self._current_cask_is_installed():
-            self.changed_count += 1
-            self.changed = True
-            self.message = 'Cask uninstalled: {0}'.format(self.current_cask)
-            return True
-        else:
-            self.failed = True
-            self.message = err.strip()
-            raise HomebrewCaskException(self.message)
-
-    def _uninstall_casks(self):
-        for cask in self.casks:
-            self.current_cask = cask
-            self._uninstall_current_cask()
-
-        return True
+        return self._verify_casks(installed, 'uninstalled', False, err)
     # /uninstalled ----------------------------- }}}
     # /commands ---------------------------------------------------- }}}
 
@@ -40,6 +40,8 @@ options:
         description:
             - key from which to return values from the specified database, otherwise the
               full contents are returned.
+            - Since 2.1 this can also be a list of keys, which are all resolved by a single
+              getent invocation.
     split:
         required: False
         default: None
@@ -50,9 +52,27 @@ options:
         default: True
         description:
             - If a supplied key is missing this will make the task fail if True
+    use_nss:
+        required: False
+        default: False
+        version_added: "2.1"
+        description:
+            - Resolve the passwd and group databases in-process through the python pwd and grp
+              modules instead of running getent. The split option is ignored in this mode.
+    cache_ttl:
+        required: False
+        default: 0
+        version_added: "2.1"
+        description:
+            - With use_nss, number of seconds a full enumeration of the database is kept in a
+              local cache file and reused by later tasks. The cache is discarded whenever
+              /etc/nsswitch.conf changes. 0 disables the cache.
 
 notes:
    - "Not all databases support enumeration, check system documentation for details"
+   - "The enumeration cache is written to a private per-user directory in the system temporary
+      directory. It is not used if that directory is not owned by the remote user or is accessible
+      to others. Only use it for directories where a short staleness is acceptable."
 requirements: [ ]
 author: "Brian Coca (@bcoca)"
 '''
@@ -74,19 +94,153 @@ EXAMPLES = '''
 - getent: database=services key=http fail_key=False
 - debug: var=getent_services
 
+# get several users with a single lookup, without enumerating the directory
+- getent: database=passwd key=root,www-data,postgres
+- debug: var=getent_passwd
+
+# resolve a list of groups in-process, caching the enumeration for 5 minutes
+- getent:
+    database: group
+    key: "{{ app_groups }}"
+    use_nss: yes
+    cache_ttl: 300
+
 # get user password hash (requires sudo/root)
 - getent: database=shadow key=www-data split=:
 - debug: var=getent_shadow
 
 '''
 
+import os
+import stat
+import time
+import tempfile
+
+try:
+    import json
+except ImportError:
+    import simplejson as json
+
+NSSWITCH = '/etc/nsswitch.conf'
+
+
+def pwd_record(entry):
+    return [entry.pw_passwd, str(entry.pw_uid), str(entry.pw_gid), entry.pw_gecos, entry.pw_dir, entry.pw_shell]
+
+
+def grp_record(entry):
+    return [entry.gr_passwd, str(entry.gr_gid), ','.join(entry.gr_mem)]
+
+
+def cache_dir():
+    ''' private per-user directory for the cache files, None when it cannot be trusted '''
+    path = os.path.join(tempfile.gettempdir(), 'ansible-getent-%s' % os.getuid())
+    try:
+        os.mkdir(path, 0700)
+    except OSError:
+        pass
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return None
+    # a planted cache could hand out forged passwd and group entries
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 077:
+        return None
+    return path
+
+
+def nss_enumerate(database, cache_ttl):
+    ''' return the full database as {name: record}, through the cache file when enabled '''
+    try:
+        nss_mtime = os.stat(NSSWITCH).st_mtime
+    except OSError:
+        nss_mtime = None
+
+    cache_file = None
+    if cache_ttl > 0:
+        directory = cache_dir()
+        if directory is not None:
+            cache_file = os.path.join(directory, '%s.json' % database)
+    if cache_file:
+        try:
+            f = open(cache_file)
+            try:
+                cache = json.load(f)
+            finally:
+                f.close()
+            if cache['nsswitch_mtime'] == nss_mtime and time.time() - cache['time'] < cache_ttl:
+                return cache['records']
+        except (IOError, OSError, ValueError, KeyError):
+            pass
+
+    if database == 'passwd':
+        import pwd
+        records = dict((e.pw_name, pwd_record(e)) for e in pwd.getpwall())
+    else:
+        import grp
+        records = dict((e.gr_name, grp_record(e)) for e in grp.getgrall())
+
+    if cache_file:
+        try:
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(cache_file))
+            f = os.fdopen(fd, 'w')
+            try:
+                json.dump(dict(time=time.time(), nsswitch_mtime=nss_mtime, records=records), f)
+            finally:
+                f.close()
+            os.rename(tmp, cache_file)
+        except (IOError, OSError):
+            pass
+    return records
+
+
+def nss_lookup(database, keys, cache_ttl):
+    ''' resolve keys (names or numeric ids) in-process, returns ({name: record}, missing keys) '''
+    if cache_ttl > 0:
+        records = nss_enumerate(database, cache_ttl)
+        by_id = dict((r[1], name) for name, r in records.items())
+        found, missing = {}, []
+        for key in keys:
+            if key in records:
+                name = key
+            else:
+                name = by_id.get(key)
+            if name is None:
+                missing.append(key)
+            else:
+                found[name] = records[name]
+        return found, missing
+
+    if database == 'passwd':
+        import pwd
+        by_name, by_id, record = pwd.getpwnam, pwd.getpwuid, pwd_record
+    else:
+        import grp
+        by_name, by_id, record = grp.getgrnam, grp.getgrgid, grp_record
+
+    found, missing = {}, []
+    for key in keys:
+        try:
+            if key.isdigit():
+                entry = by_id(int(key))
+            else:
+                entry = by_name(key)
+        except KeyError:
+            missing.append(key)
+            continue
+        found[entry[0]] = record(entry)
+    return found, missing
+
+
 def main():
     module = AnsibleModule(
         argument_spec = dict(
             database = dict(required=True),
-            key      = dict(required=False, default=None),
+            key      = dict(required=False, default=None, type='list'),
             split    = dict(required=False, default=None),
             fail_key = dict(required=False, type='bool', default=True),
+            use_nss  = dict(required=False, type='bool', default=False),
+            cache_ttl = dict(required=False, type='int', default=0),
         ),
         supports_check_mode = True,
     )
@@ -98,10 +252,30 @@ def main():
     split    = module.params.get('split')
     fail_key = module.params.get('fail_key')
 
+    dbtree = 'getent_%s' % database
+
+    if module.params.get('use_nss'):
+        if database not in ('passwd', 'group'):
+            module.fail_json(msg="use_nss only supports the passwd and group databases")
+        cache_ttl = module.params.get('cache_ttl')
+        if key:
+            found, missing = nss_lookup(database, key, cache_ttl)
+        else:
+            found, missing = nss_enumerate(database, cache_ttl), []
+        results = { dbtree: found }
+        if missing:
+            msg = "One or more supplied key could not be found in the database."
+            if fail_key:
+                module.fail_json(msg=msg, missing=missing)
+            for k in missing:
+                results[dbtree][k] = None
+            module.exit_json(ansible_facts=results, msg=msg)
+        module.exit_json(ansible_facts=results)
+
     getent_bin = module.get_bin_path('getent', True)
 
-    if key is not None:
-        cmd = [ getent_bin, database, key ]
+    if key:
+        cmd = [ getent_bin, database ] + key
     else:
         cmd = [ getent_bin, database ]
 
@@ -114,14 +288,15 @@ def main():
         module.fail_json(msg=str(e))
 
     msg = "Unexpected failure!"
-    dbtree = 'getent_%s' % database
     results = { dbtree: {} }
 
-    if rc == 0:
-        for line in out.splitlines():
-            record = line.split(split)
-            results[dbtree][record[0]] = record[1:]
+    found = set()
+    for line in out.splitlines():
+        record = line.split(split)
+        results[dbtree][record[0]] = record[1:]
+        found.update(record)
 
+    if rc == 0:
         module.exit_json(ansible_facts=results)
 
     elif rc == 1:
@@ -129,7 +304,10 @@ def main():
     elif rc == 2:
         msg = "One or more supplied key could not be found in the database."
         if not fail_key:
-            results[dbtree][key] = None
+            # records found for the other keys are still returned
+            for k in key:
+                if k not in found:
+                    results[dbtree][k] = None
             module.exit_json(ansible_facts=results, msg=msg)
     elif rc == 3:
         msg = "Enumeration not supported on this database."
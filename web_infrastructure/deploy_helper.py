@@ -112,6 +112,41 @@ options:
       - the number of old releases to keep when cleaning. Used in C(finalize) and C(clean). Any unfinished builds
         will be deleted first, so only correct releases will count. The current version will not count.
 
+  prune_workers:
+    required: False
+    default: 1
+    version_added: "2.1"
+    description:
+      - the number of releases that are deleted concurrently when cleaning. Used in C(finalize) and C(clean).
+
+  background_prune:
+    required: False
+    default: False
+    version_added: "2.1"
+    description:
+      - Whether releases that are cleaned should only be renamed into a C(.trash) folder inside I(releases_path)
+        and deleted by a detached process, so the task returns immediately. Leftovers of an interrupted
+        background delete are removed by a detached process on the next clean, even when this is off.
+
+  clone_from_previous:
+    required: False
+    default: False
+    version_added: "2.1"
+    description:
+      - Whether C(state=present) should prepare I(new_release_path) as a copy of the release the I(current)
+        symlink points to, so the following deploy steps only need to write changed files.
+        Nothing is done if the new release folder already exists.
+
+  clone_method:
+    required: False
+    choices: [ hardlink, reflink ]
+    default: hardlink
+    version_added: "2.1"
+    description:
+      - How the previous release is copied with C(clone_from_previous). C(hardlink) shares every file with
+        the previous release (C(cp -al)), C(reflink) makes copy-on-write copies (C(cp --reflink=always)) and
+        requires a filesystem supporting them, such as btrfs or XFS.
+
 notes:
   - Facts are only returned for C(state=query) and C(state=present). If you use both, you should pass any overridden
     parameters to both calls, otherwise the second call will overwrite the facts of the first one.
@@ -120,6 +155,9 @@ notes:
   - Because of the default behaviour of generating the I(new_release) fact, this module will not be idempotent
     unless you pass your own release name with C(release). Due to the nature of deploying software, this should not
     be much of a problem.
+  - With C(clone_method=hardlink) files of the new release are the same inodes as those of the previous release.
+    The deploy steps must replace files (write to a temporary file and rename it) instead of modifying them in
+    place, or the live release is modified as well. rsync and git checkouts do this by default.
 '''
 
 EXAMPLES = '''
@@ -218,6 +256,14 @@ procedure to remove it during cleanup.
 # Or, if you use 'clean=false' on finalize:
 - deploy_helper: path=/path/to/root state=clean keep_releases=10
 
+# Large releases: start from a hardlinked copy of the current release and prune old ones in the background
+- deploy_helper: path=/path/to/root clone_from_previous=yes
+- deploy_helper: path=/path/to/root release={{ deploy_helper.new_release }} state=finalize
+                 background_prune=yes
+
+# Or delete old releases with several workers while waiting for the result
+- deploy_helper: path=/path/to/root state=clean prune_workers=4
+
 # Removing the entire project root folder
 - deploy_helper: path=/path/to/root state=absent
 
@@ -227,6 +273,14 @@ procedure to remove it during cleanup.
 
 '''
 
+import subprocess
+import tempfile
+import threading
+import Queue
+
+TRASH_DIR = '.trash'
+
+
 class DeployHelper(object):
 
     def __init__(self, module):
@@ -244,6 +298,11 @@ class DeployHelper(object):
         self.shared_path         = module.params['shared_path']
         self.state               = module.params['state']
         self.unfinished_filename = module.params['unfinished_filename']
+        self.prune_workers       = module.params['prune_workers']
+        self.background_prune    = module.params['background_prune']
+        self.clone_from_previous = module.params['clone_from_previous']
+        self.clone_method        = module.params['clone_method']
+        self.trash_batches       = []
 
     def gather_facts(self):
         current_path   = os.path.join(self.path, self.current_path)
@@ -287,6 +346,91 @@ class DeployHelper(object):
 
         return True
 
+    def delete_paths(self, paths):
+        ''' delete several release folders, either moving them to the trash folder for a
+        detached process to remove, or with up to prune_workers concurrent deletes '''
+        paths = [ path for path in paths if os.path.lexists(path) ]
+        for path in paths:
+            if not os.path.isdir(path):
+                self.module.fail_json(msg="%s exists but is not a directory" % path)
+
+        if not paths or self.module.check_mode:
+            return len(paths)
+
+        if self.background_prune:
+            self._move_to_trash(paths)
+            return len(paths)
+
+        work = Queue.Queue()
+        for path in paths:
+            work.put(path)
+        errors = []
+
+        def worker():
+            while True:
+                try:
+                    path = work.get_nowait()
+                except Queue.Empty:
+                    return
+                try:
+                    shutil.rmtree(path, ignore_errors=False)
+                except Exception, e:
+                    errors.append(str(e))
+
+        threads = [ threading.Thread(target=worker) for i in range(max(1, min(self.prune_workers, len(paths)))) ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if errors:
+            self.module.fail_json(msg="rmtree failed: %s" % '; '.join(errors))
+
+        return len(paths)
+
+    def _move_to_trash(self, paths):
+        trash_path = os.path.join(os.path.dirname(paths[0]), TRASH_DIR)
+        if not os.path.isdir(trash_path):
+            os.makedirs(trash_path)
+        # a batch folder per call, so a running delete never races with new renames
+        batch_path = tempfile.mkdtemp(dir=trash_path)
+        self.trash_batches.append(batch_path)
+
+        for path in paths:
+            target = os.path.join(batch_path, os.path.basename(path))
+            try:
+                os.rename(path, target)
+            except OSError, e:
+                self.module.fail_json(msg="moving %s to %s failed: %s" % (path, target, str(e)))
+
+        self._spawn_delete([ batch_path ])
+
+    def _spawn_delete(self, paths):
+        # detached from the module process, so the task does not wait for the delete
+        rm_bin = self.module.get_bin_path('rm', True)
+        devnull = open(os.devnull, 'r+')
+        subprocess.Popen([ rm_bin, '-rf' ] + paths, stdin=devnull, stdout=devnull, stderr=devnull,
+                         close_fds=True, preexec_fn=os.setsid)
+
+    def clone_release(self, source, dest):
+        changed = False
+
+        if source and os.path.isdir(source) and not os.path.lexists(dest):
+            changed = True
+            if not self.module.check_mode:
+                cp_bin = self.module.get_bin_path('cp', True)
+                if self.clone_method == 'reflink':
+                    cmd = [ cp_bin, '-a', '--reflink=always', source, dest ]
+                else:
+                    cmd = [ cp_bin, '-al', source, dest ]
+                rc, out, err = self.module.run_command(cmd)
+                if rc != 0:
+                    if os.path.lexists(dest):
+                        shutil.rmtree(dest, ignore_errors=True)
+                    self.module.fail_json(msg="cloning %s to %s failed: %s" % (source, dest, err))
+
+        return changed
+
     def create_path(self, path):
         changed = False
 
@@ -343,16 +487,10 @@ class DeployHelper(object):
         return changed
 
     def remove_unfinished_builds(self, releases_path):
-        changes = 0
+        unfinished = [ os.path.join(releases_path, release) for release in self._list_releases(releases_path)
+                       if os.path.isfile(os.path.join(releases_path, release, self.unfinished_filename)) ]
 
-        for release in os.listdir(releases_path):
-            if os.path.isfile(os.path.join(releases_path, release, self.unfinished_filename)):
-                if self.module.check_mode:
-                    changes += 1
-                else:
-                    changes += self.delete_path(os.path.join(releases_path, release))
-
-        return changes
+        return self.delete_paths(unfinished)
 
     def remove_unfinished_link(self, path):
         changed = False
@@ -368,7 +506,7 @@ class DeployHelper(object):
         changes = 0
 
         if os.path.lexists(releases_path):
-            releases = [ f for f in os.listdir(releases_path) if os.path.isdir(os.path.join(releases_path,f)) ]
+            releases = [ f for f in self._list_releases(releases_path) if os.path.isdir(os.path.join(releases_path,f)) ]
             try:
                 releases.remove(reserve_version)
             except ValueError:
@@ -376,13 +514,24 @@ class DeployHelper(object):
 
             if not self.module.check_mode:
                 releases.sort( key=lambda x: os.path.getctime(os.path.join(releases_path,x)), reverse=True)
-                for release in releases[self.keep_releases:]:
-                    changes += self.delete_path(os.path.join(releases_path, release))
+                changes += self.delete_paths([ os.path.join(releases_path, release) for release in releases[self.keep_releases:] ])
             elif len(releases) > self.keep_releases:
                 changes += (len(releases) - self.keep_releases)
 
+            # leftovers of an earlier background delete, which may still be running: rm -rf
+            # does not mind files vanishing under it where rmtree would fail the task
+            trash_path = os.path.join(releases_path, TRASH_DIR)
+            if os.path.isdir(trash_path) and not self.module.check_mode:
+                leftovers = [ os.path.join(trash_path, f) for f in os.listdir(trash_path)
+                              if os.path.join(trash_path, f) not in self.trash_batches ]
+                if leftovers:
+                    self._spawn_delete(leftovers)
+
         return changes
 
+    def _list_releases(self, releases_path):
+        return [ f for f in os.listdir(releases_path) if f != TRASH_DIR ]
+
     def _get_file_args(self, path):
         file_args = self.file_args.copy()
         file_args['path'] = path
@@ -410,6 +559,10 @@ def main():
             keep_releases       = dict(required=False, type='int', default=5),
             clean               = dict(required=False, type='bool', default=True),
             unfinished_filename = dict(required=False, type='str', default='DEPLOY_UNFINISHED'),
+            prune_workers       = dict(required=False, type='int', default=1),
+            background_prune    = dict(required=False, type='bool', default=False),
+            clone_from_previous = dict(required=False, type='bool', default=False),
+            clone_method        = dict(required=False, choices=['hardlink', 'reflink'], default='hardlink'),
             state               = dict(required=False, choices=['present', 'absent', 'clean', 'finalize', 'query'], default='present')
         ),
         add_file_common_args = True,
@@ -434,6 +587,8 @@ def main():
         changes += deploy_helper.create_path(facts['releases_path'])
         if deploy_helper.shared_path:
             changes += deploy_helper.create_path(facts['shared_path'])
+        if deploy_helper.clone_from_previous:
+            changes += deploy_helper.clone_release(facts['previous_release_path'], facts['new_release_path'])
 
         result['ansible_facts'] = { 'deploy_helper': facts }
 
@@ -26,9 +26,10 @@ description:
   - Deploy applications to JBoss standalone using the filesystem
 options:
   deployment:
-    required: true
+    required: false
     description:
       - The name of the deployment
+      - Required unless I(deployments) is given.
   src:
     required: false
     description:
@@ -44,9 +45,32 @@ options:
     default: "present"
     description:
       - Whether the application should be deployed or undeployed
+  deployments:
+    required: false
+    default: null
+    version_added: "2.1"
+    description:
+      - A list of applications to deploy or undeploy in one task, each a dict with C(deployment) and
+        optionally C(src) and C(state). C(state) defaults to the I(state) option.
+      - All the archives are copied first and the deployment scanner is then waited on for all of them
+        together.
+  digest_cache:
+    required: false
+    default: "yes"
+    choices: [ "yes", "no" ]
+    version_added: "2.1"
+    description:
+      - Remember the checksum of the archives by path, size and modification time, so that unchanged
+        archives are not read again on the next run.
 notes:
   - "The JBoss standalone deployment-scanner has to be enabled in standalone.xml"
   - "Ensure no identically named application is deployed through the JBoss CLI"
+  - "Archives are copied to a hidden temporary file in deploy_path and renamed into place, so the
+    deployment scanner never sees a partial archive."
+  - "On Linux the marker files written by the deployment scanner are watched with inotify, elsewhere
+    deploy_path is polled."
+  - "The digest cache is written to a private per-user directory in the system temporary directory.
+    It is not used if that directory is not owned by the remote user or is accessible to others."
 author: "Jeroen Hoekx (@jhoekx)"
 """
 
@@ -57,12 +81,33 @@ EXAMPLES = """
 - jboss: src=/tmp/hello-1.1-SNAPSHOT.war deployment=hello.war state=present
 # Undeploy the hello world application
 - jboss: deployment=hello.war state=absent
+# Deploy several applications and undeploy an old one in one task
+- jboss:
+    deployments:
+      - { deployment: shop.war, src: /tmp/shop-2.3.war }
+      - { deployment: api.war, src: /tmp/api-1.9.war }
+      - { deployment: legacy.war, state: absent }
 """
 
 import os
+import select
 import shutil
+import stat
+import tempfile
 import time
 
+try:
+    import json
+except ImportError:
+    import simplejson as json
+
+# inotify events that mean a marker file may have appeared or gone
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+
 def is_deployed(deploy_path, deployment):
     return os.path.exists(os.path.join(deploy_path, "%s.deployed"%(deployment)))
 
@@ -72,29 +117,126 @@ def is_undeployed(deploy_path, deployment):
 def is_failed(deploy_path, deployment):
     return os.path.exists(os.path.join(deploy_path, "%s.failed"%(deployment)))
 
-def main():
-    module = AnsibleModule(
-        argument_spec = dict(
-            src=dict(),
-            deployment=dict(required=True),
-            deploy_path=dict(default='/var/lib/jbossas/standalone/deployments'),
-            state=dict(choices=['absent', 'present'], default='present'),
-        ),
-    )
+class MarkerWatcher(object):
+    """ Wakes up when files change in deploy_path, through inotify when available """
 
-    changed = False
+    def __init__(self, deploy_path):
+        self.fd = None
+        try:
+            # ctypes is only available from python 2.5
+            import ctypes
+            import ctypes.util
+            libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK)
+            if fd < 0:
+                return
+            mask = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+            if libc.inotify_add_watch(fd, deploy_path, mask) < 0:
+                os.close(fd)
+                return
+            self.fd = fd
+        except (ImportError, OSError, AttributeError, TypeError):
+            pass
 
-    src = module.params['src']
-    deployment = module.params['deployment']
-    deploy_path = module.params['deploy_path']
-    state = module.params['state']
+    def wait(self, timeout):
+        """ Return after a change in deploy_path, or after timeout seconds """
+        if self.fd is None:
+            time.sleep(timeout)
+            return
+        readable = select.select([self.fd], [], [], timeout)[0]
+        if readable:
+            try:
+                while os.read(self.fd, 4096):
+                    pass
+            except OSError:
+                pass
 
-    if state == 'present' and not src:
-        module.fail_json(msg="Argument 'src' required.")
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
 
-    if not os.path.exists(deploy_path):
-        module.fail_json(msg="deploy_path does not exist.")
+def digest_cache_file():
+    """ cache file in a private per-user directory, None when that directory can not be trusted """
+    path = os.path.join(tempfile.gettempdir(), 'ansible-jboss-digests-%s' % os.getuid())
+    try:
+        os.mkdir(path, 0700)
+    except OSError:
+        pass
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return None
+    # a forged digest would make a changed archive look already deployed
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 077:
+        return None
+    return os.path.join(path, 'digests.json')
+
+def load_digests():
+    cache_file = digest_cache_file()
+    if cache_file is None:
+        return {}
+    try:
+        f = open(cache_file)
+        try:
+            return json.load(f)
+        finally:
+            f.close()
+    except (IOError, OSError, ValueError):
+        return {}
+
+def save_digests(digests):
+    cache_file = digest_cache_file()
+    if cache_file is None:
+        return
+    try:
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(cache_file))
+        f = os.fdopen(fd, 'w')
+        try:
+            json.dump(digests, f)
+        finally:
+            f.close()
+        os.rename(tmp, cache_file)
+    except (IOError, OSError):
+        pass
 
+def file_digest(module, path, digests):
+    """ sha1 of path, reused from digests while its size and mtime are unchanged """
+    st = os.stat(path)
+    key = os.path.realpath(path)
+    cached = digests.get(key)
+    if cached and cached[0] == st.st_size and cached[1] == st.st_mtime:
+        return cached[2]
+    digest = module.sha1(path)
+    digests[key] = [st.st_size, st.st_mtime, digest]
+    return digest
+
+def is_changed(module, src, dest, digests):
+    if os.path.getsize(src) != os.path.getsize(dest):
+        return True
+    return file_digest(module, src, digests) != file_digest(module, dest, digests)
+
+def copy_deployment(module, src, deploy_path, deployment, digests):
+    """ Copy src next to the deployment under a hidden name, then rename it into place """
+    dest = os.path.join(deploy_path, deployment)
+    fd, tmp = tempfile.mkstemp(prefix='.%s.' % deployment, dir=deploy_path)
+    os.close(fd)
+    try:
+        shutil.copyfile(src, tmp)
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmp, 0666 & ~umask)
+        os.rename(tmp, dest)
+    except:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    # the copy has the digest of its source, no need to read it again
+    digests[os.path.realpath(dest)] = [os.path.getsize(dest), os.stat(dest).st_mtime,
+                                       file_digest(module, src, digests)]
+
+def start_deployment(module, deploy_path, deployment, src, state, digests):
+    """ Apply one deployment, return the marker state to wait for or None if unchanged """
     deployed = is_deployed(deploy_path, deployment)
 
     if state == 'present' and not deployed:
@@ -103,37 +245,107 @@ def main():
         if is_failed(deploy_path, deployment):
             ### Clean up old failed deployment
             os.remove(os.path.join(deploy_path, "%s.failed"%(deployment)))
-
-        shutil.copyfile(src, os.path.join(deploy_path, deployment))
-        while not deployed:
-            deployed = is_deployed(deploy_path, deployment)
-            if is_failed(deploy_path, deployment):
-                module.fail_json(msg='Deploying %s failed.'%(deployment))
-            time.sleep(1)
-        changed = True
+        copy_deployment(module, src, deploy_path, deployment, digests)
+        return 'deployed'
 
     if state == 'present' and deployed:
-        if module.sha1(src) != module.sha1(os.path.join(deploy_path, deployment)):
+        if not os.path.exists(src):
+            module.fail_json(msg='Source file %s does not exist.'%(src))
+        if is_changed(module, src, os.path.join(deploy_path, deployment), digests):
             os.remove(os.path.join(deploy_path, "%s.deployed"%(deployment)))
-            shutil.copyfile(src, os.path.join(deploy_path, deployment))
-            deployed = False
-            while not deployed:
-                deployed = is_deployed(deploy_path, deployment)
-                if is_failed(deploy_path, deployment):
-                    module.fail_json(msg='Deploying %s failed.'%(deployment))
-                time.sleep(1)
-            changed = True
+            copy_deployment(module, src, deploy_path, deployment, digests)
+            return 'deployed'
 
     if state == 'absent' and deployed:
         os.remove(os.path.join(deploy_path, "%s.deployed"%(deployment)))
-        while deployed:
-            deployed = not is_undeployed(deploy_path, deployment)
+        return 'undeployed'
+
+    return None
+
+def wait_for_markers(module, watcher, deploy_path, pending):
+    """ Wait until each deployment in pending ({deployment: marker}) has its marker, return the seconds taken """
+    started = time.time()
+    seconds = {}
+    delay = 0.05
+    while pending:
+        for deployment, marker in pending.items():
             if is_failed(deploy_path, deployment):
+                if marker == 'deployed':
+                    module.fail_json(msg='Deploying %s failed.'%(deployment))
                 module.fail_json(msg='Undeploying %s failed.'%(deployment))
-            time.sleep(1)
-        changed = True
+            if marker == 'deployed' and is_deployed(deploy_path, deployment) or \
+               marker == 'undeployed' and is_undeployed(deploy_path, deployment):
+                seconds[deployment] = round(time.time() - started, 3)
+                del pending[deployment]
+        if pending:
+            # inotify wakes up on the next change, the timeout only guards
+            # against missed events; polling backs off up to one second
+            watcher.wait(delay)
+            delay = min(delay * 2, 1)
+    return seconds
+
+def main():
+    module = AnsibleModule(
+        argument_spec = dict(
+            src=dict(),
+            deployment=dict(),
+            deploy_path=dict(default='/var/lib/jbossas/standalone/deployments'),
+            state=dict(choices=['absent', 'present'], default='present'),
+            deployments=dict(type='list'),
+            digest_cache=dict(type='bool', default=True),
+        ),
+        required_one_of=[['deployment', 'deployments']],
+        mutually_exclusive=[['deployment', 'deployments']],
+    )
+
+    deploy_path = module.params['deploy_path']
+    state = module.params['state']
+
+    if module.params['deployments'] is not None:
+        entries = []
+        for entry in module.params['deployments']:
+            if not entry.get('deployment'):
+                module.fail_json(msg="Every entry of 'deployments' needs a 'deployment'.")
+            entries.append((entry['deployment'], entry.get('src'), entry.get('state') or state))
+    else:
+        entries = [(module.params['deployment'], module.params['src'], state)]
+
+    for deployment, src, entry_state in entries:
+        if entry_state not in ('absent', 'present'):
+            module.fail_json(msg="state of %s must be one of present, absent."%(deployment))
+        if entry_state == 'present' and not src:
+            module.fail_json(msg="Argument 'src' required.")
+
+    if not os.path.exists(deploy_path):
+        module.fail_json(msg="deploy_path does not exist.")
+
+    digests = {}
+    if module.params['digest_cache']:
+        digests = load_digests()
+
+    # watch before touching anything so no marker can be missed
+    watcher = MarkerWatcher(deploy_path)
+    try:
+        pending = {}
+        for deployment, src, entry_state in entries:
+            marker = start_deployment(module, deploy_path, deployment, src, entry_state, digests)
+            if marker:
+                pending[deployment] = marker
+        changed_deployments = sorted(pending)
+        seconds = wait_for_markers(module, watcher, deploy_path, pending)
+    finally:
+        watcher.close()
+
+    if module.params['digest_cache']:
+        save_digests(digests)
+
+    if module.params['deployments'] is not None:
+        module.exit_json(changed=bool(changed_deployments), deployments=[
+            dict(deployment=deployment, state=entry_state, changed=deployment in seconds,
+                 seconds=seconds.get(deployment))
+            for deployment, src, entry_state in entries])
 
-    module.exit_json(changed=changed)
+    module.exit_json(changed=bool(changed_deployments))
 
 # import module snippets
 from ansible.module_utils.basic import *